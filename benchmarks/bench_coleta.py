@@ -0,0 +1,99 @@
+# bench_coleta.py
+#
+# Benchmark de escala dos coletores do model.py sobre árvores /proc sintéticas
+# (ver gerar_proc_sintetico.py). Para cada tamanho, mede a latência (mediana e
+# máximo) e as alocações (pico e total de blocos, via tracemalloc) de cada etapa.
+#
+# Uso: python benchmarks/bench_coleta.py [tamanhos...]   (padrão: 1000 10000 50000)
+# As árvores ficam em $DASHBOARD_BENCH_DIR (padrão: /tmp/dashboard_bench) e são reaproveitadas.
+
+from pathlib import Path
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from gerar_proc_sintetico import gerar
+import model
+
+TAMANHOS_PADRAO = (1000, 10000, 50000)
+REPETICOES = 5
+
+
+def etapas(proc):
+    """
+    Etapas medidas, na ordem do ciclo de coleta. A tabela persistente é
+    aquecida antes para medir também o caminho incremental.
+    """
+    tabela_quente = model.TabelaProcessos(proc=proc)
+    tabela_quente.atualizar()
+    quadro = tabela_quente.quadro()
+    pid_muitos_fds = 100  # Um em cada cem processos tem tabela de fd grande
+
+    return (
+        ("pids_em_proc", lambda: model.pids_em_proc(proc)),
+        ("total_processos_threads", lambda: model.total_processos_threads(proc)),
+        ("listaProcessos (frio)", lambda: model.listaProcessos(proc)),
+        ("TabelaProcessos.atualizar (quente)", tabela_quente.atualizar),
+        ("TabelaProcessos.quadro", tabela_quente.quadro),
+        ("ArvoreProcessos", lambda: model.ArvoreProcessos(quadro)),
+        ("info_memoria", lambda: model.info_memoria(proc)),
+        ("get_process_resources", lambda: model.get_process_resources(pid_muitos_fds, proc)),
+    )
+
+
+def medir(funcao):
+    """
+    Retorna (mediana_ms, maximo_ms, pico_kb, blocos) de uma etapa.
+    A latência é medida sem tracemalloc; as alocações, em uma execução à parte.
+    """
+    duracoes = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao()
+        duracoes.append((time.perf_counter() - inicio) * 1e3)
+
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    resultado = funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    depois = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocos = sum(max(0, d.count_diff) for d in depois.compare_to(antes, "filename"))
+    del resultado
+    return statistics.median(duracoes), max(duracoes), pico / 1024, blocos
+
+
+def preparar(tamanho):
+    """
+    Gera (ou reaproveita) a árvore sintética de um tamanho.
+    """
+    base = Path(os.environ.get("DASHBOARD_BENCH_DIR", "/tmp/dashboard_bench"))
+    destino = base / f"proc_{tamanho}"
+    pronto = destino / ".pronto"
+    if not pronto.exists():
+        inicio = time.perf_counter()
+        gerar(destino, tamanho)
+        pronto.touch()
+        print(f"  árvore de {tamanho} PIDs gerada em {time.perf_counter() - inicio:.1f} s")
+    return str(destino)
+
+
+def main():
+    tamanhos = [int(a) for a in sys.argv[1:]] or list(TAMANHOS_PADRAO)
+    for tamanho in tamanhos:
+        print(f"\n== {tamanho} PIDs ==")
+        proc = preparar(tamanho)
+        print(f"{'etapa':<38}{'mediana (ms)':>14}{'máx (ms)':>10}{'pico (KiB)':>12}{'blocos':>10}")
+        for nome, funcao in etapas(proc):
+            mediana, maximo, pico, blocos = medir(funcao)
+            print(f"{nome:<38}{mediana:>14.2f}{maximo:>10.2f}{pico:>12.0f}{blocos:>10}")
+
+
+if __name__ == "__main__":
+    main()
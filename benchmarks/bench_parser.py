@@ -0,0 +1,122 @@
+# bench_parser.py
+#
+# Micro-benchmark do custo de interpretação, por processo, de /proc/<pid>/stat
+# e /proc/<pid>/status: parser antigo (texto, split completo, cadeia de
+# startswith) contra o parser em bytes do model.py.
+#
+# Uso: python benchmarks/bench_parser.py [repetições]
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model import PAGINA_KB, interpretar_stat, interpretar_status, pids_em_proc
+
+
+def stat_antigo(texto):
+    """
+    Interpretação de stat como era em Processo.tempoDeCPU(): split da linha inteira.
+    """
+    valores = texto.split()
+    return int(valores[13]), int(valores[14]), int(valores[19]), int(valores[21]), int(valores[23]) * PAGINA_KB
+
+
+def status_antigo(linhas):
+    """
+    Interpretação de status como era em Processo.statusProcesso(): varredura linha a linha.
+    """
+    nome = estado = ''
+    ppid = uid = threads = rss = 0
+    for linha in linhas:
+        if linha.startswith("Name:"):
+            nome = linha.split()[1]
+        elif linha.startswith("PPid:"):
+            ppid = int(linha.split()[1])
+        elif linha.startswith("Uid:"):
+            uid = int(linha.split()[1])
+        elif linha.startswith("State:"):
+            estado = linha.split()[1]
+        elif linha.startswith("Threads:"):
+            threads = int(linha.split()[1])
+        elif linha.startswith("VmRSS:"):
+            rss = int(linha.split()[1])
+    return nome, estado, ppid, uid, threads, rss
+
+
+def carregar_amostras():
+    """
+    Lê stat e status de todos os processos uma vez, para medir só a interpretação.
+    """
+    amostras = []
+    for pid in pids_em_proc():
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+            with open(f'/proc/{pid}/status', 'rb') as f:
+                status = f.read()
+        except OSError:
+            continue
+        amostras.append((stat, status))
+    return amostras
+
+
+def medir(funcao, entradas, repeticoes):
+    """
+    Retorna o custo médio por processo, em microssegundos.
+    """
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for entrada in entradas:
+            funcao(entrada)
+    return (time.perf_counter() - inicio) / (repeticoes * len(entradas)) * 1e6
+
+
+def medir_leitura(caminhos, modo, funcao, repeticoes):
+    """
+    Custo médio por processo de abrir, ler e interpretar o arquivo (em microssegundos).
+    """
+    def ler_e_interpretar(caminho):
+        try:
+            with open(caminho, modo) as f:
+                return funcao(f.read())
+        except OSError:
+            return None
+    return medir(ler_e_interpretar, caminhos, repeticoes)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    amostras = carregar_amostras()
+    if not amostras:
+        print("Nenhum processo legível em /proc.")
+        return
+
+    stats_bytes = [stat for stat, _ in amostras]
+    stats_texto = [stat.decode() for stat in stats_bytes]
+    status_bytes = [status for _, status in amostras]
+    status_linhas = [status.decode(errors="replace").splitlines() for status in status_bytes]
+    pids = pids_em_proc()
+
+    resultados = [
+        ("stat   (só interpretação)", medir(stat_antigo, stats_texto, repeticoes),
+         medir(interpretar_stat, stats_bytes, repeticoes)),
+        ("status (só interpretação)", medir(status_antigo, status_linhas, repeticoes),
+         medir(interpretar_status, status_bytes, repeticoes)),
+        ("stat   (leitura + interpretação)",
+         medir_leitura([f'/proc/{pid}/stat' for pid in pids], 'r', stat_antigo, repeticoes),
+         medir_leitura([f'/proc/{pid}/stat' for pid in pids], 'rb', interpretar_stat, repeticoes)),
+        ("status (leitura + interpretação)",
+         medir_leitura([f'/proc/{pid}/status' for pid in pids], 'r', lambda t: status_antigo(t.splitlines()), repeticoes),
+         medir_leitura([f'/proc/{pid}/status' for pid in pids], 'rb', interpretar_status, repeticoes)),
+    ]
+
+    print(f"{len(amostras)} processos, {repeticoes} repetições")
+    print(f"{'etapa':<34}{'antes (µs)':>12}{'depois (µs)':>13}{'ganho':>8}")
+    for etapa, antes, depois in resultados:
+        print(f"{etapa:<34}{antes:>12.2f}{depois:>13.2f}{antes / depois:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# gerar_proc_sintetico.py
+#
+# Gera uma árvore /proc sintética para medir os coletores do model.py sem
+# depender da máquina: N PIDs com stat, status, cmdline e fd/ (links
+# simbólicos), além de /stat, /meminfo, /mounts, /self/mounts e /locks globais.
+#
+# Uso: python benchmarks/gerar_proc_sintetico.py <destino> <n_pids> [tam_cmdline] [fds_por_processo]
+
+from pathlib import Path
+import os
+import random
+import sys
+
+STATUS_MODELO = (
+    "Name:\t{nome}\n"
+    "Umask:\t0022\n"
+    "State:\t{estado} ({estado_nome})\n"
+    "Tgid:\t{pid}\n"
+    "Ngid:\t0\n"
+    "Pid:\t{pid}\n"
+    "PPid:\t{ppid}\n"
+    "TracerPid:\t0\n"
+    "Uid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+    "Gid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+    "FDSize:\t64\n"
+    "Groups:\t\n"
+    "VmPeak:\t  {rss_pico} kB\n"
+    "VmSize:\t  {rss_pico} kB\n"
+    "VmRSS:\t  {rss} kB\n"
+    "RssAnon:\t  {rss} kB\n"
+    "VmSwap:\t       0 kB\n"
+    "Threads:\t{threads}\n"
+    "SigQ:\t0/63432\n"
+    "voluntary_ctxt_switches:\t{ctx}\n"
+    "nonvoluntary_ctxt_switches:\t{ctx}\n"
+)
+
+ESTADOS = (("S", "sleeping"), ("R", "running"), ("I", "idle"), ("D", "disk sleep"))
+
+NOMES = ("nginx", "postgres", "python3", "java", "bash", "sshd", "kworker/0:1",
+         "systemd", "node", "Web Content", "(sd-pam)", "redis-server")
+
+
+def linha_stat(pid, nome, estado, ppid, utime, stime, threads, starttime, rss_paginas):
+    """
+    Monta uma linha de /proc/<pid>/stat com os 52 campos do kernel.
+    """
+    campos = [estado, ppid, pid, pid, 0, -1, 4194560, 100, 0, 0, 0,
+              utime, stime, 0, 0, 20, 0, threads, 0, starttime,
+              rss_paginas * 4096 * 4, rss_paginas] + [0] * 28
+    return f"{pid} ({nome}) " + " ".join(str(c) for c in campos) + "\n"
+
+
+def gerar(destino, n_pids, tam_cmdline=256, fds_por_processo=8, semente=42):
+    """
+    Cria a árvore sintética em `destino`. Um em cada cem processos recebe
+    cem vezes mais descritores, simulando servidores com tabelas de fd grandes.
+    """
+    aleatorio = random.Random(semente)
+    raiz = Path(destino)
+    raiz.mkdir(parents=True, exist_ok=True)
+
+    (raiz / "stat").write_text(
+        "cpu  1000 0 500 90000 100 0 10 0 0 0\n"
+        + "".join(f"cpu{i} 250 0 125 22500 25 0 2 0 0 0\n" for i in range(4))
+        + "intr 0\nctxt 0\nbtime 0\nprocesses 0\n"
+    )
+    (raiz / "meminfo").write_text(
+        "MemTotal:       16318412 kB\nMemFree:         8123456 kB\n"
+        "Buffers:          123456 kB\nCached:          2345678 kB\n"
+        "SwapTotal:       2097148 kB\nSwapFree:        2000000 kB\n"
+    )
+    montagens = "/dev/sda1 / ext4 rw,relatime 0 0\nproc /proc proc rw 0 0\n"
+    (raiz / "mounts").write_text(montagens)
+    (raiz / "self").mkdir(exist_ok=True)
+    (raiz / "self" / "mounts").write_text(montagens)
+    (raiz / "locks").write_text("1: POSIX  ADVISORY  WRITE 100 08:01:131090 0 EOF\n")
+
+    for pid in range(1, n_pids + 1):
+        diretorio = raiz / str(pid)
+        (diretorio / "fd").mkdir(parents=True, exist_ok=True)
+        nome = aleatorio.choice(NOMES)
+        estado, estado_nome = aleatorio.choice(ESTADOS)
+        ppid = 0 if pid == 1 else aleatorio.randint(1, max(1, pid - 1))
+        uid = aleatorio.choice((0, 33, 1000, 1001))
+        threads = aleatorio.randint(1, 64)
+        rss_paginas = aleatorio.randint(0, 250000)
+        (diretorio / "stat").write_text(linha_stat(
+            pid, nome, estado, ppid, aleatorio.randint(0, 10**6), aleatorio.randint(0, 10**5),
+            threads, 1000 + pid, rss_paginas))
+        (diretorio / "status").write_text(STATUS_MODELO.format(
+            nome=nome, estado=estado, estado_nome=estado_nome, pid=pid, ppid=ppid, uid=uid,
+            rss=rss_paginas * 4, rss_pico=rss_paginas * 8, threads=threads, ctx=pid * 3))
+        argumentos = [f"/usr/bin/{nome.split('/')[0]}"]
+        while sum(len(a) + 1 for a in argumentos) < tam_cmdline:
+            argumentos.append(f"--opcao-{len(argumentos)}=valor")
+        (diretorio / "cmdline").write_bytes("\0".join(argumentos).encode() + b"\0")
+
+        n_fds = fds_por_processo * (100 if pid % 100 == 0 else 1)
+        for fd in range(n_fds):
+            tipo = fd % 4
+            if tipo == 0:
+                alvo = f"/var/log/app{fd}.log"
+            elif tipo == 1:
+                alvo = f"socket:[{pid * 1000 + fd}]"
+            elif tipo == 2:
+                alvo = f"pipe:[{pid * 1000 + fd}]"
+            else:
+                alvo = "anon_inode:[eventpoll]"
+            os.symlink(alvo, diretorio / "fd" / str(fd))
+    return raiz
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: gerar_proc_sintetico.py <destino> <n_pids> [tam_cmdline] [fds_por_processo]")
+        sys.exit(1)
+    argumentos = [sys.argv[1]] + [int(a) for a in sys.argv[2:5]]
+    print(f"Árvore gerada em {gerar(*argumentos)}")
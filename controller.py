@@ -1,21 +1,47 @@
 # controller.py
 
+import os
+
 from model import SystemMonitorConsoleModel 
 from view import render_dashboard
+from perfil import PERFIL
 import streamlit as st
 
 # st.set_page_config(page_title="Dashboard de Processos", layout="wide", initial_sidebar_state="collapsed")
 
-# Instancia o modelo uma única vez no início
-monitor_model = SystemMonitorConsoleModel()
+# Com DASHBOARD_COLETOR_URL (ex.: http://127.0.0.1:9101 ou unix:/run/dashboard.sock),
+# os dados vêm do serviço headless (servico_coletor.py) em vez de coletados aqui.
+# Sem ela, instancia o modelo uma única vez e inicia o coletor compartilhado.
+# Em ambos os casos todas as sessões (abas do navegador) leem o mesmo snapshot;
+# nenhuma rerun dispara uma nova varredura do /proc.
+COLETOR_URL = os.environ.get("DASHBOARD_COLETOR_URL")
+if COLETOR_URL:
+    from servico_coletor import ClienteColetor
+    monitor_model = ClienteColetor(COLETOR_URL)
+else:
+    monitor_model = SystemMonitorConsoleModel()
+    monitor_model.start()
+
+# Intervalo do autorefresh da página; dobra com o host saturado
+INTERVALO_ATUALIZACAO_MS = 2000
+
+def intervaloAtualizacao():
+    """
+    Intervalo do autorefresh em ms. Com o host saturado, a tela também cede
+    CPU: cada rerun de cada sessão custa renderização.
+    """
+    saturado = monitor_model.get_snapshot().get("host_saturado", False)
+    return INTERVALO_ATUALIZACAO_MS * (2 if saturado else 1)
 
 def executarDashboard():
     """
     Função principal que o Streamlit irá chamar.
-    Busca os dados principais do modelo e passa para a view.
+    Lê o snapshot mais recente do modelo e passa para a view.
     """
-    # 1. O Controller pede os dados completos ao Modelo
-    dashboard_data = monitor_model.get_all_data()
+    # 1. O Controller lê o último snapshot publicado pelo coletor
+    with PERFIL.medir("render.snapshot"):
+        dashboard_data = monitor_model.get_snapshot()
 
     # 2. O Controller passa os dados para a função da View para renderizar
-    render_dashboard(dashboard_data)
\ No newline at end of file
+    with PERFIL.medir("render.total"):
+        render_dashboard(dashboard_data)
\ No newline at end of file
@@ -0,0 +1,556 @@
+# descritores.py
+
+from collections import OrderedDict
+import os
+import socket
+import threading
+import time
+
+# Categorias de descritores, na ordem exibida
+CATEGORIAS_DESCRITORES = ("Arquivos", "Sockets", "Pipes", "Anon", "Erros", "Locks")
+
+# Estados TCP como aparecem (em hexadecimal) em /proc/net/tcp
+ESTADOS_TCP = {
+    "01": "ESTABLISHED", "02": "SYN_SENT", "03": "SYN_RECV", "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2", "06": "TIME_WAIT", "07": "CLOSE", "08": "CLOSE_WAIT",
+    "09": "LAST_ACK", "0A": "LISTEN", "0B": "CLOSING",
+}
+
+# Tabelas de sockets lidas para o índice: (arquivo em <proc>/net, protocolo exibido)
+TABELAS_SOCKETS = (("tcp", "TCP"), ("tcp6", "TCP6"), ("udp", "UDP"), ("udp6", "UDP6"), ("unix", "UNIX"))
+
+
+# --- CLASSIFICAÇÃO E VARREDURA ---
+def classificar_destino(destino):
+    """
+    Classifica o destino de um link de /proc/<pid>/fd só pelo prefixo, sem
+    nenhuma chamada extra ao sistema de arquivos.
+    """
+    if destino.startswith("socket:["):
+        return "Sockets"
+    if destino.startswith("pipe:["):
+        return "Pipes"
+    if destino.startswith("/"):
+        # O kernel marca arquivos já removidos do disco com o sufixo " (deleted)"
+        return "Erros" if destino.endswith(" (deleted)") else "Arquivos"
+    return "Anon"
+
+def inode_socket(destino):
+    """
+    Extrai o inode de um destino "socket:[12345]".
+    """
+    return int(destino[8:-1])
+
+def contar_descritores(pid, proc):
+    """
+    Retorna (identidade do diretório fd, número de descritores abertos).
+
+    Desde o Linux 6.2 o tamanho de /proc/<pid>/fd é o número de descritores;
+    em kernels antigos (tamanho 0) a contagem cai para uma listagem simples,
+    ainda sem readlink.
+    """
+    caminho = f"{proc}/{pid}/fd"
+    st = os.stat(caminho)
+    quantidade = st.st_size or len(os.listdir(caminho))
+    return (st.st_ino, st.st_ctime_ns), quantidade
+
+def varrer_descritores(pid, proc, tamanho_lote=4096):
+    """
+    Percorre /proc/<pid>/fd em lotes de até `tamanho_lote` tuplas (fd, destino).
+
+    O diretório é aberto uma vez e cada link é lido relativo a ele (dir_fd),
+    sem montar caminhos nem resolver o destino. Sem permissão para ler os
+    links, PermissionError é propagado.
+    """
+    dir_fd = os.open(f"{proc}/{pid}/fd", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        lote = []
+        with os.scandir(dir_fd) as entradas:
+            for entrada in entradas:
+                try:
+                    lote.append((int(entrada.name), os.readlink(entrada.name, dir_fd=dir_fd)))
+                except FileNotFoundError:
+                    continue  # Descritor fechado durante a varredura
+                if len(lote) >= tamanho_lote:
+                    yield lote
+                    lote = []
+        if lote:
+            yield lote
+    finally:
+        os.close(dir_fd)
+
+def interpretar_locks(conteudo):
+    """
+    Interpreta /proc/locks em tuplas (pid, inode, linha). Locks aguardando
+    ("->") também são incluídos, com o pid de quem espera.
+    """
+    locks = []
+    for linha in conteudo.splitlines():
+        partes = linha.replace("->", "").split()
+        if len(partes) < 6:
+            continue
+        try:
+            pid = int(partes[4])
+            inode = int(partes[5].rsplit(":", 1)[1])
+        except (ValueError, IndexError):
+            continue
+        locks.append((pid, inode, linha.strip()))
+    return locks
+
+def ler_locks(proc):
+    """
+    Lê e interpreta <proc>/locks (lista vazia se não existir).
+    """
+    try:
+        with open(f"{proc}/locks", "r") as f:
+            return interpretar_locks(f.read())
+    except OSError:
+        return []
+
+
+# --- ÍNDICE DE SOCKETS ---
+def _endereco(hexa):
+    """
+    Converte "0100007F:1F90" (ou o equivalente IPv6) em "127.0.0.1:8080".
+    Os endereços vêm em palavras de 32 bits na ordem de bytes do host.
+    """
+    ip, porta = hexa.split(":")
+    bruto = bytes.fromhex(ip)
+    palavras = b"".join(bruto[i:i + 4][::-1] for i in range(0, len(bruto), 4))
+    if len(palavras) == 4:
+        return f"{socket.inet_ntop(socket.AF_INET, palavras)}:{int(porta, 16)}"
+    return f"[{socket.inet_ntop(socket.AF_INET6, palavras)}]:{int(porta, 16)}"
+
+def interpretar_tabela_sockets(conteudo, protocolo):
+    """
+    Interpreta uma tabela de /proc/net em {inode: (protocolo, local, remoto, estado)}.
+    Endereços e estados ficam em hexadecimal; a decodificação só acontece ao
+    exibir (descrever_socket).
+    """
+    indice = {}
+    linhas = conteudo.splitlines()[1:]
+    if protocolo == "UNIX":
+        # Num RefCount Protocol Flags Type St Inode [Path]
+        for linha in linhas:
+            partes = linha.split(None, 7)
+            if len(partes) >= 7:
+                indice[int(partes[6])] = (protocolo, partes[7] if len(partes) > 7 else "", "", partes[5])
+    else:
+        # sl local rem st tx:rx tr:when retrnsmt uid timeout inode ...
+        for linha in linhas:
+            partes = linha.split(None, 10)
+            if len(partes) >= 10:
+                indice[int(partes[9])] = (protocolo, partes[1], partes[2], partes[3])
+    return indice
+
+def descrever_socket(entrada):
+    """
+    Texto legível de uma entrada do índice de sockets.
+    """
+    protocolo, local, remoto, estado = entrada
+    if protocolo == "UNIX":
+        return f"UNIX {local or '(anônimo)'}"
+    texto = f"{protocolo} {_endereco(local)} → {_endereco(remoto)}"
+    if protocolo.startswith("TCP"):
+        texto += f" {ESTADOS_TCP.get(estado, estado)}"
+    return texto
+
+class IndiceSockets:
+    """
+    Índice inode → socket montado com uma única leitura das tabelas de
+    /proc/net (tcp, tcp6, udp, udp6, unix), em vez de uma busca por descritor.
+
+    As tabelas são lidas pelo diretório net do próprio processo, portanto do
+    namespace de rede dele; há um índice por namespace, reconstruído quando
+    fica mais velho que `validade` segundos.
+    """
+    def __init__(self, proc, validade=5.0):
+        """
+        Inicializa sem nenhum índice carregado.
+        """
+        self.proc = proc
+        self.validade = validade
+        self._indices = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, pid):
+        """
+        Identifica o namespace de rede de um processo (None se não acessível).
+        """
+        try:
+            return os.stat(f"{self.proc}/{pid}/ns/net").st_ino
+        except OSError:
+            return None
+
+    def indice(self, pid):
+        """
+        Retorna o índice do namespace de rede de `pid`, reconstruindo-o se vencido.
+        """
+        ns = self._namespace(pid)
+        base = f"{self.proc}/{pid}/net" if ns is not None else f"{self.proc}/net"
+        agora = time.monotonic()
+        with self._lock:
+            carregado = self._indices.get(ns)
+            if carregado is not None and agora - carregado[0] < self.validade:
+                return carregado[1]
+        indice = {}
+        for arquivo, protocolo in TABELAS_SOCKETS:
+            try:
+                with open(f"{base}/{arquivo}", "r") as f:
+                    indice.update(interpretar_tabela_sockets(f.read(), protocolo))
+            except OSError:
+                continue
+        with self._lock:
+            self._indices[ns] = (agora, indice)
+        return indice
+
+
+# --- INSPEÇÃO DE UM PROCESSO ---
+class VarreduraDescritores:
+    """
+    Resultado (possivelmente ainda parcial) da varredura dos descritores de um
+    processo, classificado por categoria.
+
+    A varredura roda em uma thread própria e vai anexando lotes às listas de
+    cada categoria; a tela pode exibir contagens e páginas enquanto ela avança.
+    Só as linhas de uma página são formatadas, e só os sockets dessa página são
+    resolvidos no índice. Com `orcamento` (OrcamentoSegundoPlano), cada lote é
+    cobrado do orçamento da coleta e espera enquanto o host estiver saturado.
+    """
+    def __init__(self, pid, proc, identidade, indice_sockets, orcamento=None):
+        """
+        Inicia a varredura em segundo plano.
+        """
+        self.orcamento = orcamento
+        self.pid = pid
+        self.proc = proc
+        self.identidade = identidade
+        self.itens = {categoria: [] for categoria in CATEGORIAS_DESCRITORES}
+        self.erro = None
+        self.concluida = False
+        self.duracao = None
+        self._indice_sockets = indice_sockets
+        self._sockets = {}
+        self._thread = threading.Thread(target=self._varrer, daemon=True)
+        self._thread.start()
+
+    def _varrer(self):
+        """
+        Corpo da thread: classifica os descritores lote a lote e lê os locks.
+        """
+        inicio = time.perf_counter()
+        itens = self.itens
+        try:
+            for lote in varrer_descritores(self.pid, self.proc):
+                for fd, destino in lote:
+                    itens[classificar_destino(destino)].append((fd, destino))
+                if self.orcamento is not None:
+                    self.orcamento.ceder()
+            if itens["Sockets"]:
+                self._sockets = self._indice_sockets.indice(self.pid)
+            itens["Locks"].extend((0, linha) for pid, _, linha in ler_locks(self.proc) if pid == self.pid)
+        except PermissionError:
+            self.erro = "Permissão negada para acessar descritores."
+        except OSError as e:
+            self.erro = f"Erro ao ler fd/: {e}"
+        finally:
+            self.duracao = time.perf_counter() - inicio
+            self.concluida = True
+
+    def esperar(self, timeout=None):
+        """
+        Aguarda o fim da varredura. Retorna True se ela terminou.
+        """
+        self._thread.join(timeout)
+        return self.concluida
+
+    def contagens(self):
+        """
+        Número de itens já encontrados em cada categoria.
+        """
+        return {categoria: len(lista) for categoria, lista in self.itens.items()}
+
+    def _formatar(self, categoria, fd, destino):
+        """
+        Linha exibida para um item.
+        """
+        if categoria == "Locks":
+            return destino
+        if categoria == "Sockets":
+            entrada = self._sockets.get(inode_socket(destino))
+            if entrada is not None:
+                return f"{fd} → {destino} {descrever_socket(entrada)}"
+        return f"{fd} → {destino}"
+
+    def pagina(self, categoria, inicio=0, tamanho=200):
+        """
+        Linhas formatadas de uma fatia da categoria.
+        """
+        fatia = self.itens[categoria][inicio:inicio + tamanho]
+        return [self._formatar(categoria, fd, destino) for fd, destino in fatia]
+
+class InspetorDescritores:
+    """
+    Cache das últimas varreduras de descritores, por processo.
+
+    Uma varredura é reaproveitada enquanto o diretório fd do processo for o
+    mesmo (mesmo PID, sem reutilização) e tiver o mesmo número de descritores:
+    nesse caso o próximo rerun da tela custa apenas um stat.
+    """
+    def __init__(self, proc, capacidade=8, orcamento=None):
+        """
+        Inicializa o cache vazio, com até `capacidade` processos. `orcamento`
+        (OrcamentoSegundoPlano) é repassado às varreduras.
+        """
+        self.proc = proc
+        self.capacidade = capacidade
+        self.orcamento = orcamento
+        self.indice_sockets = IndiceSockets(proc)
+        self._varreduras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consultar(self, pid):
+        """
+        Retorna a varredura de `pid` (em andamento ou concluída), iniciando uma
+        nova quando não há cache válido. Retorna None se o processo não existe.
+        """
+        try:
+            identidade, quantidade = contar_descritores(pid, self.proc)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            # Sem permissão para o stat: a varredura registra o erro
+            identidade, quantidade = (None, str(e)), -1
+
+        with self._lock:
+            varredura = self._varreduras.get(pid)
+            chave = (identidade, quantidade)
+            if varredura is not None and (not varredura.concluida or varredura.identidade == chave):
+                self._varreduras.move_to_end(pid)
+                return varredura
+            varredura = VarreduraDescritores(pid, self.proc, chave, self.indice_sockets, self.orcamento)
+            self._varreduras[pid] = varredura
+            self._varreduras.move_to_end(pid)
+            while len(self._varreduras) > self.capacidade:
+                self._varreduras.popitem(last=False)
+            return varredura
+
+
+# --- ÍNDICE REVERSO (RECURSO → PROCESSOS) ---
+class IndiceReverso:
+    """
+    Índice de todo o sistema de caminho, inode de socket e lock para os PIDs
+    que os mantêm abertos, para responder "quem está usando isto?" sem varrer
+    o /proc a cada pergunta.
+
+    Uma thread em segundo plano atualiza o índice a cada `intervalo` segundos.
+    A atualização é incremental: só os PIDs cujo diretório fd mudou (outra
+    identidade ou outro número de descritores) são varridos de novo; os
+    demais custam um stat. A cada `ciclos_completos` atualizações todos os PIDs
+    são revarridos, para pegar trocas de descritores que não mudam a contagem.
+    Com `orcamento` (OrcamentoSegundoPlano), cada PID revarrido é cobrado do
+    orçamento da coleta e a atualização espera enquanto o host estiver saturado.
+    """
+    def __init__(self, proc, intervalo=10.0, ciclos_completos=30, orcamento=None):
+        """
+        Inicializa o índice vazio (a thread só começa em start()).
+        """
+        self.proc = proc
+        self.orcamento = orcamento
+        self.intervalo = intervalo
+        self.ciclos_completos = ciclos_completos
+        self.indice_sockets = IndiceSockets(proc)
+        self._por_pid = {}    # pid -> (chave do diretório fd, caminhos, inodes de sockets)
+        self._caminhos = {}   # caminho -> {pids}
+        self._sockets = {}    # inode -> {pids}
+        self._locks = []      # (pid, inode, linha) de /proc/locks
+        self._lock = threading.Lock()
+        self._ciclos = 0
+        self._thread = None
+        self._parar = threading.Event()
+        self.atualizado_em = None
+        self.duracao = None
+        self.revarridos = 0
+
+    def _remover(self, pid):
+        """
+        Tira as contribuições de um PID dos mapas (chamado com o lock).
+        """
+        anterior = self._por_pid.pop(pid, None)
+        if anterior is None:
+            return
+        for mapa, chaves in ((self._caminhos, anterior[1]), (self._sockets, anterior[2])):
+            for chave in chaves:
+                pids = mapa.get(chave)
+                if pids is not None:
+                    pids.discard(pid)
+                    if not pids:
+                        del mapa[chave]
+
+    def _adicionar(self, pid, chave, caminhos, sockets):
+        """
+        Registra os recursos de um PID nos mapas (chamado com o lock).
+        """
+        self._por_pid[pid] = (chave, caminhos, sockets)
+        for caminho in caminhos:
+            self._caminhos.setdefault(caminho, set()).add(pid)
+        for inode in sockets:
+            self._sockets.setdefault(inode, set()).add(pid)
+
+    def atualizar(self, completa=False):
+        """
+        Executa uma atualização do índice (incremental, ou completa).
+        """
+        inicio = time.perf_counter()
+        vistos = set()
+        revarridos = 0
+        with os.scandir(self.proc) as entradas:
+            pids = [int(e.name) for e in entradas if e.name.isdigit()]
+        for pid in pids:
+            try:
+                chave = contar_descritores(pid, self.proc)
+            except OSError:
+                continue  # Encerrado, ou sem permissão nem para o stat
+            vistos.add(pid)
+            anterior = self._por_pid.get(pid)
+            if anterior is not None and anterior[0] == chave and not completa:
+                continue
+            if self.orcamento is not None:
+                self.orcamento.ceder()
+            caminhos, sockets = set(), set()
+            try:
+                for lote in varrer_descritores(pid, self.proc):
+                    for _, destino in lote:
+                        if destino.startswith("socket:["):
+                            sockets.add(inode_socket(destino))
+                        elif destino.startswith("/"):
+                            caminhos.add(destino)
+            except OSError:
+                # Sem permissão: guarda a chave vazia para não tentar de novo a cada ciclo
+                pass
+            with self._lock:
+                self._remover(pid)
+                self._adicionar(pid, chave, caminhos, sockets)
+            revarridos += 1
+
+        locks = ler_locks(self.proc)
+        with self._lock:
+            for pid in set(self._por_pid) - vistos:
+                self._remover(pid)
+            self._locks = locks
+        self.revarridos = revarridos
+        self.duracao = time.perf_counter() - inicio
+        self.atualizado_em = time.time()
+
+    def _loop(self):
+        """
+        Corpo da thread: atualiza o índice até stop().
+        """
+        while not self._parar.is_set():
+            try:
+                self.atualizar(completa=self._ciclos % self.ciclos_completos == 0)
+            except OSError:
+                pass
+            self._ciclos += 1
+            self._parar.wait(self.intervalo)
+
+    def start(self):
+        """
+        Inicia a thread de atualização (idempotente).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Para a thread de atualização.
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def estado(self):
+        """
+        Resumo do índice: momento e duração da última atualização e tamanhos.
+        """
+        with self._lock:
+            return {
+                "atualizado_em": self.atualizado_em,
+                "duracao": self.duracao,
+                "revarridos": self.revarridos,
+                "pids": len(self._por_pid),
+                "caminhos": len(self._caminhos),
+                "sockets": len(self._sockets),
+                "locks": len(self._locks),
+            }
+
+    @staticmethod
+    def _sockets_na_porta(indice, porta):
+        """
+        Inodes dos sockets TCP/UDP do `indice` (inode -> descrição) com a
+        porta local `porta`.
+        """
+        return [
+            inode for inode, (protocolo, local, _, _) in indice.items()
+            if protocolo != "UNIX" and int(local.rsplit(":", 1)[1], 16) == porta
+        ]
+
+    @staticmethod
+    def _identificar_lock(caminho):
+        """
+        Dispositivo e inode de `caminho` no formato de /proc/locks
+        ("maior:menor:inode"), ou None se o arquivo não for acessível.
+        """
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return None
+        return f"{os.major(st.st_dev):02x}:{os.minor(st.st_dev):02x}:{st.st_ino}"
+
+    def consultar(self, termo, limite=1000):
+        """
+        Retorna até `limite` tuplas (pid, tipo, recurso) para o termo:
+        "socket:[N]" ou N (inode de socket), ":PORTA" (porta local), "locks"
+        (todos os locks), um caminho absoluto (exato, com os locks do arquivo)
+        ou um trecho de caminho.
+        """
+        termo = termo.strip()
+        resultados = []
+        # Tudo o que lê o /proc ou o disco (índice de sockets, stat do arquivo)
+        # acontece antes do lock, que só protege a leitura do índice reverso
+        inode = None
+        if termo.startswith("socket:[") or termo.isdigit():
+            try:
+                inode = inode_socket(termo) if termo.startswith("socket:[") else int(termo)
+            except ValueError:
+                return []  # "socket:[...]" sem um inode numérico
+        porta = termo.startswith(":") and termo[1:].isdigit()
+        if porta:
+            # Portas do namespace de rede do host (PID 1), como no painel de rede
+            indice = self.indice_sockets.indice("1")
+            inodes = self._sockets_na_porta(indice, int(termo[1:]))
+        alvo = self._identificar_lock(termo) if termo.startswith("/") else None
+        with self._lock:
+            if inode is not None:
+                resultados = [(pid, "Socket", f"socket:[{inode}]") for pid in self._sockets.get(inode, ())]
+            elif porta:
+                resultados = [
+                    (pid, "Socket", f"socket:[{inode}] {descrever_socket(indice[inode])}")
+                    for inode in inodes for pid in self._sockets.get(inode, ())
+                ]
+            elif termo.lower() == "locks":
+                resultados = [(pid, "Lock", linha) for pid, _, linha in self._locks]
+            elif termo in self._caminhos or termo.startswith("/"):
+                resultados = [(pid, "Arquivo", termo) for pid in self._caminhos.get(termo, ())]
+                if alvo is not None:
+                    resultados += [(pid, "Lock", linha) for pid, _, linha in self._locks if alvo in linha.split()]
+            if not resultados and termo and not termo.isdigit():
+                resultados = [
+                    (pid, "Arquivo", caminho)
+                    for caminho, pids in self._caminhos.items() if termo in caminho
+                    for pid in pids
+                ]
+        return sorted(resultados)[:limite]
@@ -0,0 +1,237 @@
+# entrada_saida.py
+
+import os
+import time
+
+import numpy as np
+
+# Unidade dos setores de /proc/diskstats: sempre 512 bytes, qualquer que seja o dispositivo
+BYTES_SETOR = 512
+# Dispositivos virtuais sem interesse na tabela de atividade
+PREFIXOS_IGNORADOS = ("loop", "ram", "zram")
+# Processos lidos em /proc/<pid>/io por passada (os de maior %CPU, mais os em espera de E/S)
+LIMITE_IO_PROCESSOS = int(os.environ.get("DASHBOARD_LIMITE_IO", "20"))
+
+
+def interpretar_diskstats(conteudo):
+    """
+    Extrai (nomes, contadores) do conteúdo (bytes) de /proc/diskstats.
+    `contadores` é um array int64 (dispositivos × 5): leituras concluídas,
+    setores lidos, escritas concluídas, setores escritos e ms com E/S em curso.
+    """
+    nomes = []
+    valores = []
+    for linha in conteudo.split(b"\n"):
+        campos = linha.split()
+        if len(campos) < 14:
+            continue
+        nome = campos[2].decode()
+        if nome.startswith(PREFIXOS_IGNORADOS):
+            continue
+        nomes.append(nome)
+        valores.append((campos[3], campos[5], campos[7], campos[9], campos[12]))
+    return nomes, np.array(valores, dtype=np.int64).reshape(len(nomes), 5)
+
+
+def taxa_opcional(valor):
+    """
+    Converte uma taxa para float (None quando ainda não há amostra anterior).
+    """
+    return None if np.isnan(valor) else float(valor)
+
+
+def interpretar_io_processo(conteudo):
+    """
+    Extrai (read_bytes, write_bytes) do conteúdo (bytes) de /proc/<pid>/io:
+    os bytes que de fato chegaram à camada de armazenamento.
+    """
+    lido = escrito = 0
+    for linha in conteudo.split(b"\n"):
+        if linha.startswith(b"read_bytes:"):
+            lido = int(linha[11:])
+        elif linha.startswith(b"write_bytes:"):
+            escrito = int(linha[12:])
+    return lido, escrito
+
+
+# --- ATIVIDADE DOS DISCOS ---
+class TaxasDiscos:
+    """
+    IOPS, vazão e utilização de cada dispositivo de bloco, pela diferença
+    entre duas leituras de /proc/diskstats (uma leitura por amostra, contas
+    vetorizadas sobre todos os dispositivos).
+    """
+    def __init__(self, proc="/proc"):
+        """
+        Inicializa sem amostra anterior: a primeira amostra não tem taxas.
+        """
+        self.proc = proc
+        self._nomes = []
+        self._contadores = np.zeros((0, 5), dtype=np.int64)
+        self._instante = None
+        self._dispositivos = {}  # /dev/... -> nome no diskstats (segue links como /dev/mapper)
+
+    def _nome_dispositivo(self, dispositivo):
+        nome = self._dispositivos.get(dispositivo)
+        if nome is None:
+            nome = self._dispositivos[dispositivo] = os.path.basename(os.path.realpath(dispositivo))
+        return nome
+
+    def amostrar(self, montagens=(), instante=None):
+        """
+        Lê /proc/diskstats e retorna uma linha (dict) por dispositivo, com os
+        pontos de montagem de `montagens` (dispositivo, ponto, tipo de FS).
+        """
+        if instante is None:
+            instante = time.monotonic()
+        try:
+            with open(f"{self.proc}/diskstats", "rb") as f:
+                nomes, contadores = interpretar_diskstats(f.read())
+        except OSError:
+            return ()
+
+        taxas = np.full((len(nomes), 5), np.nan)
+        if self._instante is not None and instante > self._instante:
+            if nomes == self._nomes:
+                anteriores = self._contadores
+                presentes = np.ones(len(nomes), dtype=bool)
+            else:
+                # Dispositivo novo ou removido: alinha pelos nomes
+                posicao = {nome: i for i, nome in enumerate(self._nomes)}
+                indices = np.array([posicao.get(nome, -1) for nome in nomes], dtype=np.int64)
+                presentes = indices >= 0
+                anteriores = self._contadores[np.where(presentes, indices, 0)]
+            delta = np.maximum(contadores - anteriores, 0) / (instante - self._instante)
+            taxas[presentes] = delta[presentes]
+        self._nomes, self._contadores, self._instante = nomes, contadores, instante
+
+        pontos = {}
+        for dispositivo, ponto_montagem, _ in montagens:
+            if dispositivo.startswith("/dev/"):
+                pontos.setdefault(self._nome_dispositivo(dispositivo), []).append(ponto_montagem)
+
+        mb_s = BYTES_SETOR / 1024**2
+        utilizacao = np.minimum(taxas[:, 4] / 10.0, 100.0)  # ms de E/S por s -> %
+        return tuple(
+            {
+                "Dispositivo": nome,
+                "Pontos de Montagem": ", ".join(pontos.get(nome, ())),
+                "IOPS Leitura": taxa_opcional(taxas[i, 0]),
+                "IOPS Escrita": taxa_opcional(taxas[i, 2]),
+                "Leitura (MB/s)": taxa_opcional(taxas[i, 1] * mb_s),
+                "Escrita (MB/s)": taxa_opcional(taxas[i, 3] * mb_s),
+                "Utilização (%)": taxa_opcional(utilizacao[i]),
+            }
+            for i, nome in enumerate(nomes)
+        )
+
+
+# --- E/S POR PROCESSO ---
+class TaxasIOProcessos:
+    """
+    Taxas de leitura e escrita em disco por processo (/proc/<pid>/io).
+
+    Por passada são lidos no máximo `limite` processos de cada grupo: os de
+    maior %CPU, os em espera de E/S (estado D) e os de maior vazão na passada
+    anterior, para o custo não crescer com o número de processos nem numa
+    parada do armazenamento com centenas de tarefas em D. Sem o último grupo,
+    um processo que só faz E/S (pouca CPU) sairia da tabela logo após entrar.
+    A última leitura de cada PID é guardada em arrays ordenados; o casamento
+    com a leitura anterior e as taxas são vetorizados.
+    """
+    def __init__(self, proc="/proc", limite=LIMITE_IO_PROCESSOS):
+        """
+        Inicializa sem leituras anteriores.
+        """
+        self.proc = proc
+        self.limite = limite
+        self._pids = np.empty(0, dtype=np.int64)
+        self._bytes = np.empty((0, 2), dtype=np.int64)
+        self._instantes = np.empty(0, dtype=np.float64)
+        self._maior_vazao = np.empty(0, dtype=np.int64)  # PIDs de maior vazão na passada anterior
+        self.sem_permissao = 0  # Candidatos da última passada sem acesso ao /proc/<pid>/io
+
+    def _maiores(self, posicoes, cpu):
+        """
+        Até `limite` das `posicoes`, as de maior %CPU.
+        """
+        if len(posicoes) <= self.limite:
+            return posicoes
+        return posicoes[np.argpartition(-cpu[posicoes], self.limite - 1)[:self.limite]]
+
+    def _candidatos(self, processos):
+        """
+        Posições (no quadro) dos processos a ler nesta passada.
+        """
+        cpu = processos["CPU %"].to_numpy(dtype=np.float64)
+        topo = self._maiores(np.arange(len(cpu)), cpu)
+        em_espera = self._maiores(
+            np.flatnonzero((processos["Status"] == "D").to_numpy(dtype=bool, na_value=False)), cpu
+        )
+        anteriores = np.flatnonzero(np.isin(processos["PID"].to_numpy(dtype=np.int64), self._maior_vazao))
+        return np.union1d(np.union1d(topo, em_espera), anteriores)
+
+    def amostrar(self, processos, instante=None):
+        """
+        Lê os candidatos de `processos` (quadro do snapshot) e retorna uma linha
+        (dict) por processo com taxa conhecida, da maior vazão para a menor.
+        """
+        if instante is None:
+            instante = time.monotonic()
+        todos_pids = processos["PID"].to_numpy(dtype=np.int64)
+        lidos = []
+        leituras = []
+        sem_permissao = 0
+        for linha in self._candidatos(processos).tolist():
+            try:
+                with open(f"{self.proc}/{todos_pids[linha]}/io", "rb") as f:
+                    leituras.append(interpretar_io_processo(f.read()))
+            except PermissionError:
+                sem_permissao += 1
+                continue
+            except (FileNotFoundError, ProcessLookupError, ValueError):
+                continue
+            lidos.append(linha)
+        self.sem_permissao = sem_permissao
+        linhas = np.array(lidos, dtype=np.int64)
+        pids = todos_pids[linhas]
+        atuais = np.array(leituras, dtype=np.int64).reshape(len(lidos), 2)
+
+        # Casa cada PID lido com a sua leitura anterior (arrays ordenados)
+        if len(self._pids):
+            posicao = np.minimum(np.searchsorted(self._pids, pids), len(self._pids) - 1)
+            casados = self._pids[posicao] == pids
+        else:
+            posicao = np.zeros(len(pids), dtype=np.int64)
+            casados = np.zeros(len(pids), dtype=bool)
+        intervalo = instante - self._instantes[posicao[casados]]
+        delta = atuais[casados] - self._bytes[posicao[casados]]
+        # Contador menor que o anterior: o PID foi reaproveitado por outro processo
+        validos = (delta >= 0).all(axis=1) & (intervalo > 0)
+        taxas = delta[validos] / intervalo[validos, None] / 1024
+        linhas_taxa = linhas[casados][validos]
+
+        # Guarda as leituras novas e mantém as antigas dos PIDs ainda vivos
+        manter = np.isin(self._pids, todos_pids) & ~np.isin(self._pids, pids)
+        todos = np.concatenate([self._pids[manter], pids])
+        ordem = np.argsort(todos, kind="stable")
+        self._pids = todos[ordem]
+        self._bytes = np.concatenate([self._bytes[manter], atuais])[ordem]
+        self._instantes = np.concatenate([self._instantes[manter], np.full(len(pids), instante)])[ordem]
+
+        ordem = np.argsort(-taxas.sum(axis=1), kind="stable")
+        # Os de maior vazão (com E/S de fato) continuam candidatos na próxima passada
+        com_io = ordem[taxas.sum(axis=1)[ordem] > 0][:self.limite]
+        self._maior_vazao = todos_pids[linhas_taxa[com_io]]
+        if not len(linhas_taxa):
+            return ()
+        nomes = processos["Nome"].to_numpy(dtype=object)[linhas_taxa]
+        return tuple(
+            {
+                "PID": int(todos_pids[linhas_taxa[i]]),
+                "Nome": nomes[i],
+                "Leitura (KB/s)": float(taxas[i, 0]),
+                "Escrita (KB/s)": float(taxas[i, 1]),
+            }
+            for i in ordem
+        )
@@ -0,0 +1,221 @@
+# escalonador.py
+
+from contextlib import nullcontext
+import threading
+import time
+
+
+# --- ETAPA DE COLETA ---
+class Etapa:
+    """
+    Uma etapa de coleta agendada: função, intervalo próprio e prioridade
+    (0 = essencial, sempre executada; números maiores cedem primeiro).
+    """
+    __slots__ = ("nome", "funcao", "intervalo", "prioridade", "proxima", "vencida_desde",
+                 "custo", "execucoes", "adiamentos", "ultima_execucao")
+
+    def __init__(self, nome, funcao, intervalo, prioridade):
+        self.nome = nome
+        self.funcao = funcao
+        self.intervalo = intervalo
+        self.prioridade = prioridade
+        self.proxima = 0.0            # Instante (monotônico) em que vence
+        self.vencida_desde = None     # Primeiro tick em que venceu sem rodar
+        self.custo = 0.0              # Média móvel do tempo de CPU por execução (s)
+        self.execucoes = 0
+        self.adiamentos = 0
+        self.ultima_execucao = None
+
+
+# --- ORÇAMENTO DO SEGUNDO PLANO ---
+class OrcamentoSegundoPlano:
+    """
+    Parte do orçamento do Escalonador usada pelas threads de segundo plano
+    (índice reverso, varredura de descritores, cálculo de tamanhos), que não
+    rodam como etapas.
+
+    Cada thread chama ceder() entre unidades de trabalho. O tempo de CPU que
+    ela gastou desde a chamada anterior é descontado do orçamento do próximo
+    tick, e com o host saturado ela espera (até `espera_maxima` segundos por
+    chamada) o Escalonador sinalizar folga.
+    """
+    def __init__(self, espera_maxima=2.0):
+        """
+        Inicializa sem gasto acumulado e com o host livre.
+        """
+        self.espera_maxima = espera_maxima
+        self.esperas = 0
+        self._gasto = 0.0
+        self._livre = threading.Event()
+        self._livre.set()
+        self._lock = threading.Lock()
+        self._local = threading.local()  # thread_time da última chamada de cada thread
+
+    def sinalizar(self, saturado):
+        """
+        Chamado pelo Escalonador a cada medição da carga do host.
+        """
+        if saturado:
+            self._livre.clear()
+        else:
+            self._livre.set()
+
+    def ceder(self):
+        """
+        Cobra a CPU gasta pela thread desde a chamada anterior e, com o host
+        saturado, espera folga.
+        """
+        agora = time.thread_time()
+        anterior = getattr(self._local, "instante", None)
+        with self._lock:
+            if anterior is not None:
+                self._gasto += agora - anterior
+            if not self._livre.is_set():
+                self.esperas += 1
+        self._livre.wait(self.espera_maxima)
+        self._local.instante = time.thread_time()
+
+    def descontar(self):
+        """
+        Retorna e zera a CPU acumulada pelas threads de segundo plano.
+        """
+        with self._lock:
+            gasto, self._gasto = self._gasto, 0.0
+        return gasto
+
+
+# --- ESCALONADOR ---
+class Escalonador:
+    """
+    Agenda as etapas de coleta, cada uma no seu intervalo, dentro de um
+    orçamento de tempo de CPU por tick.
+
+    A cada tick as etapas vencidas rodam em ordem de prioridade. O custo de
+    cada etapa é estimado pela média móvel do tempo de CPU da thread coletora
+    (time.thread_time) nas execuções anteriores e pesa no tick espalhado pelo
+    seu intervalo (uma etapa de 150 ms a cada 2 s conta 75 ms num tick de 1 s);
+    uma etapa não essencial que estouraria o orçamento do tick é adiada para o
+    tick seguinte. Com o host
+    saturado (carga >= limiar_saturacao), o orçamento cai pela metade e os
+    intervalos das etapas não essenciais são multiplicados por
+    fator_saturacao. Nenhuma etapa fica adiada por mais de atraso_maximo
+    vezes o seu intervalo.
+    """
+    def __init__(self, orcamento=0.1, limiar_saturacao=90.0, fator_saturacao=2.0, atraso_maximo=5.0,
+                 perfil=None, segundo_plano=None):
+        """
+        `orcamento` é a fração de um núcleo que a coleta pode usar por tick.
+        Com `perfil` (Perfilador), cada etapa é medida como "coleta.<nome>".
+        Com `segundo_plano` (OrcamentoSegundoPlano), a CPU das threads de
+        segundo plano sai do orçamento e elas esperam enquanto o host estiver
+        saturado.
+        """
+        self.perfil = perfil
+        self.segundo_plano = segundo_plano
+        self.orcamento = orcamento
+        self.limiar_saturacao = limiar_saturacao
+        self.fator_saturacao = fator_saturacao
+        self.atraso_maximo = atraso_maximo
+        self.etapas = []
+        self.saturado = False
+        self.gasto_ultimo_tick = 0.0
+
+    @property
+    def intervalo_tick(self):
+        """Período do tick: o menor intervalo entre as etapas."""
+        return min((etapa.intervalo for etapa in self.etapas), default=1.0)
+
+    def adicionar(self, nome, funcao, intervalo, prioridade=1):
+        """
+        Registra uma etapa. As etapas vencem já no primeiro tick.
+        """
+        etapa = Etapa(nome, funcao, intervalo, prioridade)
+        self.etapas.append(etapa)
+        self.etapas.sort(key=lambda e: e.prioridade)
+        return etapa
+
+    def antecipar(self, nome):
+        """
+        Faz a etapa `nome` vencer no próximo tick (ex.: a tabela de montagens mudou).
+        """
+        for etapa in self.etapas:
+            if etapa.nome == nome:
+                etapa.proxima = 0.0
+
+    def _executar(self, etapa, agora):
+        """
+        Roda uma etapa e atualiza a estimativa de custo e o próximo vencimento.
+        """
+        medicao = self.perfil.medir(f"coleta.{etapa.nome}", syscalls=True) if self.perfil else nullcontext()
+        inicio = time.thread_time()
+        try:
+            with medicao:
+                etapa.funcao()
+        finally:
+            custo = time.thread_time() - inicio
+            etapa.custo = custo if etapa.execucoes == 0 else 0.7 * etapa.custo + 0.3 * custo
+            etapa.execucoes += 1
+            etapa.ultima_execucao = agora
+            etapa.vencida_desde = None
+            fator = self.fator_saturacao if self.saturado and etapa.prioridade > 0 else 1.0
+            etapa.proxima = agora + etapa.intervalo * fator
+        return custo
+
+    def tick(self, carga=None, completo=False, agora=None):
+        """
+        Executa as etapas vencidas dentro do orçamento e retorna os nomes das
+        que rodaram. `carga` é uma função que devolve o uso de CPU do host (%)
+        medido mais recentemente; com `completo`, todas as etapas rodam.
+        """
+        if agora is None:
+            agora = time.monotonic()
+        orcamento = self.orcamento * self.intervalo_tick
+        if self.saturado:
+            orcamento *= 0.5
+        if self.segundo_plano is not None:
+            orcamento -= self.segundo_plano.descontar()
+        gasto = gasto_real = 0.0
+        executadas = []
+        for etapa in self.etapas:
+            if not completo and agora < etapa.proxima:
+                continue
+            # Fração do tick que a etapa consome em média, no seu intervalo
+            peso = self.intervalo_tick / etapa.intervalo
+            if not completo and etapa.prioridade > 0 and gasto + etapa.custo * peso > orcamento:
+                if etapa.vencida_desde is None:
+                    etapa.vencida_desde = agora
+                if agora - etapa.vencida_desde < self.atraso_maximo * etapa.intervalo:
+                    etapa.adiamentos += 1
+                    if self.perfil:
+                        self.perfil.contar(f"coleta.{etapa.nome}.adiamentos")
+                    continue
+            custo = self._executar(etapa, agora)
+            gasto += custo * peso
+            gasto_real += custo
+            executadas.append(etapa.nome)
+            if carga is not None and etapa.prioridade == 0:
+                # As etapas essenciais medem a carga do host antes das caras
+                self.saturado = bool(carga() >= self.limiar_saturacao)
+                if self.segundo_plano is not None:
+                    self.segundo_plano.sinalizar(self.saturado)
+        self.gasto_ultimo_tick = gasto_real
+        return executadas
+
+    def estado(self):
+        """
+        Situação de cada etapa, para exibição: intervalo, prioridade, custo
+        estimado, execuções, adiamentos e idade da última execução.
+        """
+        agora = time.monotonic()
+        return tuple(
+            {
+                "Etapa": etapa.nome,
+                "Prioridade": etapa.prioridade,
+                "Intervalo (s)": etapa.intervalo,
+                "Custo CPU (ms)": etapa.custo * 1000,
+                "Execuções": etapa.execucoes,
+                "Adiamentos": etapa.adiamentos,
+                "Idade (s)": agora - etapa.ultima_execucao if etapa.ultima_execucao is not None else None,
+            }
+            for etapa in self.etapas
+        )
@@ -0,0 +1,372 @@
+# historico.py
+
+from pathlib import Path
+import fcntl
+import mmap
+import os
+import threading
+import time
+
+import numpy as np
+
+# Layout do arquivo persistente (todos os campos little-endian, alinhados a 8 bytes):
+#   cabeçalho: magic, versão, nº de colunas, nº de camadas, nomes das colunas (16 bytes cada)
+#   por camada: resolução (f8), capacidade (u8), cursor (u8), quantidade (u8)
+#   dados: para cada camada, tempos (capacidade × f8) seguidos de valores (capacidade × colunas × f8)
+MAGIC = b"DASHHIST"
+VERSAO_ARQUIVO = 1
+TAMANHO_NOME = 16
+
+
+def interpretar_layout(conteudo):
+    """
+    Lê (colunas, metadados das camadas, início dos dados) de um arquivo de
+    histórico completo (bytes), ou None se não for um arquivo válido desta versão.
+    `metadados` tem uma linha por camada: resolução, capacidade, cursor, quantidade.
+    """
+    if len(conteudo) < 24 or conteudo[:8] != MAGIC:
+        return None
+    versao, n_colunas, n_camadas, _ = np.frombuffer(conteudo[8:24], dtype="<u4").tolist()
+    if versao != VERSAO_ARQUIVO:
+        return None
+    fim_nomes = 24 + TAMANHO_NOME * n_colunas
+    inicio_dados = fim_nomes + 32 * n_camadas
+    if len(conteudo) < inicio_dados:
+        return None
+    colunas = tuple(
+        conteudo[24 + TAMANHO_NOME * i:24 + TAMANHO_NOME * (i + 1)].rstrip(b"\0").decode(errors="replace")
+        for i in range(n_colunas)
+    )
+    meta = np.frombuffer(conteudo[fim_nomes:inicio_dados], dtype="<u8").reshape(n_camadas, 4)
+    if len(conteudo) != inicio_dados + int(sum(8 * cap * (1 + n_colunas) for cap in meta[:, 1].tolist())):
+        return None
+    return colunas, meta, inicio_dados
+
+
+# --- CAMADA DE UM RING BUFFER ---
+class CamadaHistorico:
+    """
+    Ring buffer pré-alocado de amostras (instante + uma coluna por métrica)
+    em uma única resolução.
+
+    Os buffers podem ser arrays comuns ou views sobre um arquivo mapeado em
+    memória; nesse caso `estado` ([cursor, quantidade]) também aponta para o
+    cabeçalho do arquivo.
+    """
+    def __init__(self, resolucao, capacidade, n_colunas, tempos=None, valores=None, estado=None):
+        """
+        Aloca os buffers da camada (ou adota os fornecidos).
+        """
+        self.resolucao = resolucao
+        self.capacidade = capacidade
+        self.tempos = tempos if tempos is not None else np.zeros(capacidade, dtype=np.float64)
+        self.valores = valores if valores is not None else np.zeros((capacidade, n_colunas), dtype=np.float64)
+        self._estado = estado if estado is not None else np.zeros(2, dtype=np.uint64)
+
+    @property
+    def cursor(self):
+        """Próxima posição de escrita."""
+        return int(self._estado[0])
+
+    @property
+    def quantidade(self):
+        """Amostras válidas (até a capacidade)."""
+        return int(self._estado[1])
+
+    def adicionar(self, instante, valores):
+        """
+        Grava uma amostra na posição do cursor, sobrescrevendo a mais antiga.
+
+        O registro é escrito antes de o cursor avançar: se o processo cair no
+        meio, o registro incompleto fica fora da janela válida.
+        """
+        cursor = self.cursor
+        self.tempos[cursor] = instante
+        self.valores[cursor] = valores
+        if self.quantidade < self.capacidade:
+            self._estado[1] += 1
+        self._estado[0] = (cursor + 1) % self.capacidade
+
+    def ultimas(self, n):
+        """
+        Retorna as n amostras mais recentes em ordem cronológica.
+        Sem volta do anel, devolve views dos buffers; caso contrário copia só a janela.
+        """
+        n = min(n, self.quantidade)
+        inicio = self.cursor - n
+        if inicio >= 0:
+            return self.tempos[inicio:self.cursor], self.valores[inicio:self.cursor]
+        return (
+            np.concatenate((self.tempos[inicio:], self.tempos[:self.cursor])),
+            np.concatenate((self.valores[inicio:], self.valores[:self.cursor])),
+        )
+
+    def desde(self, instante):
+        """
+        Retorna as amostras com tempo >= instante, em ordem cronológica.
+        """
+        # O anel é formado por dois trechos ordenados: busca em cada um, sem concatenar
+        if self.quantidade < self.capacidade:
+            trechos = (self.tempos[:self.quantidade],)
+        else:
+            trechos = (self.tempos[self.cursor:], self.tempos[:self.cursor])
+        n = sum(len(t) - int(np.searchsorted(t, instante, side="left")) for t in trechos)
+        return self.ultimas(n)
+
+
+# --- ARMAZENAMENTO MULTIRRESOLUÇÃO ---
+class HistoricoMetricas:
+    """
+    Séries temporais de métricas globais (CPU, memória, SWAP, rede) em camadas de
+    ring buffers de tamanho fixo.
+
+    A primeira camada guarda as amostras brutas; cada camada seguinte guarda a
+    média de baldes de tempo da sua resolução (rebaixamento automático). O
+    consumo de memória é fixo, independente do tempo de execução.
+
+    Com `caminho`, as camadas vivem em um arquivo binário de tamanho fixo
+    mapeado em memória: gravar uma amostra é só escrever no mapeamento (O(1),
+    sem serialização), e o histórico é recuperado ao reabrir o arquivo.
+    """
+    # Rede: MB/s recebidos/transmitidos, erros e descartes/s (sem "lo") e retransmissões TCP/s
+    COLUNAS_PADRAO = ("cpu", "mem", "swap", "rede_rx", "rede_tx", "rede_erros", "rede_descartes", "tcp_retrans")
+    # (resolução em segundos, capacidade): 10 min em 1 s, 24 h em 1 min, 30 dias em 1 h
+    CAMADAS_PADRAO = ((1, 600), (60, 1440), (3600, 720))
+
+    def __init__(self, colunas=COLUNAS_PADRAO, camadas=CAMADAS_PADRAO, caminho=None):
+        """
+        Aloca todas as camadas de uma vez, em memória ou no arquivo `caminho`.
+        """
+        self.colunas = tuple(colunas)
+        self._indice = {nome: i for i, nome in enumerate(self.colunas)}
+        self._lock = threading.Lock()
+        self._arquivo = None
+        self._mapa = None
+        self.caminho = None
+        if caminho is not None:
+            try:
+                self.camadas = self._mapear(Path(caminho), camadas)
+                self.caminho = Path(caminho)
+            except OSError:
+                # Arquivo inacessível ou já em uso por outro coletor: segue só em memória
+                self._fechar_arquivo()
+        if self._mapa is None:
+            self.camadas = [CamadaHistorico(res, cap, len(self.colunas)) for res, cap in camadas]
+        # Acumuladores dos baldes em andamento das camadas agregadas
+        self._somas = np.zeros((len(self.camadas), len(self.colunas)), dtype=np.float64)
+        # Contagem por coluna: amostras NaN (métrica ainda sem valor) ficam fora da média
+        self._contagens = np.zeros((len(self.camadas), len(self.colunas)), dtype=np.int64)
+        self._baldes = [None] * len(self.camadas)
+
+    def _cabecalho(self, camadas):
+        """
+        Monta o cabeçalho esperado para estas colunas e camadas (sem os cursores).
+        """
+        partes = [
+            MAGIC,
+            np.array([VERSAO_ARQUIVO, len(self.colunas), len(camadas), 0], dtype="<u4").tobytes(),
+        ]
+        for nome in self.colunas:
+            partes.append(nome.encode()[:TAMANHO_NOME].ljust(TAMANHO_NOME, b"\0"))
+        return b"".join(partes)
+
+    def _mapear(self, caminho, camadas):
+        """
+        Abre (ou cria) o arquivo de histórico e monta as camadas sobre o mapeamento.
+        Um arquivo com layout diferente do esperado é recriado; se só as
+        colunas mudaram, as colunas em comum são migradas (ver _migrar).
+        """
+        n_colunas = len(self.colunas)
+        fixo = self._cabecalho(camadas)
+        tamanho_cabecalho = len(fixo) + 32 * len(camadas)
+        tamanho = tamanho_cabecalho + sum(8 * cap * (1 + n_colunas) for _, cap in camadas)
+
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._arquivo = os.fdopen(os.open(caminho, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        # Um único escritor por arquivo
+        fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        self._arquivo.seek(0)
+        existente = self._arquivo.read(tamanho_cabecalho)
+        valido = os.fstat(self._arquivo.fileno()).st_size == tamanho and existente[:len(fixo)] == fixo
+        if valido:
+            meta = np.frombuffer(existente[len(fixo):], dtype="<u8").reshape(len(camadas), 4)
+            valido = (
+                np.array_equal(meta.view("<f8")[:, 0], [res for res, _ in camadas])
+                and np.array_equal(meta[:, 1], [cap for _, cap in camadas])
+                and bool(np.all(meta[:, 2] < meta[:, 1]))
+                and bool(np.all(meta[:, 3] <= meta[:, 1]))
+            )
+        antigo = None
+        if not valido:
+            self._arquivo.seek(0)
+            antigo = self._arquivo.read()
+            self._arquivo.truncate(0)
+            self._arquivo.truncate(tamanho)
+            self._arquivo.seek(0)
+            self._arquivo.write(fixo)
+            meta = np.zeros((len(camadas), 4), dtype="<u8")
+            meta_f = meta.view("<f8")
+            for i, (res, cap) in enumerate(camadas):
+                meta_f[i, 0] = res
+                meta[i, 1] = cap
+            self._arquivo.write(meta.tobytes())
+            self._arquivo.flush()
+
+        self._mapa = mmap.mmap(self._arquivo.fileno(), tamanho)
+        meta = np.ndarray((len(camadas), 4), dtype="<u8", buffer=self._mapa, offset=len(fixo))
+        resultado = []
+        deslocamento = tamanho_cabecalho
+        for i, (res, cap) in enumerate(camadas):
+            tempos = np.ndarray((cap,), dtype="<f8", buffer=self._mapa, offset=deslocamento)
+            deslocamento += 8 * cap
+            valores = np.ndarray((cap, n_colunas), dtype="<f8", buffer=self._mapa, offset=deslocamento)
+            deslocamento += 8 * cap * n_colunas
+            resultado.append(CamadaHistorico(res, cap, n_colunas, tempos, valores, meta[i, 2:4]))
+        if antigo:
+            self._migrar(antigo, resultado)
+        return resultado
+
+    def _migrar(self, antigo, camadas):
+        """
+        Copia para as camadas novas as amostras de um arquivo antigo (bytes)
+        com as mesmas camadas mas outras colunas: tempos, cursores e as
+        colunas em comum; as colunas novas ficam NaN nas amostras antigas.
+        Camadas de resolução ou capacidade diferente começam vazias.
+        """
+        layout = interpretar_layout(antigo)
+        if layout is None:
+            return
+        colunas_antigas, meta, deslocamento = layout
+        n_antigas = len(colunas_antigas)
+        indice_antigo = {nome: i for i, nome in enumerate(colunas_antigas)}
+        comuns = [(j, indice_antigo[nome]) for j, nome in enumerate(self.colunas) if nome in indice_antigo]
+        resolucoes = meta.view("<f8")[:, 0]
+        for i, (res_antiga, cap, cursor, quantidade) in enumerate(zip(resolucoes.tolist(), *meta[:, 1:].T.tolist())):
+            tempos = np.frombuffer(antigo, dtype="<f8", count=cap, offset=deslocamento)
+            deslocamento += 8 * cap
+            valores = np.frombuffer(antigo, dtype="<f8", count=cap * n_antigas, offset=deslocamento)
+            deslocamento += 8 * cap * n_antigas
+            if i >= len(camadas) or camadas[i].resolucao != res_antiga or camadas[i].capacidade != cap:
+                continue
+            if cursor >= cap or quantidade > cap:
+                continue
+            camada = camadas[i]
+            valores = valores.reshape(cap, n_antigas)
+            camada.tempos[:] = tempos
+            camada.valores[:] = np.nan
+            for j, k in comuns:
+                camada.valores[:, j] = valores[:, k]
+            camada._estado[:] = (cursor, quantidade)
+
+    def sincronizar(self):
+        """
+        Força a gravação do mapeamento em disco (não é necessário a cada amostra).
+        """
+        with self._lock:
+            if self._mapa is not None:
+                self._mapa.flush()
+
+    def _fechar_arquivo(self):
+        """
+        Libera o mapeamento e o arquivo, se houver.
+        """
+        self._mapa = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def close(self):
+        """
+        Sincroniza e fecha o arquivo de histórico. O armazenamento não deve ser
+        usado depois disso.
+        """
+        with self._lock:
+            if self._mapa is not None:
+                self._mapa.flush()
+                # Os arrays das camadas apontam para o mapeamento: troca por cópias
+                for camada in self.camadas:
+                    camada.tempos = camada.tempos.copy()
+                    camada.valores = camada.valores.copy()
+                    camada._estado = camada._estado.copy()
+                try:
+                    self._mapa.close()
+                except BufferError:
+                    # Ainda há views exportadas; o mapeamento é liberado pelo GC
+                    pass
+            self._fechar_arquivo()
+
+    def registrar(self, valores, instante=None):
+        """
+        Registra uma amostra. `valores` é um dict {coluna: valor}; colunas
+        ausentes ou com valor None ficam como NaN.
+        """
+        if instante is None:
+            instante = time.time()
+        linha = np.full(len(self.colunas), np.nan)
+        for nome, valor in valores.items():
+            i = self._indice.get(nome)
+            if i is not None and valor is not None:
+                linha[i] = valor
+
+        with self._lock:
+            self.camadas[0].adicionar(instante, linha)
+            for n in range(1, len(self.camadas)):
+                self._acumular(n, instante, linha)
+
+    def _acumular(self, n, instante, linha):
+        """
+        Soma a amostra ao balde corrente da camada n e, quando o balde fecha,
+        grava a média na camada.
+        """
+        camada = self.camadas[n]
+        balde = int(instante // camada.resolucao)
+        if self._baldes[n] is not None and balde != self._baldes[n] and self._contagens[n].any():
+            contagens = self._contagens[n]
+            media = np.where(contagens > 0, self._somas[n] / np.maximum(contagens, 1), np.nan)
+            camada.adicionar(self._baldes[n] * camada.resolucao, media)
+            self._somas[n] = 0.0
+            self._contagens[n] = 0
+        self._baldes[n] = balde
+        validos = ~np.isnan(linha)
+        self._somas[n][validos] += linha[validos]
+        self._contagens[n] += validos
+
+    def camada_para(self, segundos):
+        """
+        Escolhe a camada mais fina cuja cobertura alcança a janela pedida.
+        """
+        for camada in self.camadas:
+            if camada.quantidade < camada.capacidade:
+                # Camada ainda não encheu: cobre tudo desde a primeira amostra
+                return camada
+            if camada.resolucao * camada.capacidade >= segundos:
+                return camada
+        return self.camadas[-1]
+
+    def consultar(self, colunas=None, segundos=600, agora=None):
+        """
+        Retorna (tempos, valores) dos últimos `segundos`, na resolução adequada.
+        `valores` tem uma coluna por nome em `colunas` (todas, por padrão).
+        Só a janela pedida é copiada, nunca o histórico inteiro.
+        """
+        if agora is None:
+            agora = time.time()
+        with self._lock:
+            camada = self.camada_para(segundos)
+            tempos, valores = camada.desde(agora - segundos)
+            if colunas is not None:
+                valores = valores[:, [self._indice[c] for c in colunas]]
+            else:
+                valores = valores.copy()
+            return tempos.copy(), valores
+
+    def ultimo(self, coluna):
+        """
+        Retorna o valor mais recente de uma coluna (NaN se não houver amostras).
+        """
+        with self._lock:
+            _, valores = self.camadas[0].ultimas(1)
+            if len(valores) == 0:
+                return float("nan")
+            return float(valores[-1, self._indice[coluna]])
@@ -2,16 +2,16 @@
 
 import time
 import streamlit as st
-from controller import executarDashboard
+from controller import executarDashboard, intervaloAtualizacao
 from streamlit_autorefresh import st_autorefresh
 
 # Mova st.set_page_config para o início do main.py
 st.set_page_config(page_title="Dashboard de Processos", layout="wide", initial_sidebar_state="collapsed")
 
 if __name__ == "__main__":
-    # Configura o autorefresh para re-executar o script a cada 5 segundos (5000 ms)
-    # Você pode alterar o valor do 'interval' para controlar a frequência
-    st_autorefresh(interval=2000, key="dashboard_autorefresh")
+    # Configura o autorefresh para re-executar o script a cada 2 segundos (2000 ms),
+    # ou 4 segundos com o host saturado (ver controller.intervaloAtualizacao)
+    st_autorefresh(interval=intervaloAtualizacao(), key="dashboard_autorefresh")
 
     executarDashboard()
     # A linha time.sleep(2) e o while True devem ser removidos,
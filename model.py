@@ -1,8 +1,41 @@
 from pathlib import Path
+from types import MappingProxyType
+from operator import attrgetter
+import os
 import time
 import threading
-import json
-import subprocess
+import select
+
+import numpy as np
+import pandas as pd
+
+from historico import HistoricoMetricas
+from descritores import CATEGORIAS_DESCRITORES, IndiceReverso, InspetorDescritores, varrer_descritores
+from navegador import MotorTamanhos, NavegadorArquivos
+from escalonador import Escalonador, OrcamentoSegundoPlano
+from perfil import PERFIL
+from usuarios import NOMES_USUARIOS
+from entrada_saida import TaxasDiscos, TaxasIOProcessos
+from rede import TaxasRede
+
+# Tamanho da página de memória em kB (RSS em /proc/<pid>/stat vem em páginas)
+PAGINA_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+# Ticks de CPU por segundo (unidade de utime/stime em /proc/<pid>/stat)
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+# Arquivo do histórico persistente de métricas (pode ser trocado pela variável de ambiente)
+CAMINHO_HISTORICO = os.environ.get(
+    "DASHBOARD_HISTORICO", str(Path(__file__).parent / "historico_metricas.bin")
+)
+
+# Raiz do procfs lida pelos coletores (ex.: /host/proc em contêiner, ou uma árvore sintética)
+RAIZ_PROC = os.environ.get("DASHBOARD_PROC", "/proc")
+
+# Orçamento de descritores persistentes para /proc/<pid>/stat (0 desativa o caminho rápido)
+LIMITE_FDS_PROC = int(os.environ.get("DASHBOARD_LIMITE_FDS", "0"))
+
+# Fração de um núcleo que a coleta pode gastar por tick (ver Escalonador)
+ORCAMENTO_CPU = float(os.environ.get("DASHBOARD_ORCAMENTO_CPU", "0.1"))
 
 # --- CLASSE Processo ---
 class Processo:
@@ -10,11 +43,16 @@ class Processo:
     Representa um processo individual do sistema, coletando informações detalhadas
     a partir do sistema de arquivos virtual /proc do Linux.
     """
-    def __init__(self, pid):
+    # Milhares de instâncias vivem na tabela de processos: sem __dict__ por objeto
+    __slots__ = ('pid', 'proc', 'ppid', 'name', 'estado', 'uid', 'cpuUserTick', 'cpuSysTick',
+                 'threads', 'commandCMD', 'memoriaKB', 'user_display', 'starttime')
+
+    def __init__(self, pid, proc=RAIZ_PROC):
         """
         Inicializa uma nova instância de Processo.
         """
         self.pid = pid
+        self.proc = proc
         self.ppid = 0
         self.name = ''
         self.estado = ''
@@ -25,13 +63,14 @@ class Processo:
         self.commandCMD = ''
         self.memoriaKB = 0
         self.user_display = ''
+        self.starttime = 0
 
     def cmdLine(self):
         """
         Lê a linha de comando completa utilizada para iniciar o processo.
         """
         try:
-            cmd_path = f'/proc/{self.pid}/cmdline'
+            cmd_path = f'{self.proc}/{self.pid}/cmdline'
             with open(cmd_path, 'r') as f:
                 conteudo = f.read()
                 self.commandCMD = conteudo.replace('\x00', ' ').strip()
@@ -44,46 +83,33 @@ class Processo:
 
     def tempoDeCPU(self):
         """
-        Lê os ticks de CPU gastos pelo processo.
+        Lê os ticks de CPU gastos pelo processo (e os demais campos voláteis de /stat).
         """
-        path_cpu = f'/proc/{self.pid}/stat'
-        try:
-            with open(path_cpu, 'r') as f:
-                valores = f.read().split()
-                if len(valores) > 14:
-                    self.cpuUserTick = int(valores[13])
-                    self.cpuSysTick = int(valores[14])
-                else:
-                    self.cpuUserTick = 0
-                    self.cpuSysTick = 0
-        except (FileNotFoundError, ValueError, IndexError):
-            self.cpuUserTick = 0
-            self.cpuSysTick = 0
-        except Exception:
+        campos = ler_stat_processo(self.pid, proc=self.proc)
+        if campos is None:
             self.cpuUserTick = 0
             self.cpuSysTick = 0
+        else:
+            self.aplicarStat(campos)
+
+    def aplicarStat(self, campos):
+        """
+        Atualiza os campos voláteis a partir de uma leitura de /proc/<pid>/stat.
+        """
+        (self.estado, self.ppid, self.cpuUserTick, self.cpuSysTick,
+         self.threads, self.starttime, self.memoriaKB) = campos
 
     def statusProcesso(self):
         """
         Lê informações de status do processo.
         """
-        status_path = f'/proc/{self.pid}/status'
+        status_path = f'{self.proc}/{self.pid}/status'
         try:
-            with open(status_path, 'r') as f:
-                for linha in f:
-                    if linha.startswith("Name:"):
-                        self.name = linha.split()[1]
-                    elif linha.startswith("PPid:"):
-                        self.ppid = int(linha.split()[1])
-                    elif linha.startswith("Uid:"):
-                        self.uid = int(linha.split()[1])
-                        self.user_display = str(self.uid)
-                    elif linha.startswith("State:"):
-                        self.estado = linha.split()[1]
-                    elif linha.startswith("Threads:"):
-                        self.threads = int(linha.split()[1])
-                    elif linha.startswith("VmRSS:"):
-                        self.memoriaKB = int(linha.split()[1])
+            with open(status_path, 'rb') as f:
+                conteudo = f.read()
+            (self.name, self.estado, self.ppid, self.uid,
+             self.threads, self.memoriaKB) = interpretar_status(conteudo)
+            self.user_display = NOMES_USUARIOS.nome(self.uid)
         except FileNotFoundError:
             self.name = '[Encerrado]'
             self.estado = 'Z'
@@ -129,44 +155,239 @@ class Processo:
 
 # --- FUNÇÕES AUXILIARES ---
 
-def uso_cpu_percent_internal(last_total, last_idle):
+# --- PARSERS DE /proc ---
+# Trabalham direto sobre bytes e extraem só os campos usados, sem decodificar
+# nem quebrar o arquivo inteiro em linhas ou palavras.
+
+def interpretar_stat(conteudo):
     """
-    Calcula o uso percentual da CPU do sistema.
+    Extrai os campos voláteis do conteúdo (bytes) de /proc/<pid>/stat:
+    (estado, ppid, utime, stime, threads, starttime, rss_kb).
     """
-    def ler_cpu():
-        """Lê os ticks de CPU atuais de /proc/stat."""
+    # O nome (campo 2) pode conter espaços e parênteses: divide após o último ')'.
+    # maxsplit=22 para no campo 24 (rss); o restante da linha fica em um único pedaço.
+    valores = conteudo[conteudo.rindex(b')') + 2:].split(None, 22)
+    return (
+        valores[0].decode(),     # 3  state
+        int(valores[1]),         # 4  ppid
+        int(valores[11]),        # 14 utime
+        int(valores[12]),        # 15 stime
+        int(valores[17]),        # 20 num_threads
+        int(valores[19]),        # 22 starttime
+        int(valores[21]) * PAGINA_KB,  # 24 rss (páginas)
+    )
+
+def _campo_status(conteudo, chave, padrao=None):
+    """
+    Retorna o primeiro valor da linha `chave` (ex.: b"\nUid:") de um arquivo status.
+    """
+    inicio = conteudo.find(chave)
+    if inicio < 0:
+        if padrao is None:
+            raise ValueError(f"campo {chave!r} ausente")
+        return padrao
+    inicio += len(chave)
+    return conteudo[inicio:conteudo.find(b"\n", inicio)].split(None, 1)[0]
+
+def interpretar_status(conteudo):
+    """
+    Extrai (nome, estado, ppid, uid, threads, rss_kb) do conteúdo (bytes) de
+    /proc/<pid>/status. Threads de kernel não têm VmRSS: o RSS fica 0.
+    """
+    # Name é sempre a primeira linha e pode conter espaços
+    fim_nome = conteudo.index(b"\n")
+    nome = conteudo[5:fim_nome].strip().decode(errors="replace")
+    return (
+        nome,
+        _campo_status(conteudo, b"\nState:").decode(),
+        int(_campo_status(conteudo, b"\nPPid:")),
+        int(_campo_status(conteudo, b"\nUid:")),
+        int(_campo_status(conteudo, b"\nThreads:")),
+        int(_campo_status(conteudo, b"\nVmRSS:", b"0")),
+    )
+
+def ler_stat_processo(pid, descritores=None, proc=RAIZ_PROC):
+    """
+    Lê /proc/<pid>/stat e devolve os campos voláteis do processo
+    (ver interpretar_stat). Com `descritores` (CacheDescritoresProc), usa o
+    descritor persistente do PID em vez de abrir o arquivo.
+    Retorna None se o processo não existir mais ou a leitura falhar.
+    """
+    try:
+        if descritores is not None:
+            conteudo = descritores.ler_stat(pid)
+            if conteudo is None:
+                return None
+        else:
+            with open(f'{proc}/{pid}/stat', 'rb') as f:
+                conteudo = f.read()
+        return interpretar_stat(conteudo)
+    except (FileNotFoundError, ProcessLookupError, ValueError, IndexError):
+        return None
+    except Exception:
+        return None
+
+class CacheDescritoresProc:
+    """
+    Mantém abertos os descritores de /proc/<pid>/stat de um conjunto fixo de
+    PIDs "quentes" e relê cada um com pread em um buffer reutilizado, sem
+    open/close por ciclo.
+
+    Um PID só ganha descritor se já estava vivo na passada anterior (processo
+    de vida longa) e ainda houver orçamento; os demais usam a leitura comum.
+    Nada é despejado para abrir espaço: como os PIDs são percorridos sempre na
+    mesma ordem, um despejo em ciclo (LRU) zeraria os acertos assim que o
+    número de PIDs passasse do limite. Descritores de processos encerrados são
+    fechados em descartar(), liberando vaga para outro PID de vida longa.
+    """
+    TAMANHO_BUFFER = 4096
+
+    def __init__(self, limite=1024, proc=RAIZ_PROC):
+        """
+        Inicializa o cache. O limite é reduzido se exceder metade do RLIMIT_NOFILE.
+        """
+        self.proc = proc
         try:
-            with open("/proc/stat", "r") as f:
-                linha = f.readline()
-                campos = list(map(int, linha.strip().split()[1:]))
-                total = sum(campos)
-                idle = campos[3] if len(campos) > 3 else 0
-                return total, idle
-        except (FileNotFoundError, IndexError, ValueError):
-            return 0, 0
-
-    current_total, current_idle = ler_cpu()
-
-    if last_total == 0:
-        return 0.0, 100.0, current_total, current_idle
-
-    total_diff = current_total - last_total
-    idle_diff = current_idle - last_idle
-
-    if total_diff > 0:
-        usage_percent = 100.0 * (total_diff - idle_diff) / total_diff
-        idle_percent = 100.0 - usage_percent
-        return usage_percent, idle_percent, current_total, current_idle
-    
-    return 0.0, 100.0, current_total, current_idle
+            import resource
+            flexivel, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+            if flexivel != resource.RLIM_INFINITY:
+                limite = min(limite, flexivel // 2)
+        except (ImportError, ValueError, OSError):
+            pass
+        self.limite = max(0, limite)
+        self._fds = {}
+        self._vistos = set()  # PIDs vivos na passada anterior (candidatos a descritor)
+        self._buffer = bytearray(self.TAMANHO_BUFFER)
+        self._view = memoryview(self._buffer)
+
+    def __len__(self):
+        return len(self._fds)
+
+    def ler_stat(self, pid):
+        """
+        Retorna o conteúdo atual de /proc/<pid>/stat (bytes), ou None se o
+        processo terminou. PIDs fora do conjunto fixo usam uma leitura comum.
+        """
+        fd = self._fds.get(pid)
+        novo = fd is None
+        if novo:
+            if len(self._fds) >= self.limite or pid not in self._vistos:
+                with open(f'{self.proc}/{pid}/stat', 'rb') as f:
+                    return f.read()
+            fd = os.open(f'{self.proc}/{pid}/stat', os.O_RDONLY | os.O_CLOEXEC)
+            self._fds[pid] = fd
+
+        try:
+            n = os.preadv(fd, [self._buffer], 0)
+        except (ProcessLookupError, OSError):
+            n = 0
+        if n == 0:
+            # O processo deste descritor terminou (o PID pode ter sido reutilizado)
+            self._fechar(pid)
+            if novo:
+                return None
+            return self.ler_stat(pid)
+        return bytes(self._view[:n])
+
+    def _fechar(self, pid):
+        """
+        Fecha e esquece o descritor de um PID.
+        """
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+
+    def descartar(self, vivos):
+        """
+        Fecha os descritores de PIDs que não estão em `vivos` e guarda os vivos
+        como candidatos a descritor na próxima passada.
+        """
+        for pid in [pid for pid in self._fds if pid not in vivos]:
+            self._fechar(pid)
+        self._vistos = set(vivos)
+
+    def close(self):
+        """
+        Fecha todos os descritores.
+        """
+        for pid in list(self._fds):
+            self._fechar(pid)
+
+# Modos de /proc/stat considerados no total (guest e guest_nice já estão em user e nice)
+MODOS_CPU = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+
+def ler_ticks_cpu(proc=RAIZ_PROC):
+    """
+    Lê /proc/stat uma única vez e devolve os ticks de todas as linhas "cpu"
+    como array 2-D (linha 0 = agregado, linhas seguintes = cpu0..cpuN; uma
+    coluna por modo de MODOS_CPU).
+    """
+    with open(f"{proc}/stat", "rb") as f:
+        dados = f.read()
+    linhas = [linha.split()[1:len(MODOS_CPU) + 1] for linha in dados.splitlines() if linha.startswith(b"cpu")]
+    return np.array(linhas, dtype=np.int64)
+
+class AmostradorCPU:
+    """
+    Calcula o uso de CPU agregado, por núcleo e por modo a partir da diferença
+    entre duas leituras de /proc/stat, em um único passo vetorizado.
+    """
+    def __init__(self, proc=RAIZ_PROC):
+        """
+        Faz a leitura inicial de referência.
+        """
+        self.proc = proc
+        self._anterior = None
+        try:
+            self._anterior = ler_ticks_cpu(proc)
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def nucleos(self):
+        """Número de núcleos listados em /proc/stat na última leitura."""
+        return 0 if self._anterior is None else len(self._anterior) - 1
+
+    def amostrar(self):
+        """
+        Retorna (uso_total, ocioso_total, pct_modos), onde pct_modos é um array
+        (núcleos × modos) com o percentual de cada modo por núcleo.
+        Ocupado = tudo exceto idle e iowait.
+        """
+        try:
+            atual = ler_ticks_cpu(self.proc)
+        except (OSError, ValueError):
+            return 0.0, 100.0, np.zeros((0, len(MODOS_CPU)))
+
+        anterior, self._anterior = self._anterior, atual
+        if anterior is None or anterior.shape != atual.shape:
+            # Primeira leitura ou núcleos adicionados/removidos: sem base de comparação
+            return 0.0, 100.0, np.zeros((len(atual) - 1, len(MODOS_CPU)))
+
+        delta = np.maximum(atual - anterior, 0)
+        totais = delta.sum(axis=1, keepdims=True)
+        pct = np.divide(100.0 * delta, totais, out=np.zeros(delta.shape), where=totais > 0)
+        ocioso = pct[:, MODOS_CPU.index("idle")] + pct[:, MODOS_CPU.index("iowait")]
+        if totais[0, 0] == 0:
+            return 0.0, 100.0, pct[1:]
+        return 100.0 - ocioso[0], ocioso[0], pct[1:]
 
-def info_memoria():
+def uso_por_nucleo(pct_modos):
+    """
+    Percentual ocupado de cada núcleo a partir de pct_modos (núcleos × modos).
+    """
+    if len(pct_modos) == 0:
+        return pct_modos[:, 0]
+    ocioso = pct_modos[:, MODOS_CPU.index("idle")] + pct_modos[:, MODOS_CPU.index("iowait")]
+    return np.where(pct_modos.sum(axis=1) > 0, 100.0 - ocioso, 0.0)
+
+def info_memoria(proc=RAIZ_PROC):
     """
     Coleta informações sobre o uso de memória RAM e SWAP.
     """
     info = {}
     try:
-        with open("/proc/meminfo", "r") as f:
+        with open(f"{proc}/meminfo", "r") as f:
             for linha in f:
                 partes = linha.split()
                 if len(partes) > 1:
@@ -187,6 +408,7 @@ def info_memoria():
         # Calcula os valores de SWAP
         swap_total = info.get('SwapTotal', 0)
         swap_usada = swap_total - info.get('SwapFree', 0) if swap_total > 0 else 0
+        swap_percent = 100 * (swap_usada / swap_total) if swap_total > 0 else 0
 
         return {
             "MemTotal": mem_total,
@@ -196,224 +418,657 @@ def info_memoria():
             "mem_usada_percent": mem_percent,
             "SwapTotal": swap_total,
             "swap_total": swap_total,
-            "swap_usada": swap_usada
+            "swap_usada": swap_usada,
+            "swap_usada_percent": swap_percent
         }
     except FileNotFoundError:
         return {}
     except Exception:
         return {}
 
-def total_processos_threads():
+def pids_em_proc(proc=RAIZ_PROC):
+    """
+    Enumera os PIDs presentes em /proc em uma única passada com os.scandir.
+    """
+    with os.scandir(proc) as entradas:
+        return [int(e.name) for e in entradas if e.name.isdigit()]
+
+def total_processos_threads(proc=RAIZ_PROC):
     """
     Conta o número total de processos e threads ativas no sistema.
     """
     total_threads = 0
     total_processos = 0
 
-    proc = Path('/proc')
     try:
-        for p in proc.iterdir():
-            if p.is_dir() and p.name.isdigit():
-                total_processos += 1
-                try:
-                    with open(p / "status", "r") as f:
-                        for linha in f:
-                            if linha.startswith("Threads:"):
-                                total_threads += int(linha.split()[1])
-                                break
-                except (FileNotFoundError, ValueError, IndexError):
-                    continue
-                except Exception:
-                    continue
+        for pid in pids_em_proc(proc):
+            campos = ler_stat_processo(pid, proc=proc)
+            if campos is None:
+                continue
+            total_processos += 1
+            total_threads += campos[4]
     except Exception:
         return 0, 0
 
     return total_processos, total_threads
 
-def listaProcessos():
+class TabelaProcessos:
+    """
+    Tabela persistente de processos, indexada por (pid, starttime).
+
+    Campos estáticos (nome, uid, linha de comando) são lidos uma única vez,
+    quando o processo aparece. Nos ciclos seguintes apenas /proc/<pid>/stat é
+    relido para atualizar os campos voláteis. Um PID reutilizado é detectado
+    pela mudança de starttime; PIDs encerrados são removidos da tabela.
+
+    Uma única passada sobre o /proc produz a lista de processos e os totais de
+    processos e threads, que por isso são sempre consistentes entre si.
+
+    Para o snapshot, quadro() exporta a tabela em formato colunar (DataFrame),
+    sem criar um objeto ou dicionário por linha.
+
+    Com limite_fds > 0, os arquivos stat são relidos por descritores
+    persistentes (CacheDescritoresProc) em vez de abertos a cada ciclo.
+    """
+    def __init__(self, limite_fds=0, proc=RAIZ_PROC):
+        """
+        Inicializa a tabela vazia.
+        """
+        self.proc = proc
+        self._processos = {}
+        self._descritores = CacheDescritoresProc(limite_fds, proc) if limite_fds > 0 else None
+        self.total_processos = 0
+        self.total_threads = 0
+        self.novos = 0  # Processos lidos por completo na última passada
+        # Amostra anterior para o cálculo de %CPU: chaves ordenadas e ticks
+        self._chaves_ant = np.empty(0, dtype=np.int64)
+        self._user_ant = np.empty(0, dtype=np.int64)
+        self._sys_ant = np.empty(0, dtype=np.int64)
+        self._instante_ant = None
+        # Última passada: lista de processos e colunas já calculadas
+        self._lista = []
+        self._colunas = {}
+
+    def __len__(self):
+        return len(self._processos)
+
+    def atualizar(self):
+        """
+        Atualiza a tabela com o estado atual do /proc e retorna a lista de processos.
+        Os totais de processos e threads da mesma passada ficam em
+        total_processos e total_threads.
+        """
+        instante = time.monotonic()
+        try:
+            pids = pids_em_proc(self.proc)
+        except Exception:
+            return list(self._processos.values())
+
+        anteriores = self._processos
+        atuais = {}
+        total_threads = 0
+        novos = 0
+        for pid in pids:
+            campos = ler_stat_processo(pid, self._descritores, self.proc)
+            if campos is None:
+                continue  # Encerrou entre a listagem e a leitura
+            p = anteriores.get(pid)
+            if p is None or p.starttime != campos[5]:
+                # PID novo (ou reutilizado): paga o custo completo uma única vez
+                p = Processo(pid, self.proc)
+                p.statusProcesso()
+                if p.name in ('[Encerrado]', '[Erro]'):
+                    continue
+                p.cmdLine()
+                novos += 1
+            p.aplicarStat(campos)
+            atuais[pid] = p
+            total_threads += p.threads
+        self._processos = atuais
+        if self._descritores is not None:
+            self._descritores.descartar(atuais)
+        self.total_processos = len(atuais)
+        self.total_threads = total_threads
+        self.novos = novos
+        lista = list(atuais.values())
+        self._lista = lista
+        self._calcular_cpu_percent(lista, instante)
+        return lista
+
+    def _calcular_cpu_percent(self, lista, instante):
+        """
+        Calcula %CPU (user, sistema e total) de todos os processos de uma vez,
+        a partir da diferença de ticks em relação à amostra anterior.
+        100% equivale a um núcleo inteiro, como no top.
+        """
+        n = len(lista)
+        pids = np.fromiter((p.pid for p in lista), dtype=np.int64, count=n)
+        inicio = np.fromiter((p.starttime for p in lista), dtype=np.int64, count=n)
+        user = np.fromiter((p.cpuUserTick for p in lista), dtype=np.int64, count=n)
+        sist = np.fromiter((p.cpuSysTick for p in lista), dtype=np.int64, count=n)
+        chaves = chave_processo(pids, inicio)
+
+        pct_user = np.zeros(n)
+        pct_sys = np.zeros(n)
+        if self._instante_ant is not None and len(self._chaves_ant) > 0:
+            intervalo = instante - self._instante_ant
+            if intervalo > 0:
+                # Casa cada processo com sua amostra anterior pela chave (pid, starttime)
+                idx = np.searchsorted(self._chaves_ant, chaves)
+                idx = np.minimum(idx, len(self._chaves_ant) - 1)
+                casou = self._chaves_ant[idx] == chaves
+                escala = 100.0 / (CLK_TCK * intervalo)
+                pct_user = np.where(casou, (user - self._user_ant[idx]) * escala, 0.0)
+                pct_sys = np.where(casou, (sist - self._sys_ant[idx]) * escala, 0.0)
+                np.maximum(pct_user, 0.0, out=pct_user)
+                np.maximum(pct_sys, 0.0, out=pct_sys)
+        pct_total = pct_user + pct_sys
+
+        self._colunas = {
+            "PID": pids,
+            "CPU %": pct_total,
+            "CPU User %": pct_user,
+            "CPU Sis %": pct_sys,
+            "CPU (User)": user,
+            "CPU (Kernel)": sist,
+        }
+
+        ordem = np.argsort(chaves)
+        self._chaves_ant = chaves[ordem]
+        self._user_ant = user[ordem]
+        self._sys_ant = sist[ordem]
+        self._instante_ant = instante
+
+    def quadro(self):
+        """
+        Retorna a última passada como DataFrame colunar (COLUNAS_PROCESSOS).
+        """
+        lista = self._lista
+        n = len(lista)
+
+        def numerica(atributo):
+            return np.fromiter(map(attrgetter(atributo), lista), dtype=np.int64, count=n)
+
+        def texto(atributo):
+            return pd.array(list(map(attrgetter(atributo), lista)), dtype="string[pyarrow]")
+
+        # PID, %CPU e ticks já foram montados em _calcular_cpu_percent
+        colunas = dict(self._colunas)
+        if not colunas:
+            vazio = np.zeros(0)
+            colunas = {nome: vazio for nome in ("PID", "CPU %", "CPU User %", "CPU Sis %", "CPU (User)", "CPU (Kernel)")}
+        uids = numerica("uid")
+        colunas.update({
+            "Nome": texto("name"),
+            "Status": texto("estado"),
+            "PPID": numerica("ppid"),
+            "UID": uids,
+            "Threads": numerica("threads"),
+            "RAM (KB)": numerica("memoriaKB"),
+            # Nomes resolvidos a cada passada: refletem mudanças no /etc/passwd
+            "Usuário": NOMES_USUARIOS.nomes(uids),
+            "Comando": texto("commandCMD"),
+        })
+        return pd.DataFrame({nome: colunas[nome] for nome in COLUNAS_PROCESSOS}, copy=False)
+
+# Colunas do snapshot de processos, na ordem de exibição
+COLUNAS_PROCESSOS = (
+    "PID", "Nome", "Status", "CPU %", "CPU User %", "CPU Sis %", "PPID", "UID",
+    "Threads", "CPU (User)", "CPU (Kernel)", "RAM (KB)", "Usuário", "Comando",
+)
+
+def processos_vazio():
+    """
+    DataFrame de processos vazio, com as colunas do snapshot.
+    """
+    return TabelaProcessos().quadro()
+
+def agregar_por_usuario(processos):
+    """
+    Consumo por usuário numa única passada agrupada: processos, threads, RAM
+    e %CPU somados, do maior consumo de CPU para o menor.
+    """
+    agregado = processos.groupby("Usuário", observed=True, sort=False).agg(
+        Processos=("PID", "size"),
+        Threads=("Threads", "sum"),
+        **{"RAM (KB)": ("RAM (KB)", "sum"), "CPU %": ("CPU %", "sum")},
+    )
+    return agregado.sort_values(["CPU %", "RAM (KB)"], ascending=False).reset_index()
+
+def filtrar_processos(processos, texto="", usuario=None, estados=None):
+    """
+    Posições (no quadro) dos processos que passam pelos filtros. `texto`
+    procura (sem diferenciar maiúsculas) em Nome e Comando.
+    """
+    mascara = np.ones(len(processos), dtype=bool)
+    if texto:
+        mascara &= (
+            processos["Nome"].str.contains(texto, case=False, regex=False)
+            | processos["Comando"].str.contains(texto, case=False, regex=False)
+        ).to_numpy(dtype=bool, na_value=False)
+    if usuario is not None:
+        mascara &= (processos["Usuário"] == usuario).to_numpy(dtype=bool, na_value=False)
+    if estados:
+        mascara &= processos["Status"].isin(estados).to_numpy(dtype=bool)
+    return np.flatnonzero(mascara)
+
+def consultar_processos(processos, ordenar_por="CPU %", decrescente=True, texto="", usuario=None,
+                        estados=None, pagina=0, tamanho_pagina=100, limite_comando=200, candidatos=None):
+    """
+    Filtra, ordena e pagina o quadro de processos no servidor, antes de qualquer
+    serialização para o navegador. Retorna (página, total após os filtros).
+
+    `candidatos` (de filtrar_processos) dispensa refazer os filtros; o Comando
+    da página é truncado em `limite_comando` caracteres. Para as primeiras
+    páginas só os k primeiros (mais os empatados com o k-ésimo) são ordenados,
+    não o quadro inteiro.
     """
-    Cria uma lista de objetos Processo.
+    if candidatos is None:
+        candidatos = filtrar_processos(processos, texto, usuario, estados)
+    total = len(candidatos)
+
+    inicio = max(0, pagina) * tamanho_pagina
+    fim = min(inicio + tamanho_pagina, total)
+    if inicio >= total:
+        return processos.iloc[0:0], total
+
+    chave = processos[ordenar_por].to_numpy()[candidatos]
+    if np.issubdtype(chave.dtype, np.number):
+        if decrescente:
+            chave = -chave
+        # Empates são desempatados pelo PID, com ou sem a seleção parcial: a fronteira
+        # entre páginas cai sempre no mesmo lugar e nenhuma linha se repete ou some
+        pids = processos["PID"].to_numpy()[candidatos]
+        selecionados = np.arange(total)
+        if fim < total // 2:
+            limiar = np.partition(chave, fim - 1)[fim - 1]
+            if limiar == limiar:  # Com NaN até a fronteira (vão para o fim), ordena tudo
+                selecionados = np.flatnonzero(chave <= limiar)
+        ordem = selecionados[np.lexsort((pids[selecionados], chave[selecionados]))]
+    else:
+        ordem = np.argsort(chave.astype(str), kind="stable")
+        if decrescente:
+            ordem = ordem[::-1]
+
+    pagina_df = processos.iloc[candidatos[ordem[inicio:fim]]]
+    if limite_comando:
+        pagina_df = pagina_df.assign(Comando=pagina_df["Comando"].str.slice(0, limite_comando))
+    return pagina_df, total
+
+def indice_pids(processos):
+    """
+    Índice PID -> posição no quadro de processos, para buscas O(1) por PID.
     """
-    lista = []
-    proc = Path('/proc')
+    return pd.Index(processos["PID"])
+
+def buscar_processo(snapshot, pid):
+    """
+    Retorna a linha (Series) do processo `pid` no snapshot, ou None.
+    """
+    indice = snapshot.get("indice_pids")
+    processos = snapshot.get("processes")
+    if indice is None or processos is None:
+        return None
     try:
-        PIDS = [int(p.name) for p in proc.iterdir() if p.is_dir() and p.name.isdigit()]
-        
-        for pid in PIDS:
-            try:
-                p = Processo(pid)
-                p.iniciarProcesso()
-                if p.name != '[Encerrado]':
-                    lista.append(p)
-            except Exception:
-                continue
-    except Exception:
-        pass
-    
-    return lista
+        posicao = indice.get_loc(pid)
+    except KeyError:
+        return None
+    if not isinstance(posicao, (int, np.integer)):
+        return None
+    return processos.iloc[posicao]
+
+def chave_processo(pids, starttimes):
+    """
+    Combina pid e starttime em uma chave int64 única por processo
+    (pid nos bits altos, starttime nos 40 bits baixos).
+    """
+    return (np.asarray(pids, dtype=np.int64) << 40) | (np.asarray(starttimes, dtype=np.int64) & ((1 << 40) - 1))
+
+def listaProcessos(proc=RAIZ_PROC):
+    """
+    Cria uma lista de objetos Processo (coleta completa, sem estado entre chamadas).
+    """
+    return TabelaProcessos(proc=proc).atualizar()
+
+# --- ÁRVORE DE PROCESSOS ---
+# Totais da subárvore, na ordem das colunas de ArvoreProcessos.totais
+COLUNAS_SUBARVORE = ("Processos", "Threads", "RAM (KB)", "CPU %", "CPU (ticks)")
+
+class ArvoreProcessos:
+    """
+    Hierarquia pai → filhos de um quadro de processos, com os totais de cada
+    subárvore (processos, threads, RAM, %CPU e ticks de CPU).
+
+    O índice de filhos é montado em formato CSR (uma ordenação por pai) e a
+    árvore é percorrida por níveis: cada nível é obtido do anterior com uma
+    única operação vetorizada, e os totais sobem da folha para a raiz somando
+    cada nível no nível de cima. Não há recursão e o custo é proporcional ao
+    número de processos.
+
+    Um processo cujo pai não está no quadro (pai encerrado entre as leituras)
+    é pendurado no PID 1, como o kernel fará ao reparentá-lo; sem PID 1, vira
+    raiz. Ciclos (só possíveis com leituras inconsistentes) são quebrados
+    transformando os processos inalcançáveis em raízes.
+    """
+    def __init__(self, processos):
+        """
+        Monta o índice de filhos e calcula os totais das subárvores.
+        """
+        self.processos = processos
+        self.pids = processos["PID"].to_numpy(dtype=np.int64)
+        n = len(self.pids)
+        self._posicoes = pd.Index(self.pids)
+        pai = self._posicoes.get_indexer(processos["PPID"].to_numpy(dtype=np.int64))
+        pai[pai == np.arange(n)] = -1
+
+        # Órfãos: o pai informado não existe mais no quadro
+        orfaos = (pai < 0) & (processos["PPID"].to_numpy() > 0)
+        init = self._posicoes.get_indexer([1])[0]
+        if init >= 0:
+            orfaos[init] = False
+            pai[orfaos] = init
+
+        self.niveis = self._percorrer(pai)
+        alcancados = sum(len(nivel) for nivel in self.niveis)
+        if alcancados < n:
+            inalcancaveis = np.ones(n, dtype=bool)
+            inalcancaveis[np.concatenate(self.niveis)] = False
+            pai[inalcancaveis] = -1
+            self.niveis = self._percorrer(pai)
+        self.pai = pai
+
+        self.profundidade = np.empty(n, dtype=np.int64)
+        for d, nivel in enumerate(self.niveis):
+            self.profundidade[nivel] = d
+
+        # Totais de baixo para cima: cada nível soma nos pais (nível anterior)
+        self.totais = np.column_stack((
+            np.ones(n),
+            processos["Threads"].to_numpy(dtype=np.float64),
+            processos["RAM (KB)"].to_numpy(dtype=np.float64),
+            processos["CPU %"].to_numpy(dtype=np.float64),
+            (processos["CPU (User)"] + processos["CPU (Kernel)"]).to_numpy(dtype=np.float64),
+        )) if n else np.zeros((0, len(COLUNAS_SUBARVORE)))
+        for nivel in reversed(self.niveis[1:]):
+            np.add.at(self.totais, pai[nivel], self.totais[nivel])
+
+    def _percorrer(self, pai):
+        """
+        Monta o índice CSR de filhos (ordenados por PID) e retorna a lista de
+        níveis (arrays de posições), a partir das raízes.
+        """
+        n = len(pai)
+        ordem = np.lexsort((self.pids, pai))
+        n_raizes = int(np.count_nonzero(pai < 0))
+        self._filhos = ordem[n_raizes:]
+        self._n_filhos = np.bincount(pai[pai >= 0], minlength=n) if n else np.zeros(0, dtype=np.int64)
+        self._inicio = np.cumsum(self._n_filhos) - self._n_filhos
+
+        niveis = []
+        nivel = ordem[:n_raizes]
+        while len(nivel):
+            niveis.append(nivel)
+            quantos = self._n_filhos[nivel]
+            total = int(quantos.sum())
+            if total == 0:
+                break
+            # Concatena as faixas de filhos de todo o nível sem laço em Python
+            deslocamento = np.repeat(self._inicio[nivel] - (np.cumsum(quantos) - quantos), quantos)
+            nivel = self._filhos[deslocamento + np.arange(total)]
+        return niveis
+
+    def filhos(self, posicao):
+        """
+        Posições dos filhos diretos de um processo (pela posição no quadro).
+        """
+        inicio = self._inicio[posicao]
+        return self._filhos[inicio:inicio + self._n_filhos[posicao]]
+
+    def subarvore(self, pid):
+        """
+        Totais da subárvore de `pid` como dict (vazio se o PID não existir).
+        """
+        posicao = self._posicoes.get_indexer([pid])[0]
+        if posicao < 0:
+            return {}
+        return dict(zip(COLUNAS_SUBARVORE, self.totais[posicao].tolist()))
+
+    def visiveis(self, expandidos=None, limite=None):
+        """
+        Linhas da árvore em pré-ordem (pai antes dos filhos), descendo apenas
+        pelos PIDs em `expandidos` (todos, se None). Retorna um DataFrame com a
+        indentação, os dados do próprio processo e os totais da subárvore.
+        """
+        if expandidos is not None:
+            aberto = np.isin(self.pids, np.fromiter(expandidos, dtype=np.int64))
+        else:
+            aberto = np.ones(len(self.pids), dtype=bool)
+        posicoes = []
+        pilha = self.niveis[0][::-1].tolist() if self.niveis else []
+        while pilha and (limite is None or len(posicoes) < limite):
+            i = pilha.pop()
+            posicoes.append(i)
+            if aberto[i] and self._n_filhos[i]:
+                pilha.extend(self.filhos(i)[::-1].tolist())
+
+        posicoes = np.asarray(posicoes, dtype=np.int64)
+        linhas = self.processos.iloc[posicoes]
+        tem_filhos = self._n_filhos[posicoes] > 0
+        marcador = np.where(tem_filhos, np.where(aberto[posicoes], "▾ ", "▸ "), "  ")
+        recuo = ["  " * d for d in self.profundidade[posicoes]]
+        quadro = pd.DataFrame({
+            "Árvore": [r + m + str(nome) for r, m, nome in zip(recuo, marcador, linhas["Nome"])],
+            "PID": linhas["PID"].to_numpy(),
+            "PPID": self.pids[self.pai[posicoes]] if len(posicoes) else np.zeros(0, dtype=np.int64),
+            "RAM própria (KB)": linhas["RAM (KB)"].to_numpy(),
+            "CPU própria %": linhas["CPU %"].to_numpy(),
+        })
+        quadro.loc[self.pai[posicoes] < 0, "PPID"] = 0
+        totais = self.totais[posicoes]
+        for j, nome in enumerate(COLUNAS_SUBARVORE):
+            quadro[f"Σ {nome}"] = totais[:, j]
+        return quadro
 
 # --- INÍCIO: NOVAS FUNÇÕES (PARTE B) ---
-def info_particoes_montadas():
+
+# Tipos de sistema de arquivos que não representam partições reais
+FS_IGNORADOS = ("sysfs", "proc", "devtmpfs", "tmpfs", "cgroup", "squashfs", "debugfs", "fusectl", "pstore", "none", "mqueue", "hugetlbfs")
+
+def interpretar_montagens(conteudo):
+    """
+    Interpreta o conteúdo de /proc/mounts em tuplas (dispositivo, ponto de montagem, tipo de FS).
+    """
+    montagens = []
+    for linha in conteudo.splitlines():
+        partes = linha.split()
+        if len(partes) < 3: # Garante que a linha tenha informações suficientes
+            continue
+        # Espaços nos caminhos vêm escapados como \040
+        ponto_montagem = partes[1].replace("\\040", " ")
+        montagens.append((partes[0], ponto_montagem, partes[2]))
+    return tuple(montagens)
+
+class MonitorMontagens:
+    """
+    Mantém a tabela de montagens (/proc/self/mounts) em cache.
+
+    O arquivo fica aberto e é monitorado com poll(): o kernel sinaliza
+    POLLPRI/POLLERR quando algo é montado ou desmontado, e só então a tabela
+    é relida e reprocessada.
+    """
+    def __init__(self, caminho=f"{RAIZ_PROC}/self/mounts"):
+        """
+        Abre a tabela de montagens e registra o descritor no poll.
+        """
+        self._caminho = caminho
+        self._montagens = None
+        self._arquivo = None
+        self._poll = None
+        try:
+            self._arquivo = open(caminho, "r")
+            self._poll = select.poll()
+            self._poll.register(self._arquivo.fileno(), select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            # Sem poll (ou sem o arquivo): relê a tabela a cada consulta
+            self._poll = None
+
+    def mudou(self):
+        """
+        Indica se a tabela de montagens mudou desde a última leitura.
+        """
+        if self._montagens is None or self._poll is None:
+            return True
+        try:
+            for _, evento in self._poll.poll(0):
+                if evento & (select.POLLPRI | select.POLLERR):
+                    # O poll consome o evento: invalida o cache até a próxima leitura
+                    self._montagens = None
+                    return True
+        except OSError:
+            return True
+        return False
+
+    def montagens(self):
+        """
+        Retorna a lista de montagens (dispositivo, ponto de montagem, tipo de FS).
+        """
+        if self.mudou():
+            self._montagens = self._ler()
+        return self._montagens
+
+    def _ler(self):
+        """
+        Lê e interpreta a tabela de montagens.
+        """
+        if self._arquivo is not None:
+            self._arquivo.seek(0)
+            return interpretar_montagens(self._arquivo.read())
+        return interpretar_montagens(Path(self._caminho).read_text())
+
+    def close(self):
+        """
+        Fecha o descritor da tabela de montagens.
+        """
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+            self._poll = None
+
+def info_particoes_montadas(monitor_montagens=None, proc=RAIZ_PROC):
     """
     Lista os pontos de montagem das partições de disco e coleta informações de uso
-    chamando o programa C 'get_disk_usage'.
+    diretamente com os.statvfs, sem criar processos.
     """
     particoes = []
-    
-    # Caminho para o executável C. Assumimos que ele está na mesma pasta do script Python.
-    # Se estiver em outro lugar, ajuste este caminho.
-    c_executable_path = Path(__file__).parent / "get_disk_usage" 
 
     try:
-        # Lê /proc/mounts para obter os pontos de montagem
-        mounts_path = Path("/proc/mounts")
-        for linha in mounts_path.read_text().splitlines():
-            partes = linha.split()
-            if len(partes) < 3: # Garante que a linha tenha informações suficientes
-                continue
-
-            device = partes[0]
-            ponto_montagem = partes[1]
-            tipo_fs = partes[2]
-
-            # Filtra para mostrar apenas dispositivos de bloco reais e tipos de sistema de arquivos relevantes
-            if device.startswith("/dev/") and tipo_fs not in ("sysfs", "proc", "devtmpfs", "tmpfs", "cgroup", "squashfs", "debugfs", "fusectl", "pstore", "none", "mqueue", "hugetlbfs"):
-                
-                total_gb = "N/A"
-                usado_gb = "N/A"
-                livre_gb = "N/A"
-                percent_uso = "N/A"
-
-                try:
-                    # Chama o programa C para obter as estatísticas de uso
-                    # capture_output=True para capturar stdout e stderr
-                    # text=True para decodificar a saída como texto
-                    result = subprocess.run([str(c_executable_path), ponto_montagem], capture_output=True, text=True, check=True)
-                    
-                    # Parsear a saída JSON do programa C
-                    disk_stats = json.loads(result.stdout)
-
-                    if "error" in disk_stats:
-                        total_gb = disk_stats["error"]
-                        usado_gb = disk_stats["error"]
-                        livre_gb = disk_stats["error"]
-                        percent_uso = disk_stats["error"]
-                    else:
-                        total_gb = disk_stats["total_bytes"] / (1024**3)
-                        usado_gb = disk_stats["used_bytes"] / (1024**3)
-                        livre_gb = disk_stats["free_bytes"] / (1024**3)
-                        percent_uso = disk_stats["percent_used"]
-
-                except subprocess.CalledProcessError as e:
-                    # O programa C retornou um erro (código de saída diferente de 0)
-                    total_gb = f"Erro ao executar C: {e.stderr.strip()}"
-                    usado_gb = total_gb
-                    livre_gb = total_gb
-                    percent_uso = total_gb
-                except json.JSONDecodeError:
-                    total_gb = "Erro JSON C"
-                    usado_gb = total_gb
-                    livre_gb = total_gb
-                    percent_uso = total_gb
-                except FileNotFoundError:
-                    total_gb = "Executável C não encontrado!"
-                    usado_gb = total_gb
-                    livre_gb = total_gb
-                    percent_uso = total_gb
-                except Exception as e:
-                    total_gb = f"Erro inesperado: {e}"
-                    usado_gb = total_gb
-                    livre_gb = total_gb
-                    percent_uso = total_gb
-
-                particoes.append({
-                    "Dispositivo": device,
-                    "Ponto de Montagem": ponto_montagem,
-                    "Tipo FS": tipo_fs,
-                    "Total (GB)": f"{total_gb:.2f}" if isinstance(total_gb, float) else total_gb,
-                    "Usado (GB)": f"{usado_gb:.2f}" if isinstance(usado_gb, float) else usado_gb,
-                    "Livre (GB)": f"{livre_gb:.2f}" if isinstance(livre_gb, float) else livre_gb,
-                    "Uso (%)": f"{percent_uso:.2f}%" if isinstance(percent_uso, float) else percent_uso
-                })
-    except (FileNotFoundError, Exception) as e:
+        if monitor_montagens is not None:
+            montagens = monitor_montagens.montagens()
+        else:
+            montagens = interpretar_montagens(Path(f"{proc}/mounts").read_text())
+    except Exception:
         # Erro ao ler /proc/mounts
-        particoes.append({"Erro": f"Não foi possível ler /proc/mounts: {e}"})
-        return [] # Retorna vazio ou com erro se a fonte primária falhar
+        return []
+
+    for device, ponto_montagem, tipo_fs in montagens:
+        # Filtra para mostrar apenas dispositivos de bloco reais e tipos de sistema de arquivos relevantes
+        if not device.startswith("/dev/") or tipo_fs in FS_IGNORADOS:
+            continue
+
+        try:
+            stats = os.statvfs(ponto_montagem)
+            total_bytes = stats.f_blocks * stats.f_frsize
+            livre_bytes = stats.f_bfree * stats.f_frsize
+            usado_bytes = total_bytes - livre_bytes
+            total_gb = total_bytes / (1024**3)
+            usado_gb = usado_bytes / (1024**3)
+            livre_gb = livre_bytes / (1024**3)
+            percent_uso = 100.0 * usado_bytes / total_bytes if total_bytes > 0 else 0.0
+        except OSError as e:
+            total_gb = f"Falha ao acessar {ponto_montagem}: {e.strerror}"
+            usado_gb = total_gb
+            livre_gb = total_gb
+            percent_uso = total_gb
+
+        particoes.append({
+            "Dispositivo": device,
+            "Ponto de Montagem": ponto_montagem,
+            "Tipo FS": tipo_fs,
+            "Total (GB)": f"{total_gb:.2f}" if isinstance(total_gb, float) else total_gb,
+            "Usado (GB)": f"{usado_gb:.2f}" if isinstance(usado_gb, float) else usado_gb,
+            "Livre (GB)": f"{livre_gb:.2f}" if isinstance(livre_gb, float) else livre_gb,
+            "Uso (%)": f"{percent_uso:.2f}%" if isinstance(percent_uso, float) else percent_uso
+        })
     return particoes
 
-def get_process_open_files(pid):
+# Orçamento de CPU do trabalho em segundo plano (índice reverso, varreduras,
+# tamanhos), descontado pelo escalonador da coleta
+_segundo_plano = OrcamentoSegundoPlano()
+
+# Inspetores de descritores compartilhados entre reruns, um por raiz do /proc
+_inspetores = {}
+
+def inspetor_descritores(proc=RAIZ_PROC):
+    """
+    Retorna o InspetorDescritores compartilhado para esta raiz do /proc.
+    """
+    inspetor = _inspetores.get(proc)
+    if inspetor is None:
+        inspetor = _inspetores.setdefault(proc, InspetorDescritores(proc, orcamento=_segundo_plano))
+    return inspetor
+
+# Cache de listagens de diretórios e motor de tamanhos compartilhados entre reruns e sessões
+_navegador = NavegadorArquivos()
+_motor_tamanhos = MotorTamanhos(orcamento=_segundo_plano)
+
+def navegador_arquivos():
     """
-    Lista os arquivos abertos por um processo específico usando pathlib.
+    Retorna o NavegadorArquivos compartilhado.
+    """
+    return _navegador
+
+def motor_tamanhos():
+    """
+    Retorna o MotorTamanhos compartilhado.
+    """
+    return _motor_tamanhos
+
+def get_process_open_files(pid, proc=RAIZ_PROC):
+    """
+    Lista os arquivos abertos por um processo específico ("fd -> destino").
     """
-    arquivos_abertos = []
-    fd_path = Path(f'/proc/{pid}/fd')
     try:
-        if fd_path.is_dir():
-            for fd_link in fd_path.iterdir():
-                try:
-                    # Path.readlink() para resolver o link simbólico
-                    destino = fd_link.readlink()
-                    arquivos_abertos.append(f"{fd_link.name} -> {destino}")
-                except (FileNotFoundError, OSError):
-                    arquivos_abertos.append(f"{fd_link.name} -> [acesso negado ou link quebrado]")
-                    continue
+        arquivos_abertos = [
+            f"{fd} -> {destino}"
+            for lote in varrer_descritores(pid, proc)
+            for fd, destino in lote
+        ]
     except (PermissionError, FileNotFoundError):
-         return ["Não foi possível acessar os arquivos (permissão negada ou processo encerrado)."]
+        return ["Não foi possível acessar os arquivos (permissão negada ou processo encerrado)."]
     except Exception as e:
         return [f"Erro ao ler arquivos: {e}"]
 
     return arquivos_abertos if arquivos_abertos else ["Nenhum arquivo aberto encontrado ou acessível."]
 
-def get_process_resources(pid):
+def get_process_resources(pid, proc=RAIZ_PROC):
     """
     Coleta e classifica os recursos abertos por um processo.
     Categoriza descritores: arquivos, sockets, pipes, anon, etc.
     Inclui locks ativos.
-    """
-    fd_path = Path(f'/proc/{pid}/fd')
-    recursos = {
-        "Arquivos": [],
-        "Sockets": [],
-        "Pipes": [],
-        "Anon": [],
-        "Erros": [],
-        "Locks": []
-    }
-
-    # Categorizar descritores abertos
-    try:
-        if fd_path.is_dir():
-            for fd in fd_path.iterdir():
-                try:
-                    destino = str(fd.readlink())
-                    if destino.startswith("socket:"):
-                        recursos["Sockets"].append(f"{fd.name} → {destino}")
-                    elif destino.startswith("pipe:"):
-                        recursos["Pipes"].append(f"{fd.name} → {destino}")
-                    elif destino.startswith("[") or "anon_inode" in destino:
-                        recursos["Anon"].append(f"{fd.name} → {destino}")
-                    elif Path(destino).exists():
-                        recursos["Arquivos"].append(f"{fd.name} → {destino}")
-                    else:
-                        recursos["Erros"].append(f"{fd.name} → {destino}")
-                except Exception as e:
-                    recursos["Erros"].append(f"{fd.name} → ERRO: {e}")
-    except PermissionError:
-        recursos["Erros"].append("Permissão negada para acessar descritores.")
-    except Exception as e:
-        recursos["Erros"].append(f"Erro ao ler fd/: {e}")
-
-    # Tentar ler locks
-    try:
-        locks_path = Path(f'/proc/{pid}/locks')
-        if locks_path.exists():
-            with open(locks_path, 'r') as f:
-                recursos["Locks"] = [linha.strip() for linha in f if linha.strip()]
-    except FileNotFoundError:
-        pass
-    except Exception as e:
-        recursos["Locks"].append(f"Erro ao ler locks: {e}")
 
+    Espera a varredura completa; a tela usa inspetor_descritores() para
+    exibir os resultados em páginas enquanto a varredura avança.
+    """
+    recursos = {categoria: [] for categoria in CATEGORIAS_DESCRITORES}
+    varredura = inspetor_descritores(proc).consultar(pid)
+    if varredura is None:
+        recursos["Erros"].append("Processo encerrado.")
+        return recursos
+    varredura.esperar()
+    for categoria, quantidade in varredura.contagens().items():
+        recursos[categoria] = varredura.pagina(categoria, 0, quantidade)
+    if varredura.erro:
+        recursos["Erros"].append(varredura.erro)
     return recursos
 
 
@@ -421,67 +1076,261 @@ def get_process_resources(pid):
 class SystemMonitorConsoleModel:
     """
     Responsável por coletar e gerenciar todos os dados do sistema.
+
+    Um único coletor em segundo plano (iniciado com start()) amostra o sistema
+    no seu próprio ritmo e publica snapshots imutáveis. Os leitores (sessões do
+    Streamlit, console) apenas leem o snapshot mais recente com get_snapshot().
+
+    A coleta é dividida em etapas agendadas por um Escalonador: contadores
+    globais (CPU e memória) a cada `intervalo_globais`, processos a cada
+    `intervalo` e partições a cada `intervalo_discos`, dentro de um orçamento
+    de CPU por tick. Cada snapshot traz os valores mais recentes de cada etapa.
     """
-    def __init__(self):
+    def __init__(self, intervalo=2.0, intervalo_discos=10.0, caminho_historico=CAMINHO_HISTORICO,
+                 limite_fds=LIMITE_FDS_PROC, proc=RAIZ_PROC, intervalo_globais=1.0,
+                 orcamento_cpu=ORCAMENTO_CPU):
         """
-        Inicializa o modelo.
+        Inicializa o modelo. `proc` é a raiz do procfs lida por todos os coletores.
         """
-        self._data = {}
+        self.proc = proc
+        self._data = MappingProxyType({})
         self._lock = threading.Lock()
-        self._last_cpu_total = 0
-        self._last_cpu_idle = 0
-        self.cpu_history = []
-        self.cpu_history_maxlen = 30
-        
-        # Inicialização da CPU
-        _, _, self._last_cpu_total, self._last_cpu_idle = uso_cpu_percent_internal(0, 0)
+        self._coleta_lock = threading.Lock()
+        self._amostrador_cpu = AmostradorCPU(proc)
+        # Séries temporais de CPU, memória e SWAP (ring buffers multirresolução),
+        # mapeadas do arquivo de histórico para sobreviver a reinícios
+        self.historico = HistoricoMetricas(caminho=caminho_historico)
+        self._tabela_processos = TabelaProcessos(limite_fds, proc)
 
-    def _collect_all_data(self):
-        """
-        Coleta todas as informações do sistema.
-        """
-        temp_data = {}
+        # Discos: intervalo próprio (mais lento, na etapa "particoes") e tabela de montagens em cache
+        self.intervalo_discos = intervalo_discos
+        self._monitor_montagens = MonitorMontagens(f"{proc}/self/mounts")
+
+        # Taxas de rede por interface (uma leitura de /proc/net/dev por tick, na etapa "globais")
+        self._taxas_rede = TaxasRede(proc)
 
-        # Coleta de CPU global
-        cpu_usage, cpu_idle, new_total, new_idle = uso_cpu_percent_internal(
-            self._last_cpu_total, self._last_cpu_idle
+        # Atividade de E/S: discos (/proc/diskstats) e os processos candidatos (/proc/<pid>/io)
+        self._taxas_discos = TaxasDiscos(proc)
+        self._taxas_io = TaxasIOProcessos(proc)
+
+        # Índice reverso recurso -> PIDs, atualizado em thread própria junto com o coletor
+        self.indice_reverso = IndiceReverso(proc, orcamento=_segundo_plano)
+
+        # Coletor em segundo plano
+        self.intervalo = intervalo
+        self._seq = 0
+        self._versoes = {}    # etapa -> seq do snapshot em que ela rodou pela última vez
+        self._thread = None
+        self._parar = threading.Event()
+        self._primeira_amostra = threading.Event()
+        # Funções chamadas a cada snapshot publicado (ex.: serviço headless)
+        self._assinantes = []
+
+        # Histórico curto do uso por núcleo (para o mapa de calor), só em memória
+        self._nucleos = self._amostrador_cpu.nucleos
+        self.historico_nucleos = HistoricoMetricas(
+            colunas=[f"cpu{i}" for i in range(self._nucleos)], camadas=((1, 120),)
         )
-        temp_data["cpu_usage"] = cpu_usage
-        temp_data["cpu_idle"] = cpu_idle
-        self._last_cpu_total = new_total
-        self._last_cpu_idle = new_idle
 
-        # Atualiza o histórico de uso de CPU
-        self.cpu_history.append(cpu_usage)
-        if len(self.cpu_history) > self.cpu_history_maxlen:
-            self.cpu_history.pop(0)
-        temp_data["cpu_history"] = list(self.cpu_history)
+        # Etapas de coleta: cada uma grava seus valores em _estado, que é
+        # copiado para o snapshot a cada tick
+        self._estado = {"partitions": (), "discos_io": (), "processos_io": ()}
+        self._escalonador = Escalonador(orcamento=orcamento_cpu, perfil=PERFIL, segundo_plano=_segundo_plano)
+        self._escalonador.adicionar("globais", self._etapa_globais, intervalo_globais, prioridade=0)
+        self._escalonador.adicionar("processos", self._etapa_processos, intervalo, prioridade=1)
+        self._escalonador.adicionar("particoes", self._etapa_particoes, intervalo_discos, prioridade=2)
+        self._escalonador.adicionar("entrada_saida", self._etapa_entrada_saida, intervalo, prioridade=2)
+
+    def _etapa_globais(self):
+        """
+        CPU global, por núcleo e por modo (uma leitura de /proc/stat), memória
+        e histórico. Etapa essencial: roda em todo tick.
+        """
+        estado = self._estado
+        cpu_usage, cpu_idle, pct_modos = self._amostrador_cpu.amostrar()
+        estado["cpu_usage"] = cpu_usage
+        estado["cpu_idle"] = cpu_idle
+        estado["cpu_nucleos"] = pd.DataFrame(
+            pct_modos, columns=list(MODOS_CPU),
+            index=pd.Index([f"cpu{i}" for i in range(len(pct_modos))], name="Núcleo"),
+        )
+        uso_nucleos = uso_por_nucleo(pct_modos)
+        if len(uso_nucleos) == self._nucleos:
+            self.historico_nucleos.registrar(dict(zip(self.historico_nucleos.colunas, uso_nucleos.tolist())))
+        estado["historico_nucleos"] = self.historico_nucleos
 
         # Coleta de memória global
-        temp_data["mem_info"] = info_memoria()
+        mem_info = info_memoria(self.proc)
+        estado["mem_info"] = MappingProxyType(mem_info)
+
+        # Rede: taxas por interface e totais do host
+        interfaces_rede, rede = self._taxas_rede.amostrar()
+        estado["interfaces_rede"] = interfaces_rede
+        estado["rede"] = MappingProxyType(rede)
+
+        # Atualiza o histórico; o snapshot leva só a referência ao armazenamento,
+        # e a view consulta apenas a janela que vai exibir
+        self.historico.registrar({
+            "cpu": cpu_usage,
+            "mem": mem_info.get("mem_usada_percent", 0),
+            "swap": mem_info.get("swap_usada_percent", 0),
+            "rede_rx": rede.get("rx_mb_s"),
+            "rede_tx": rede.get("tx_mb_s"),
+            "rede_erros": rede.get("erros_s"),
+            "rede_descartes": rede.get("descartes_s"),
+            "tcp_retrans": rede.get("retransmissoes_s"),
+        })
+        estado["historico"] = self.historico
+
+    def _etapa_processos(self):
+        """
+        Lista de processos detalhada (incremental), totais, índice de PIDs e árvore.
+        """
+        # Os totais de processos e threads saem da mesma passada pelo /proc. O
+        # snapshot recebe um quadro colunar novo, desacoplado dos objetos da tabela.
+        estado = self._estado
+        tabela = self._tabela_processos
+        with PERFIL.medir("coleta.processos.atualizar"):
+            tabela.atualizar()
+        PERFIL.contar("coleta.processos.novos", tabela.novos)
+        PERFIL.contar("coleta.processos.lidos", tabela.total_processos)
+        with PERFIL.medir("coleta.processos.quadro"):
+            processos = tabela.quadro()
+        estado["processes"] = processos
+        estado["indice_pids"] = indice_pids(processos)
+        with PERFIL.medir("coleta.processos.arvore"):
+            estado["arvore"] = ArvoreProcessos(processos)
+        estado["total_processes"] = tabela.total_processos
+        estado["total_threads"] = tabela.total_threads
 
-        # Coleta de total de processos e threads
-        temp_data["total_processes"], temp_data["total_threads"] = total_processos_threads()
+    def _etapa_particoes(self):
+        """
+        Uso das partições montadas (antecipada quando a tabela de montagens muda).
+        """
+        self._estado["partitions"] = tuple(info_particoes_montadas(self._monitor_montagens, self.proc))
+
+    def _etapa_entrada_saida(self):
+        """
+        Taxas de E/S por dispositivo (com os pontos de montagem) e dos
+        processos candidatos do último quadro de processos.
+        """
+        estado = self._estado
+        estado["discos_io"] = self._taxas_discos.amostrar(self._monitor_montagens.montagens())
+        processos = estado.get("processes")
+        if processos is not None:
+            estado["processos_io"] = self._taxas_io.amostrar(processos)
+            estado["processos_io_sem_permissao"] = self._taxas_io.sem_permissao
+
+    def _collect_all_data(self, completo=True):
+        """
+        Executa um tick de coleta e publica um novo snapshot. Com `completo`,
+        todas as etapas rodam (coleta síncrona); o laço em segundo plano usa
+        completo=False e deixa o escalonador decidir.
+        """
+        with self._coleta_lock:
+            if self._monitor_montagens.mudou():
+                self._escalonador.antecipar("particoes")
+            executadas = self._escalonador.tick(lambda: self._estado.get("cpu_usage", 0.0), completo)
+
+            temp_data = dict(self._estado)
+            if self.indice_reverso.atualizado_em is not None:
+                temp_data["indice_reverso"] = self.indice_reverso
+            temp_data["escalonador"] = self._escalonador.estado()
+            temp_data["perfil"] = PERFIL
+            temp_data["host_saturado"] = self._escalonador.saturado
+
+            self._seq += 1
+            temp_data["seq"] = self._seq
+            # Versão dos dados de cada etapa: a view só refaz o que depende de uma etapa que rodou
+            for nome in executadas:
+                self._versoes[nome] = self._seq
+            temp_data["versoes"] = MappingProxyType(dict(self._versoes))
+            temp_data["timestamp"] = time.time()
+
+            # Publica o snapshot de forma thread-safe
+            snapshot = MappingProxyType(temp_data)
+            with self._lock:
+                self._data = snapshot
+            self._primeira_amostra.set()
+
+        for assinante in list(self._assinantes):
+            try:
+                with PERFIL.medir("coleta.assinantes"):
+                    assinante(snapshot)
+            except Exception:
+                # Um consumidor com defeito não pode derrubar o coletor
+                pass
+
+    def assinar(self, funcao):
+        """
+        Registra `funcao(snapshot)` para ser chamada, na thread do coletor,
+        sempre que um novo snapshot for publicado.
+        """
+        self._assinantes.append(funcao)
 
-        # Coleta da lista de processos detalhada
-        temp_data["processes_list"] = listaProcessos()
+    def _loop_coleta(self):
+        """
+        Laço do coletor em segundo plano: coleta, publica e aguarda o próximo ciclo.
+        """
+        while not self._parar.is_set():
+            inicio = time.monotonic()
+            try:
+                self._collect_all_data(completo=False)
+            except Exception:
+                # Uma falha pontual não pode derrubar o coletor compartilhado
+                pass
+            decorrido = time.monotonic() - inicio
+            self._parar.wait(max(0.0, self._escalonador.intervalo_tick - decorrido))
 
-        temp_data["partitions"] = info_particoes_montadas()
+    def start(self):
+        """
+        Inicia o coletor em segundo plano (idempotente).
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(
+                target=self._loop_coleta, name="coletor-dashboard", daemon=True
+            )
+            self._thread.start()
+        self.indice_reverso.start()
 
-        # Atualiza os dados de forma thread-safe
+    def stop(self):
+        """
+        Para o coletor em segundo plano.
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.indice_reverso.stop()
+        self.historico.sincronizar()
+
+    def is_running(self):
+        """
+        Indica se o coletor em segundo plano está ativo.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_snapshot(self, timeout=None):
+        """
+        Retorna o snapshot mais recente (somente leitura), sem disparar coleta.
+        Aguarda a primeira amostra se o coletor acabou de ser iniciado.
+        """
+        if self.is_running():
+            self._primeira_amostra.wait(timeout)
         with self._lock:
-            self._data = temp_data
+            return self._data
 
     def get_all_data(self):
         """
-        Inicia uma thread para coletar os dados e retorna uma cópia dos dados.
+        Retorna uma cópia dos dados mais recentes.
+        Sem o coletor em segundo plano, faz uma coleta síncrona antes.
         """
-        collection_thread = threading.Thread(target=self._collect_all_data)
-        collection_thread.start()
-        collection_thread.join()  # Espera a thread terminar para garantir dados atualizados
-        
-        with self._lock:
-            return self._data.copy()
+        if not self.is_running():
+            self._collect_all_data()
+        return dict(self.get_snapshot())
 
 # --- FUNÇÕES DE EXIBIÇÃO ---
 def mostrarInfoGlobal(data):
@@ -507,14 +1356,12 @@ def mostrarInfoGlobal(data):
     print(f"│ SWAP Usada          : {mem.get('swap_usada', 0)} kB")
     print("╚════════════════════════════════════════════════════════════════════╝")
 
-def mostrarListaProcessos(processes_list):
+def mostrarListaProcessos(processes):
     """
     Exibe a lista detalhada de processos no console.
     """
     print("\n[ PROCESSOS ATIVOS ]\n")
-    processes_list.sort(key=lambda p: p.pid)
-    for p in processes_list:
-        print(p)
+    print(processes.sort_values("PID").to_string(index=False))
 
 # --- CONTROLADOR ---
 class ConsoleController:
@@ -533,7 +1380,7 @@ class ConsoleController:
         """
         collected_data = self.model.get_all_data()
         mostrarInfoGlobal(collected_data)
-        mostrarListaProcessos(collected_data.get('processes_list', []))
+        mostrarListaProcessos(collected_data.get('processes', processos_vazio()))
 
 # # --- EXECUÇÃO PRINCIPAL ---
 # if __name__ == '__main__':
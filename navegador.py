@@ -0,0 +1,391 @@
+# navegador.py
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Colunas da página devolvida por ListagemDiretorio.pagina()
+COLUNAS_LISTAGEM = ("Nome", "Tipo", "Tamanho (KB)", "Modificação")
+TIPOS_ENTRADA = {0: "📄 Arquivo", 1: "📁 Pasta", 2: "🔗 Link", 3: "❔ Outro"}
+
+
+# --- LISTAGEM DE UM DIRETÓRIO ---
+class ListagemDiretorio:
+    """
+    Conteúdo de um diretório em formato colunar, lido com uma única passada de
+    os.scandir.
+
+    Nome e tipo vêm do próprio DirEntry (d_type, sem stat). Tamanho e data de
+    modificação só são lidos sob demanda: para as linhas da página exibida ou,
+    uma única vez, para todas as entradas quando a ordenação depende deles.
+    As ordenações calculadas ficam guardadas na listagem.
+    """
+    def __init__(self, caminho, mtime_ns):
+        """
+        Lê o diretório. Erros de acesso ficam em `erro` (listagem vazia).
+        """
+        self.caminho = caminho
+        self.mtime_ns = mtime_ns
+        self.erro = None
+        nomes, tipos = [], []
+        try:
+            with os.scandir(caminho) as entradas:
+                for entrada in entradas:
+                    nomes.append(entrada.name)
+                    try:
+                        if entrada.is_symlink():
+                            # Links para pastas continuam navegáveis
+                            tipos.append(1 if entrada.is_dir() else 2)
+                        elif entrada.is_dir(follow_symlinks=False):
+                            tipos.append(1)
+                        elif entrada.is_file(follow_symlinks=False):
+                            tipos.append(0)
+                        else:
+                            tipos.append(3)
+                    except OSError:
+                        tipos.append(3)
+        except OSError as e:
+            self.erro = e
+        self._lista_nomes = nomes
+        self.nomes = pd.Series(nomes, dtype="string[pyarrow]")
+        self.tipos = np.asarray(tipos, dtype=np.int8)
+        n = len(nomes)
+        # NaN = ainda não lido; tamanho/mtime ficam NaN também quando o stat falha
+        self.tamanhos = np.full(n, np.nan)
+        self.mtimes = np.full(n, np.nan)
+        self._lidos = np.zeros(n, dtype=bool)
+        self._ordens = {}
+        self._ordem_tamanhos = (None, None)  # (geração do MotorTamanhos, ordem com as pastas)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def _ler_stats(self, indices):
+        """
+        Faz stat das entradas em `indices` que ainda não foram lidas.
+        """
+        pendentes = indices[~self._lidos[indices]]
+        if not len(pendentes):
+            return
+        try:
+            dir_fd = os.open(self.caminho, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            self._lidos[pendentes] = True
+            return
+        nomes = self._lista_nomes
+        try:
+            for i in pendentes.tolist():
+                try:
+                    st = os.stat(nomes[i], dir_fd=dir_fd)
+                except OSError:
+                    continue
+                self.tamanhos[i] = st.st_size
+                self.mtimes[i] = st.st_mtime
+        finally:
+            os.close(dir_fd)
+        self._lidos[pendentes] = True
+
+    def _ordem(self, ordenar_por):
+        """
+        Índices das entradas na ordem pedida (pastas primeiro), calculados uma vez.
+        """
+        ordem = self._ordens.get(ordenar_por)
+        if ordem is not None:
+            return ordem
+        if ordenar_por == "Nome":
+            ordem = self.nomes.str.lower().argsort(kind="stable").to_numpy()
+        else:
+            self._ler_stats(np.arange(len(self)))
+            valores = self.tamanhos if ordenar_por == "Tamanho (KB)" else self.mtimes
+            # Maiores/mais recentes primeiro; sem stat vão para o fim
+            ordem = np.argsort(np.nan_to_num(-valores, nan=np.inf), kind="stable")
+        # Pastas primeiro, preservando a ordem dentro de cada grupo
+        ordem = ordem[np.argsort(self.tipos[ordem] != 1, kind="stable")]
+        self._ordens[ordenar_por] = ordem
+        return ordem
+
+    def _tamanhos_pastas(self, indices, tamanhos):
+        """
+        Tamanho recursivo conhecido das entradas em `indices` (NaN nas que não
+        são pastas e nas pastas ainda não calculadas).
+        """
+        valores = np.full(len(indices), np.nan)
+        for j in np.flatnonzero(self.tipos[indices] == 1).tolist():
+            total = tamanhos.total(os.path.join(self.caminho, self._lista_nomes[indices[j]]))
+            if total is not None:
+                valores[j] = total[0]
+        return valores
+
+    def _ordem_por_tamanho(self, tamanhos):
+        """
+        Ordem por tamanho com as pastas pelo tamanho recursivo, recalculada só
+        quando a geração do MotorTamanhos muda (um cálculo terminou).
+        """
+        geracao, ordem = self._ordem_tamanhos
+        if geracao == tamanhos.geracao:
+            return ordem
+        geracao = tamanhos.geracao
+        pastas = self._tamanhos_pastas(np.arange(len(self)), tamanhos)
+        if np.all(np.isnan(pastas)):
+            ordem = self._ordem("Tamanho (KB)")
+        else:
+            self._ler_stats(np.arange(len(self)))
+            valores = np.where(self.tipos == 1, pastas, self.tamanhos)
+            ordem = np.argsort(np.nan_to_num(-valores, nan=np.inf), kind="stable")
+        self._ordem_tamanhos = (geracao, ordem)
+        return ordem
+
+    def pagina(self, filtro="", ordenar_por="Nome", pagina=0, tamanho=100, tamanhos=None):
+        """
+        Retorna (página como DataFrame, total de entradas após o filtro).
+        `filtro` é um trecho do nome, sem diferenciar maiúsculas.
+
+        Com `tamanhos` (um MotorTamanhos), as pastas da página exibem o tamanho
+        recursivo e, ordenando por tamanho, entram na mesma ordem dos arquivos.
+        """
+        with self._lock:
+            if ordenar_por == "Tamanho (KB)" and tamanhos is not None:
+                ordem = self._ordem_por_tamanho(tamanhos)
+            else:
+                ordem = self._ordem(ordenar_por)
+            if filtro:
+                casa = self.nomes.str.contains(filtro, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+                ordem = ordem[casa[ordem]]
+            total = len(ordem)
+            indices = ordem[pagina * tamanho:(pagina + 1) * tamanho]
+            self._ler_stats(indices)
+
+        nomes = self._lista_nomes
+        mtimes = self.mtimes[indices]
+        quadro = pd.DataFrame({
+            "Nome": [nomes[i] for i in indices.tolist()],
+            "Tipo": [TIPOS_ENTRADA[t] for t in self.tipos[indices].tolist()],
+            "Tamanho (KB)": self.tamanhos[indices] / 1024,
+            "Modificação": [
+                datetime.fromtimestamp(m).strftime("%Y-%m-%d %H:%M:%S") if m == m else ""
+                for m in mtimes.tolist()
+            ],
+        }, columns=list(COLUNAS_LISTAGEM))
+        # Pastas mostram o tamanho recursivo (se calculado), não o da entrada de diretório
+        eh_pasta = self.tipos[indices] == 1
+        if tamanhos is not None:
+            quadro.loc[eh_pasta, "Tamanho (KB)"] = self._tamanhos_pastas(indices, tamanhos)[eh_pasta] / 1024
+        else:
+            quadro.loc[eh_pasta, "Tamanho (KB)"] = np.nan
+        return quadro, total
+
+
+# --- CACHE DE LISTAGENS ---
+class NavegadorArquivos:
+    """
+    Cache LRU de listagens indexado por (caminho, mtime do diretório): criar,
+    remover ou renomear entradas muda o mtime e invalida a listagem. Como o
+    tamanho de um arquivo alterado no lugar não muda o mtime do diretório, as
+    listagens também vencem após `validade` segundos.
+    """
+    def __init__(self, capacidade=16, validade=30.0):
+        """
+        Inicializa o cache vazio.
+        """
+        self.capacidade = capacidade
+        self.validade = validade
+        self._listagens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def listar(self, caminho):
+        """
+        Retorna a ListagemDiretorio de `caminho`, reaproveitando a do cache se
+        o diretório não mudou. Levanta OSError se o caminho não for acessível.
+        """
+        caminho = os.path.abspath(caminho)
+        mtime_ns = os.stat(caminho).st_mtime_ns
+        chave = (caminho, mtime_ns)
+        agora = time.monotonic()
+        with self._lock:
+            encontrado = self._listagens.get(chave)
+            if encontrado is not None and agora - encontrado[0] < self.validade:
+                self._listagens.move_to_end(chave)
+                return encontrado[1]
+        listagem = ListagemDiretorio(caminho, mtime_ns)
+        with self._lock:
+            self._listagens[chave] = (agora, listagem)
+            self._listagens.move_to_end(chave)
+            while len(self._listagens) > self.capacidade:
+                self._listagens.popitem(last=False)
+        return listagem
+
+
+# --- TAMANHO RECURSIVO DE DIRETÓRIOS (du) ---
+class MotorTamanhos:
+    """
+    Calcula em segundo plano o tamanho recursivo (bytes e número de arquivos)
+    das pastas de uma subárvore, com um pool de threads que percorre as
+    subpastas em paralelo. Como du -x, não atravessa pontos de montagem.
+
+    O conteúdo direto de cada pasta (soma dos arquivos e lista de subpastas)
+    fica em cache junto com o mtime da pasta: num novo cálculo, uma pasta cujo
+    mtime não mudou custa um único stat, sem scandir nem stat dos arquivos.
+    Arquivos alterados no lugar não mudam o mtime da pasta; esses tamanhos só
+    são corrigidos quando a pasta muda. Tamanhos são aparentes (st_size) e
+    hard links contam uma vez por nome.
+
+    `geracao` muda a cada cálculo concluído: quem guarda algo derivado dos
+    totais (ex.: a ordem por tamanho de uma listagem) só precisa refazê-lo
+    quando ela muda. Com `orcamento` (OrcamentoSegundoPlano), cada pasta lida é
+    cobrada do orçamento da coleta e espera enquanto o host estiver saturado.
+    """
+    def __init__(self, trabalhadores=8, orcamento=None):
+        """
+        Inicializa o motor parado e sem resultados.
+        """
+        self.trabalhadores = trabalhadores
+        self.orcamento = orcamento
+        self._diretos = {}   # pasta -> (mtime_ns, bytes diretos, arquivos diretos, subpastas)
+        self._totais = {}    # pasta -> (bytes, arquivos, pastas) da subárvore
+        self.geracao = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cancelar = threading.Event()
+        self._progresso = {"raiz": None, "em_andamento": False, "pastas": 0, "reaproveitadas": 0,
+                           "arquivos": 0, "bytes": 0, "pendentes": 0, "duracao": 0.0}
+
+    def calcular(self, raiz):
+        """
+        Inicia o cálculo da subárvore `raiz` em segundo plano. Retorna False se
+        já houver um cálculo em andamento.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._cancelar.clear()
+            self._progresso = dict(self._progresso, raiz=os.path.abspath(raiz), em_andamento=True,
+                                   pastas=0, reaproveitadas=0, arquivos=0, bytes=0, pendentes=1, duracao=0.0)
+            self._thread = threading.Thread(target=self._executar, args=(os.path.abspath(raiz),), daemon=True)
+            self._thread.start()
+            return True
+
+    def cancelar(self):
+        """
+        Interrompe o cálculo em andamento (os resultados parciais são descartados).
+        """
+        self._cancelar.set()
+
+    def progresso(self):
+        """
+        Cópia do progresso do cálculo atual (ou do último).
+        """
+        with self._lock:
+            return dict(self._progresso)
+
+    def total(self, pasta):
+        """
+        (bytes, arquivos, pastas) da subárvore de `pasta`, ou None se desconhecido.
+        """
+        return self._totais.get(pasta)
+
+    def _processar(self, pasta, dispositivo):
+        """
+        Conteúdo direto de uma pasta, do cache se o mtime não mudou.
+        Retorna None para pastas inacessíveis ou em outro sistema de arquivos.
+        """
+        if self.orcamento is not None:
+            self.orcamento.ceder()
+        try:
+            st = os.stat(pasta, follow_symlinks=False)
+        except OSError:
+            return None
+        if st.st_dev != dispositivo:
+            return None
+        anterior = self._diretos.get(pasta)
+        if anterior is not None and anterior[0] == st.st_mtime_ns:
+            return anterior, True
+
+        bytes_diretos = arquivos = 0
+        subpastas = []
+        try:
+            with os.scandir(pasta) as entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            subpastas.append(entrada.path)
+                        else:
+                            bytes_diretos += entrada.stat(follow_symlinks=False).st_size
+                            arquivos += 1
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        direto = (st.st_mtime_ns, bytes_diretos, arquivos, tuple(subpastas))
+        self._diretos[pasta] = direto
+        return direto, False
+
+    def _executar(self, raiz):
+        """
+        Corpo da thread: percorre a subárvore em paralelo e soma de baixo para cima.
+        """
+        inicio = time.perf_counter()
+        visitadas = {}
+        try:
+            dispositivo = os.stat(raiz).st_dev
+            with ThreadPoolExecutor(self.trabalhadores) as executor:
+                pendentes = {executor.submit(self._processar, raiz, dispositivo): raiz}
+                while pendentes and not self._cancelar.is_set():
+                    prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    reaproveitadas = arquivos = bytes_lidos = 0
+                    for futuro in prontos:
+                        pasta = pendentes.pop(futuro)
+                        resultado = futuro.result()
+                        if resultado is None:
+                            continue
+                        direto, do_cache = resultado
+                        visitadas[pasta] = direto
+                        reaproveitadas += do_cache
+                        arquivos += direto[2]
+                        bytes_lidos += direto[1]
+                        for subpasta in direto[3]:
+                            pendentes[executor.submit(self._processar, subpasta, dispositivo)] = subpasta
+                    with self._lock:
+                        p = self._progresso
+                        p["pastas"] = len(visitadas)
+                        p["reaproveitadas"] += reaproveitadas
+                        p["arquivos"] += arquivos
+                        p["bytes"] += bytes_lidos
+                        p["pendentes"] = len(pendentes)
+                        p["duracao"] = time.perf_counter() - inicio
+                for futuro in pendentes:
+                    futuro.cancel()
+        except OSError:
+            pass
+
+        if not self._cancelar.is_set():
+            # Totais de baixo para cima: as pastas mais profundas primeiro
+            totais = {}
+            for pasta in sorted(visitadas, key=lambda c: c.count(os.sep), reverse=True):
+                _, bytes_diretos, arquivos, subpastas = visitadas[pasta]
+                soma = [bytes_diretos, arquivos, 1]
+                for subpasta in subpastas:
+                    sub = totais.get(subpasta)
+                    if sub is not None:
+                        soma[0] += sub[0]
+                        soma[1] += sub[1]
+                        soma[2] += sub[2]
+                totais[pasta] = tuple(soma)
+            # Pastas que sumiram da subárvore saem dos caches
+            prefixo = raiz.rstrip(os.sep) + os.sep
+            removidas = [c for c in self._diretos if c.startswith(prefixo) and c not in visitadas]
+            with self._lock:
+                for pasta in removidas:
+                    self._diretos.pop(pasta, None)
+                    self._totais.pop(pasta, None)
+                self._totais.update(totais)
+                self.geracao += 1
+        with self._lock:
+            self._progresso["em_andamento"] = False
+            self._progresso["duracao"] = time.perf_counter() - inicio
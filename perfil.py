@@ -0,0 +1,216 @@
+# perfil.py
+
+import os
+import threading
+import time
+
+import numpy as np
+
+# Liga/desliga a instrumentação (DASHBOARD_PERFIL=0 desativa)
+PERFIL_ATIVO = os.environ.get("DASHBOARD_PERFIL", "1") != "0"
+
+
+def syscalls_da_thread():
+    """
+    Chamadas de leitura + escrita feitas pela thread atual (syscr + syscw de
+    /proc/thread-self/io), ou None se o arquivo não for legível.
+    """
+    try:
+        with open("/proc/thread-self/io", "rb") as f:
+            conteudo = f.read()
+    except OSError:
+        return None
+    total = 0
+    for linha in conteudo.split(b"\n"):
+        if linha.startswith((b"syscr:", b"syscw:")):
+            total += int(linha.split()[1])
+    return total
+
+
+# --- SÉRIE DE UMA SEÇÃO ---
+class _Serie:
+    """
+    Últimas durações de uma seção em um ring buffer (histograma móvel),
+    mais os totais desde o início.
+    """
+    __slots__ = ("duracoes", "cursor", "quantidade", "chamadas", "total", "syscalls", "ultima")
+
+    def __init__(self, capacidade):
+        self.duracoes = np.zeros(capacidade, dtype=np.float64)
+        self.cursor = 0
+        self.quantidade = 0
+        self.chamadas = 0
+        self.total = 0.0
+        self.syscalls = None
+        self.ultima = 0.0
+
+    def adicionar(self, segundos, syscalls):
+        self.duracoes[self.cursor] = segundos
+        self.cursor = (self.cursor + 1) % len(self.duracoes)
+        self.quantidade = min(self.quantidade + 1, len(self.duracoes))
+        self.chamadas += 1
+        self.total += segundos
+        self.ultima = segundos
+        if syscalls is not None:
+            self.syscalls = (self.syscalls or 0) + syscalls
+
+
+class _Medicao:
+    """
+    Gerenciador de contexto devolvido por Perfilador.medir().
+    """
+    __slots__ = ("_perfil", "_nome", "_syscalls", "_inicio", "_syscalls_inicio")
+
+    def __init__(self, perfil, nome, syscalls):
+        self._perfil = perfil
+        self._nome = nome
+        self._syscalls = syscalls
+
+    def __enter__(self):
+        self._syscalls_inicio = syscalls_da_thread() if self._syscalls else None
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        duracao = time.perf_counter() - self._inicio
+        syscalls = None
+        if self._syscalls_inicio is not None:
+            fim = syscalls_da_thread()
+            # Descontam-se as duas leituras do próprio /proc/thread-self/io
+            syscalls = max(0, fim - self._syscalls_inicio - 2) if fim is not None else None
+        self._perfil.registrar(self._nome, duracao, syscalls)
+        return False
+
+
+class _MedicaoDesligada:
+    """
+    Contexto vazio usado com a instrumentação desativada.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+_DESLIGADA = _MedicaoDesligada()
+
+
+# --- PERFILADOR ---
+class Perfilador:
+    """
+    Temporizadores e contadores das seções quentes (etapas de coleta e seções
+    de renderização), com as últimas `capacidade` durações de cada seção para
+    os percentis p50/p95/p99.
+
+    Medir custa duas leituras de perf_counter e uma inserção no ring buffer;
+    com syscalls=True, também duas leituras de /proc/thread-self/io (só para
+    seções longas, como as etapas de coleta). Os percentis só são calculados
+    ao pedir o resumo.
+    """
+    def __init__(self, capacidade=512, ativo=PERFIL_ATIVO):
+        """
+        Inicializa sem nenhuma seção registrada.
+        """
+        self.capacidade = capacidade
+        self.ativo = ativo
+        self._series = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+
+    def medir(self, nome, syscalls=False):
+        """
+        Contexto que mede a duração (e opcionalmente as syscalls) da seção `nome`.
+        """
+        if not self.ativo:
+            return _DESLIGADA
+        return _Medicao(self, nome, syscalls)
+
+    def registrar(self, nome, segundos, syscalls=None):
+        """
+        Registra uma duração medida por fora.
+        """
+        with self._lock:
+            serie = self._series.get(nome)
+            if serie is None:
+                serie = self._series[nome] = _Serie(self.capacidade)
+            serie.adicionar(segundos, syscalls)
+
+    def contar(self, nome, quantidade=1):
+        """
+        Soma `quantidade` ao contador `nome`.
+        """
+        if self.ativo:
+            with self._lock:
+                self._contadores[nome] = self._contadores.get(nome, 0) + quantidade
+
+    def contadores(self, prefixo=None):
+        """
+        Cópia dos contadores (só os que começam com `prefixo`, se dado).
+        """
+        with self._lock:
+            return {nome: valor for nome, valor in self._contadores.items()
+                    if prefixo is None or nome.startswith(prefixo)}
+
+    def resumo(self, prefixo=None):
+        """
+        Uma linha (dict) por seção: chamadas, última duração, média, p50, p95,
+        p99 e máximo da janela móvel (ms) e syscalls por chamada.
+        """
+        with self._lock:
+            copias = [
+                (nome, serie.duracoes[:serie.quantidade].copy(), serie.chamadas, serie.total,
+                 serie.ultima, serie.syscalls)
+                for nome, serie in sorted(self._series.items())
+                if prefixo is None or nome.startswith(prefixo)
+            ]
+        linhas = []
+        for nome, duracoes, chamadas, total, ultima, syscalls in copias:
+            p50, p95, p99 = np.percentile(duracoes, (50, 95, 99)) * 1000 if len(duracoes) else (np.nan,) * 3
+            linhas.append({
+                "Seção": nome,
+                "Chamadas": chamadas,
+                "Última (ms)": ultima * 1000,
+                "Média (ms)": total / chamadas * 1000,
+                "p50 (ms)": p50,
+                "p95 (ms)": p95,
+                "p99 (ms)": p99,
+                "Máx. (ms)": duracoes.max() * 1000 if len(duracoes) else np.nan,
+                "Syscalls/chamada": syscalls / chamadas if syscalls is not None else None,
+            })
+        return linhas
+
+    def exportar(self):
+        """
+        Resumo, contadores e janelas brutas (ms), em estruturas serializáveis em JSON.
+        """
+        with self._lock:
+            janelas = {
+                nome: (np.roll(serie.duracoes, -serie.cursor)[-serie.quantidade:] * 1000).tolist()
+                if serie.quantidade == self.capacidade else (serie.duracoes[:serie.quantidade] * 1000).tolist()
+                for nome, serie in self._series.items()
+            }
+        return {
+            "inicio": self.inicio,
+            "exportado_em": time.time(),
+            "resumo": self.resumo(),
+            "contadores": self.contadores(),
+            "janelas_ms": janelas,
+        }
+
+    def custo_medicao(self, repeticoes=2000):
+        """
+        Custo médio (µs) de uma medição vazia, para avaliar o overhead.
+        """
+        perfil = Perfilador(capacidade=16, ativo=self.ativo)
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            with perfil.medir("calibracao"):
+                pass
+        return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+# Perfilador compartilhado pelo processo (coletor e renderização)
+PERFIL = Perfilador()
@@ -0,0 +1,149 @@
+# rede.py
+
+import time
+
+import numpy as np
+
+from entrada_saida import taxa_opcional
+
+# Campos de /proc/net/dev usados (posições após "interface:"): bytes, pacotes,
+# erros e descartes de recepção (0-3) e de transmissão (8-11)
+CAMPOS_NET_DEV = (0, 1, 2, 3, 8, 9, 10, 11)
+# Interfaces fora dos totais do host (o tráfego local não passa por placa nenhuma)
+INTERFACES_LOCAIS = ("lo",)
+
+
+def interpretar_net_dev(conteudo):
+    """
+    Extrai (interfaces, contadores) do conteúdo (bytes) de /proc/net/dev.
+    `contadores` é um array int64 (interfaces × 8): bytes, pacotes, erros e
+    descartes recebidos, seguidos dos mesmos quatro transmitidos.
+    """
+    interfaces = []
+    valores = []
+    # As duas primeiras linhas são cabeçalho
+    for linha in conteudo.split(b"\n")[2:]:
+        nome, separador, resto = linha.partition(b":")
+        if not separador:
+            continue
+        campos = resto.split()
+        if len(campos) < 16:
+            continue
+        interfaces.append(nome.strip().decode())
+        valores.append([campos[i] for i in CAMPOS_NET_DEV])
+    return interfaces, np.array(valores, dtype=np.int64).reshape(len(interfaces), len(CAMPOS_NET_DEV))
+
+
+def interpretar_snmp_tcp(conteudo):
+    """
+    Extrai (segmentos enviados, segmentos retransmitidos) da seção Tcp de
+    /proc/net/snmp (uma linha de nomes seguida de uma linha de valores), ou
+    None se a seção não existir.
+    """
+    linhas = [linha for linha in conteudo.split(b"\n") if linha.startswith(b"Tcp:")]
+    if len(linhas) < 2:
+        return None
+    campos = dict(zip(linhas[0].split()[1:], linhas[1].split()[1:]))
+    try:
+        return int(campos[b"OutSegs"]), int(campos[b"RetransSegs"])
+    except (KeyError, ValueError):
+        return None
+
+
+# --- TAXAS DE REDE ---
+class TaxasRede:
+    """
+    Taxas de recepção e transmissão por interface (bytes, pacotes, erros e
+    descartes por segundo) e retransmissões TCP do host.
+
+    Cada amostra faz uma leitura de net/dev (todas as interfaces de uma vez,
+    sem abrir nada por interface) e uma de net/snmp; as taxas saem da
+    diferença para a amostra anterior, vetorizada sobre as interfaces.
+
+    Os arquivos são lidos pelo PID 1, para valer o namespace de rede do host
+    com outra raiz (DASHBOARD_PROC=/host/proc em contêiner); /proc/net é um
+    link para self/net, o namespace do próprio dashboard. Sem acesso ao PID 1,
+    vale o de self.
+    """
+    def __init__(self, proc="/proc"):
+        """
+        Inicializa sem amostra anterior: a primeira amostra não tem taxas.
+        """
+        self.proc = proc
+        self._interfaces = []
+        self._contadores = np.zeros((0, len(CAMPOS_NET_DEV)), dtype=np.int64)
+        self._tcp = None
+        self._instante = None
+
+    def _ler(self, nome):
+        for pid in ("1", "self"):
+            try:
+                with open(f"{self.proc}/{pid}/net/{nome}", "rb") as f:
+                    return f.read()
+            except OSError:
+                continue
+        return None
+
+    def amostrar(self, instante=None):
+        """
+        Retorna (interfaces, totais): uma linha (dict) por interface e um dict
+        com as taxas somadas das interfaces não locais e as retransmissões
+        TCP. Sem amostra anterior as taxas são None.
+        """
+        if instante is None:
+            instante = time.monotonic()
+        conteudo = self._ler("dev")
+        if conteudo is None:
+            return (), {}
+        interfaces, contadores = interpretar_net_dev(conteudo)
+        snmp = self._ler("snmp")
+        tcp = interpretar_snmp_tcp(snmp) if snmp is not None else None
+
+        taxas = np.full(contadores.shape, np.nan)
+        intervalo = instante - self._instante if self._instante is not None else 0.0
+        if intervalo > 0:
+            if interfaces == self._interfaces:
+                anteriores = self._contadores
+                presentes = np.ones(len(interfaces), dtype=bool)
+            else:
+                # Interface criada ou removida (contêineres, VPN): alinha pelos nomes
+                posicao = {nome: i for i, nome in enumerate(self._interfaces)}
+                indices = np.array([posicao.get(nome, -1) for nome in interfaces], dtype=np.int64)
+                presentes = indices >= 0
+                anteriores = self._contadores[np.where(presentes, indices, 0)]
+            # Contador que volta (interface recriada) não gera taxa negativa
+            taxas[presentes] = (np.maximum(contadores - anteriores, 0) / intervalo)[presentes]
+
+        retransmissoes = percentual_retransmissao = None
+        if intervalo > 0 and tcp is not None and self._tcp is not None:
+            enviados = max(tcp[0] - self._tcp[0], 0)
+            retransmitidos = max(tcp[1] - self._tcp[1], 0)
+            retransmissoes = retransmitidos / intervalo
+            percentual_retransmissao = 100.0 * retransmitidos / enviados if enviados else 0.0
+        self._interfaces, self._contadores, self._tcp, self._instante = interfaces, contadores, tcp, instante
+
+        mb = 1024 ** 2
+        linhas = tuple(
+            {
+                "Interface": nome,
+                "RX (MB/s)": taxa_opcional(taxas[i, 0] / mb),
+                "TX (MB/s)": taxa_opcional(taxas[i, 4] / mb),
+                "RX (pacotes/s)": taxa_opcional(taxas[i, 1]),
+                "TX (pacotes/s)": taxa_opcional(taxas[i, 5]),
+                "Erros/s": taxa_opcional(taxas[i, 2] + taxas[i, 6]),
+                "Descartes/s": taxa_opcional(taxas[i, 3] + taxas[i, 7]),
+            }
+            for i, nome in enumerate(interfaces)
+        )
+        externas = np.array([nome not in INTERFACES_LOCAIS for nome in interfaces], dtype=bool)
+        # Interface recém-criada (sem taxa ainda) fica fora da soma
+        soma = np.nansum(taxas[externas], axis=0) if intervalo > 0 else np.full(len(CAMPOS_NET_DEV), np.nan)
+        totais = {
+            "rx_mb_s": taxa_opcional(soma[0] / mb),
+            "tx_mb_s": taxa_opcional(soma[4] / mb),
+            "erros_s": taxa_opcional(soma[2] + soma[6]),
+            "descartes_s": taxa_opcional(soma[3] + soma[7]),
+            "retransmissoes_s": retransmissoes,
+            "retransmissoes_percent": percentual_retransmissao,
+        }
+        return linhas, totais
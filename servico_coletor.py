@@ -0,0 +1,514 @@
+# servico_coletor.py
+#
+# Modo headless: roda o laço de coleta do SystemMonitorConsoleModel e serve o
+# snapshot mais recente por HTTP local (TCP ou socket Unix):
+#
+#   GET /snapshot.json          snapshot completo em JSON compacto
+#   GET /metrics                métricas globais no formato de exposição do Prometheus
+#   GET /historico.json         janela do histórico (?serie=metricas|nucleos&segundos=600)
+#   GET /quem.json              processos que usam um recurso (?termo=/caminho|:porta|socket:[N]|locks)
+#   GET /perfil.json            temporizadores e contadores do coletor (perfil.Perfilador.exportar)
+#
+# As respostas de /snapshot.json e /metrics são montadas uma vez por amostra,
+# na primeira requisição de cada uma; as seguintes só copiam bytes prontos.
+#
+# Uso: python servico_coletor.py [--host 127.0.0.1] [--porta 9101] [--unix CAMINHO] [--intervalo 2]
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from types import MappingProxyType
+from urllib.parse import parse_qs, quote, urlsplit
+import argparse
+import http.client
+import json
+import math
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from model import COLUNAS_PROCESSOS, ArvoreProcessos, SystemMonitorConsoleModel, indice_pids
+from perfil import PERFIL
+from historico import HistoricoMetricas
+
+TIPO_JSON = "application/json"
+TIPO_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Colunas de texto do quadro de processos (restauradas como string[pyarrow] no cliente)
+COLUNAS_TEXTO = ("Nome", "Status", "Usuário", "Comando")
+
+
+# --- SERIALIZAÇÃO ---
+def _lista_json(valores):
+    """
+    Converte um array numérico em lista JSON, trocando NaN por null.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    return np.where(np.isnan(valores), None, valores).tolist()
+
+
+def snapshot_para_json(snapshot):
+    """
+    Converte um snapshot do modelo em um dict serializável (processos em formato colunar).
+    """
+    processos = snapshot["processes"]
+    cpu_nucleos = snapshot["cpu_nucleos"]
+    return {
+        "seq": snapshot["seq"],
+        "timestamp": snapshot["timestamp"],
+        "cpu_usage": snapshot["cpu_usage"],
+        "cpu_idle": snapshot["cpu_idle"],
+        "cpu_nucleos": {
+            "nucleos": cpu_nucleos.index.tolist(),
+            "modos": cpu_nucleos.columns.tolist(),
+            "valores": cpu_nucleos.to_numpy().tolist(),
+        },
+        "mem_info": dict(snapshot["mem_info"]),
+        "rede": dict(snapshot.get("rede", {})),
+        "interfaces_rede": list(snapshot.get("interfaces_rede", ())),
+        "host_saturado": snapshot.get("host_saturado", False),
+        "total_processes": snapshot["total_processes"],
+        "total_threads": snapshot["total_threads"],
+        "processes": {coluna: processos[coluna].tolist() for coluna in processos.columns},
+        "partitions": list(snapshot["partitions"]),
+        "discos_io": list(snapshot.get("discos_io", ())),
+        "processos_io": list(snapshot.get("processos_io", ())),
+        "processos_io_sem_permissao": snapshot.get("processos_io_sem_permissao", 0),
+        "escalonador": list(snapshot.get("escalonador", ())),
+        "versoes": dict(snapshot.get("versoes", {})),
+    }
+
+
+def _numero(valor):
+    """
+    Extrai um número de um campo de partição ("12.34" ou "12.34%"); NaN se não houver.
+    """
+    try:
+        return float(str(valor).rstrip("%"))
+    except ValueError:
+        return float("nan")
+
+
+def _rotulo(valor):
+    """
+    Escapa um valor de rótulo do Prometheus.
+    """
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def snapshot_para_prometheus(snapshot):
+    """
+    Gera o texto de exposição do Prometheus com as métricas globais do snapshot.
+    Métricas por processo ficam de fora para não explodir a cardinalidade.
+    """
+    linhas = []
+
+    def metrica(nome, ajuda, amostras):
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} gauge")
+        for rotulos, valor in amostras:
+            if isinstance(valor, float) and math.isnan(valor):
+                continue
+            texto_rotulos = ",".join(f'{k}="{_rotulo(v)}"' for k, v in rotulos.items())
+            linhas.append(f"{nome}{{{texto_rotulos}}} {valor}" if texto_rotulos else f"{nome} {valor}")
+
+    mem = snapshot["mem_info"]
+    cpu_nucleos = snapshot["cpu_nucleos"]
+    ocioso = cpu_nucleos["idle"] + cpu_nucleos["iowait"]
+    metrica("dashboard_cpu_uso_percent", "Uso total de CPU (%).", [({}, snapshot["cpu_usage"])])
+    metrica("dashboard_cpu_nucleo_uso_percent", "Uso de CPU por núcleo (%).",
+            [({"nucleo": nucleo}, 100.0 - valor) for nucleo, valor in ocioso.items()])
+    metrica("dashboard_memoria_total_kb", "Memória RAM total (kB).", [({}, mem.get("mem_total", 0))])
+    metrica("dashboard_memoria_usada_kb", "Memória RAM usada (kB).", [({}, mem.get("mem_usada", 0))])
+    metrica("dashboard_memoria_usada_percent", "Memória RAM usada (%).", [({}, mem.get("mem_usada_percent", 0))])
+    metrica("dashboard_swap_total_kb", "SWAP total (kB).", [({}, mem.get("swap_total", 0))])
+    metrica("dashboard_swap_usada_kb", "SWAP usada (kB).", [({}, mem.get("swap_usada", 0))])
+    metrica("dashboard_processos", "Processos ativos.", [({}, snapshot["total_processes"])])
+    metrica("dashboard_threads", "Threads ativas.", [({}, snapshot["total_threads"])])
+    metrica("dashboard_particao_uso_percent", "Uso da partição (%).", [
+        ({"dispositivo": p.get("Dispositivo"), "ponto": p.get("Ponto de Montagem")}, _numero(p.get("Uso (%)")))
+        for p in snapshot["partitions"]
+    ])
+    interfaces = snapshot.get("interfaces_rede", ())
+    for nome, ajuda, coluna in (
+        ("dashboard_rede_rx_mb_s", "Recepção da interface (MB/s).", "RX (MB/s)"),
+        ("dashboard_rede_tx_mb_s", "Transmissão da interface (MB/s).", "TX (MB/s)"),
+        ("dashboard_rede_erros_s", "Erros de recepção e transmissão por segundo.", "Erros/s"),
+        ("dashboard_rede_descartes_s", "Pacotes descartados por segundo.", "Descartes/s"),
+    ):
+        metrica(nome, ajuda, [({"interface": i["Interface"]}, _numero(i[coluna])) for i in interfaces])
+    metrica("dashboard_tcp_retransmissoes_s", "Segmentos TCP retransmitidos por segundo.",
+            [({}, _numero(snapshot.get("rede", {}).get("retransmissoes_s")))])
+    discos = snapshot.get("discos_io", ())
+    for nome, ajuda, coluna in (
+        ("dashboard_disco_iops_leitura", "Leituras concluídas por segundo.", "IOPS Leitura"),
+        ("dashboard_disco_iops_escrita", "Escritas concluídas por segundo.", "IOPS Escrita"),
+        ("dashboard_disco_leitura_mb_s", "Vazão de leitura do dispositivo (MB/s).", "Leitura (MB/s)"),
+        ("dashboard_disco_escrita_mb_s", "Vazão de escrita do dispositivo (MB/s).", "Escrita (MB/s)"),
+        ("dashboard_disco_utilizacao_percent", "Tempo com E/S em curso (%).", "Utilização (%)"),
+    ):
+        metrica(nome, ajuda, [({"dispositivo": d["Dispositivo"]}, _numero(d[coluna])) for d in discos])
+    metrica("dashboard_coleta_seq", "Número de sequência do snapshot.", [({}, snapshot["seq"])])
+    metrica("dashboard_coleta_timestamp_seconds", "Instante da coleta (epoch).", [({}, snapshot["timestamp"])])
+    return "\n".join(linhas) + "\n"
+
+
+# --- SERVIDOR ---
+# Formatos servidos a partir do snapshot: rota -> (sufixo do ETag, tipo, serialização)
+FORMATOS_SNAPSHOT = {
+    "/snapshot.json": ("json", TIPO_JSON,
+                       lambda snapshot: json.dumps(snapshot_para_json(snapshot), separators=(",", ":")).encode()),
+    "/metrics": ("prometheus", TIPO_PROMETHEUS, lambda snapshot: snapshot_para_prometheus(snapshot).encode()),
+}
+
+
+class PublicadorSnapshots:
+    """
+    Guarda o último snapshot (é assinante do modelo) e as respostas já
+    montadas a partir dele. Cada formato é serializado na primeira requisição
+    após uma amostra nova, fora da thread do coletor: sem clientes, nada é
+    serializado. Cada formato tem o seu ETag.
+    """
+    def __init__(self, modelo):
+        """
+        Registra-se no modelo.
+        """
+        self.modelo = modelo
+        self.snapshot = None
+        self._respostas = {}  # rota -> (seq, etag, corpo)
+        self._lock = threading.Lock()
+        # Entra no ETag para que um reinício do serviço (seq volta a 1) não gere 304 falso
+        self._inicio = int(time.time())
+        modelo.assinar(self.publicar)
+
+    def publicar(self, snapshot):
+        """
+        Guarda o snapshot novo (as respostas antigas vencem pelo seq).
+        """
+        self.snapshot = snapshot
+
+    def resposta(self, rota):
+        """
+        (etag, corpo) do último snapshot na rota de FORMATOS_SNAPSHOT, ou None
+        antes da primeira amostra.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        seq = snapshot["seq"]
+        # Uma serialização por seq e formato, mesmo com requisições simultâneas
+        with self._lock:
+            pronta = self._respostas.get(rota)
+            if pronta is None or pronta[0] != seq:
+                sufixo, _, serializar = FORMATOS_SNAPSHOT[rota]
+                pronta = self._respostas[rota] = (seq, f'"{self._inicio}-{seq}-{sufixo}"', serializar(snapshot))
+        return pronta[1], pronta[2]
+
+    def historico(self, serie, segundos, colunas=None):
+        """
+        Janela do histórico em formato JSON (calculada por requisição, limitada à janela).
+        """
+        armazenamento = self.modelo.historico_nucleos if serie == "nucleos" else self.modelo.historico
+        tempos, valores = armazenamento.consultar(colunas, segundos=segundos)
+        nomes = colunas if colunas is not None else list(armazenamento.colunas)
+        return json.dumps({
+            "colunas": nomes,
+            "tempos": tempos.tolist(),
+            "valores": {nome: _lista_json(valores[:, i]) for i, nome in enumerate(nomes)},
+        }, separators=(",", ":")).encode()
+
+
+    def quem(self, termo):
+        """
+        Consulta ao índice reverso em formato JSON (calculada por requisição).
+        """
+        indice = self.modelo.indice_reverso
+        return json.dumps({
+            "estado": indice.estado(),
+            "resultados": indice.consultar(termo),
+        }, separators=(",", ":")).encode()
+
+    def perfil(self):
+        """
+        Temporizadores e contadores do coletor em formato JSON (calculados por requisição).
+        """
+        dados = PERFIL.exportar()
+        for linha in dados["resumo"]:
+            linha.update({chave: None for chave, valor in linha.items()
+                          if isinstance(valor, float) and math.isnan(valor)})
+        return json.dumps(dados, separators=(",", ":")).encode()
+
+
+class ManipuladorColetor(BaseHTTPRequestHandler):
+    """
+    Serve as respostas pré-montadas do PublicadorSnapshots.
+    """
+    publicador = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in FORMATOS_SNAPSHOT:
+            resposta = self.publicador.resposta(url.path)
+            if resposta is None:
+                self._responder(503, TIPO_JSON, b'{"erro":"sem amostras ainda"}')
+                return
+            etag, corpo = resposta
+            if self.headers.get("If-None-Match") == etag:
+                self._responder(304, None, b"", etag)
+            else:
+                self._responder(200, FORMATOS_SNAPSHOT[url.path][1], corpo, etag)
+        elif url.path == "/historico.json":
+            parametros = parse_qs(url.query)
+            try:
+                serie = parametros.get("serie", ["metricas"])[0]
+                segundos = float(parametros.get("segundos", ["600"])[0])
+                colunas = parametros["colunas"][0].split(",") if "colunas" in parametros else None
+                self._responder(200, TIPO_JSON, self.publicador.historico(serie, segundos, colunas))
+            except (KeyError, ValueError) as e:
+                self._responder(400, TIPO_JSON, json.dumps({"erro": str(e)}).encode())
+        elif url.path == "/quem.json":
+            termo = parse_qs(url.query).get("termo", [""])[0]
+            self._responder(200, TIPO_JSON, self.publicador.quem(termo))
+        elif url.path == "/perfil.json":
+            self._responder(200, TIPO_JSON, self.publicador.perfil())
+        else:
+            self._responder(404, TIPO_JSON, b'{"erro":"rota desconhecida"}')
+
+    def _responder(self, codigo, tipo, corpo, etag=None):
+        self.send_response(codigo)
+        if tipo is not None:
+            self.send_header("Content-Type", tipo)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        # Sem log por requisição: centenas de scrapes por segundo não devem custar E/S
+        pass
+
+
+class ServidorUnix(ThreadingMixIn, UnixStreamServer):
+    """
+    Servidor HTTP em socket Unix, uma thread por conexão.
+    """
+    daemon_threads = True
+
+    def get_request(self):
+        requisicao, _ = super().get_request()
+        return requisicao, ("unix", 0)
+
+
+def criar_servidor(modelo, host="127.0.0.1", porta=9101, caminho_unix=None):
+    """
+    Cria o servidor HTTP (TCP ou socket Unix) ligado ao modelo.
+    """
+    manipulador = type("Manipulador", (ManipuladorColetor,), {"publicador": PublicadorSnapshots(modelo)})
+    if caminho_unix:
+        if os.path.exists(caminho_unix):
+            os.unlink(caminho_unix)
+        return ServidorUnix(caminho_unix, manipulador)
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+# --- CLIENTE (usado pelo controller) ---
+class _ConexaoUnix(http.client.HTTPConnection):
+    """
+    HTTPConnection sobre socket Unix.
+    """
+    def __init__(self, caminho, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self._caminho = caminho
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._caminho)
+
+
+class HistoricoRemoto:
+    """
+    Expõe a mesma consulta de HistoricoMetricas lendo /historico.json do serviço.
+    """
+    def __init__(self, cliente, serie, colunas):
+        self._cliente = cliente
+        self._serie = serie
+        self.colunas = tuple(colunas)
+
+    def consultar(self, colunas=None, segundos=600, agora=None):
+        consulta = f"/historico.json?serie={self._serie}&segundos={segundos}"
+        if colunas is not None:
+            consulta += "&colunas=" + ",".join(colunas)
+        dados = json.loads(self._cliente.obter(consulta))
+        tempos = np.asarray(dados["tempos"], dtype=np.float64)
+        valores = np.column_stack([
+            np.asarray(dados["valores"][nome], dtype=np.float64) for nome in dados["colunas"]
+        ]) if dados["colunas"] else np.zeros((len(tempos), 0))
+        return tempos, valores.reshape(len(tempos), len(dados["colunas"]))
+
+
+class IndiceReversoRemoto:
+    """
+    Expõe a mesma consulta de IndiceReverso lendo /quem.json do serviço.
+    """
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self._estado = {}
+
+    def consultar(self, termo, limite=1000):
+        dados = json.loads(self._cliente.obter(f"/quem.json?termo={quote(termo)}"))
+        self._estado = dados["estado"]
+        return [tuple(r) for r in dados["resultados"][:limite]]
+
+    def estado(self):
+        if not self._estado:
+            self._estado = json.loads(self._cliente.obter("/quem.json"))["estado"]
+        return self._estado
+
+
+class PerfilRemoto:
+    """
+    Expõe o resumo e os contadores do Perfilador do serviço lendo /perfil.json.
+    """
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self._dados = None
+
+    def exportar(self):
+        if self._dados is None:
+            self._dados = json.loads(self._cliente.obter("/perfil.json"))
+        return self._dados
+
+    def resumo(self, prefixo=None):
+        return [linha for linha in self.exportar()["resumo"]
+                if prefixo is None or linha["Seção"].startswith(prefixo)]
+
+    def contadores(self, prefixo=None):
+        return {nome: valor for nome, valor in self.exportar()["contadores"].items()
+                if prefixo is None or nome.startswith(prefixo)}
+
+
+class ClienteColetor:
+    """
+    Lê snapshots de um serviço headless ("http://host:porta" ou "unix:/caminho")
+    e os devolve no mesmo formato de SystemMonitorConsoleModel.get_snapshot().
+    Um snapshot buscado é reaproveitado por `validade` segundos entre as sessões.
+    """
+    def __init__(self, url, timeout=5.0, validade=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.validade = validade
+        self._lock = threading.Lock()
+        self._cache = (0.0, None)
+        self._etag = None
+
+    def _conexao(self):
+        if self.url.startswith("unix:"):
+            return _ConexaoUnix(self.url[len("unix:"):], self.timeout)
+        partes = urlsplit(self.url)
+        return http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=self.timeout)
+
+    def obter(self, caminho):
+        """
+        Faz um GET e devolve o corpo.
+        """
+        return self._requisitar(caminho)[0]
+
+    def _requisitar(self, caminho, etag=None):
+        """
+        Faz um GET e devolve (corpo, etag); corpo é None em 304 Not Modified.
+        """
+        conexao = self._conexao()
+        try:
+            cabecalhos = {"If-None-Match": etag} if etag else {}
+            conexao.request("GET", caminho, headers=cabecalhos)
+            resposta = conexao.getresponse()
+            corpo = resposta.read()
+            if resposta.status == 304:
+                return None, etag
+            if resposta.status != 200:
+                raise ConnectionError(f"serviço coletor respondeu {resposta.status}: {corpo[:200]!r}")
+            return corpo, resposta.getheader("ETag")
+        finally:
+            conexao.close()
+
+    def get_snapshot(self):
+        """
+        Retorna o snapshot mais recente do serviço (somente leitura).
+        """
+        with self._lock:
+            instante, snapshot = self._cache
+            if snapshot is not None and time.monotonic() - instante < self.validade:
+                return snapshot
+            corpo, self._etag = self._requisitar("/snapshot.json", self._etag if snapshot is not None else None)
+            if corpo is not None:
+                snapshot = self._reconstruir(json.loads(corpo))
+            self._cache = (time.monotonic(), snapshot)
+            return snapshot
+
+    def _reconstruir(self, dados):
+        """
+        Converte o JSON do serviço de volta nas estruturas que a view espera.
+        """
+        processos = pd.DataFrame(dados["processes"], columns=list(COLUNAS_PROCESSOS))
+        for coluna in COLUNAS_TEXTO:
+            processos[coluna] = processos[coluna].astype("string[pyarrow]")
+        nucleos = dados["cpu_nucleos"]
+        cpu_nucleos = pd.DataFrame(
+            nucleos["valores"], columns=nucleos["modos"],
+            index=pd.Index(nucleos["nucleos"], name="Núcleo"),
+        )
+        dados.update({
+            "processes": processos,
+            "indice_pids": indice_pids(processos),
+            "arvore": ArvoreProcessos(processos),
+            "cpu_nucleos": cpu_nucleos,
+            "mem_info": MappingProxyType(dados["mem_info"]),
+            "rede": MappingProxyType(dados.get("rede", {})),
+            "interfaces_rede": tuple(dados.get("interfaces_rede", ())),
+            "partitions": tuple(dados["partitions"]),
+            "discos_io": tuple(dados.get("discos_io", ())),
+            "processos_io": tuple(dados.get("processos_io", ())),
+            "processos_io_sem_permissao": int(dados.get("processos_io_sem_permissao", 0)),
+            "historico": HistoricoRemoto(self, "metricas", HistoricoMetricas.COLUNAS_PADRAO),
+            "historico_nucleos": HistoricoRemoto(self, "nucleos", nucleos["nucleos"]),
+            "indice_reverso": IndiceReversoRemoto(self),
+            "escalonador": tuple(dados.get("escalonador", ())),
+            "versoes": MappingProxyType(dados.get("versoes", {})),
+            "perfil": PerfilRemoto(self),
+        })
+        return MappingProxyType(dados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coletor headless do dashboard (JSON e Prometheus).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=9101)
+    parser.add_argument("--unix", dest="caminho_unix", default=None, help="Servir em um socket Unix")
+    parser.add_argument("--intervalo", type=float, default=2.0, help="Intervalo de coleta (s)")
+    argumentos = parser.parse_args()
+
+    modelo = SystemMonitorConsoleModel(intervalo=argumentos.intervalo)
+    servidor = criar_servidor(modelo, argumentos.host, argumentos.porta, argumentos.caminho_unix)
+    modelo.start()
+    destino = argumentos.caminho_unix or f"http://{argumentos.host}:{argumentos.porta}"
+    print(f"Coletor headless servindo em {destino}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando...")
+    finally:
+        servidor.server_close()
+        modelo.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# test_escalonador.py
+
+import escalonador
+from escalonador import Escalonador
+
+
+class RelogioFalso:
+    """
+    Substitui o módulo time do escalonador: o tempo de CPU da thread só anda
+    quando uma etapa "gasta".
+    """
+    def __init__(self):
+        self.cpu = 0.0
+
+    def thread_time(self):
+        return self.cpu
+
+    def monotonic(self):
+        return 0.0
+
+    def etapa(self, custo):
+        def funcao():
+            self.cpu += custo
+        return funcao
+
+
+def montar(monkeypatch, orcamento=0.1):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(escalonador, "time", relogio)
+    agenda = Escalonador(orcamento=orcamento)
+    agenda.adicionar("globais", relogio.etapa(0.005), 1.0, prioridade=0)
+    processos = agenda.adicionar("processos", relogio.etapa(0.150), 2.0, prioridade=1)
+    return agenda, processos
+
+
+def test_host_ocioso_roda_cada_etapa_no_seu_intervalo(monkeypatch):
+    # 150 ms a cada 2 s são 7,5% de um núcleo: cabem no orçamento de 10%
+    agenda, processos = montar(monkeypatch)
+    rodadas = [t for t in range(24) if "processos" in agenda.tick(lambda: 5.0, agora=float(t))]
+    assert rodadas == list(range(0, 24, 2))
+    assert processos.adiamentos == 0
+    assert not agenda.saturado
+
+
+def test_host_saturado_adia_sem_passar_do_atraso_maximo(monkeypatch):
+    agenda, processos = montar(monkeypatch, orcamento=0.1)
+    rodadas = [t for t in range(60) if "processos" in agenda.tick(lambda: 95.0, agora=float(t))]
+    assert agenda.saturado
+    assert processos.adiamentos > 0
+    espera_maxima = agenda.atraso_maximo * processos.intervalo * agenda.fator_saturacao
+    assert all(b - a <= espera_maxima for a, b in zip(rodadas, rodadas[1:]))
@@ -0,0 +1,50 @@
+# test_model.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import consultar_processos
+
+
+def quadro_com_empates(n=5000, distintos=50, semente=0):
+    """
+    Quadro de processos com `n` linhas, das quais só `distintos` têm CPU
+    diferente de zero, em ordem de PID embaralhada.
+    """
+    gerador = np.random.default_rng(semente)
+    cpu = np.zeros(n)
+    cpu[gerador.choice(n, distintos, replace=False)] = gerador.uniform(1, 100, distintos)
+    return pd.DataFrame({
+        "PID": gerador.permutation(np.arange(1, n + 1)),
+        "Nome": "proc",
+        "Comando": "proc --opcao",
+        "Usuário": "root",
+        "Status": "S",
+        "CPU %": cpu,
+    })
+
+
+@pytest.mark.parametrize("decrescente", [True, False])
+def test_paginas_percorrem_todos_os_pids_com_empates(decrescente):
+    processos = quadro_com_empates()
+    paginas = []
+    for pagina in range(50):
+        pagina_df, total = consultar_processos(processos, ordenar_por="CPU %", decrescente=decrescente,
+                                               pagina=pagina, tamanho_pagina=100)
+        assert total == len(processos)
+        paginas.append(pagina_df)
+    juntas = pd.concat(paginas)
+    assert sorted(juntas["PID"]) == sorted(processos["PID"])
+
+    # A concatenação das páginas é a ordenação completa (chave, depois PID)
+    chave = -processos["CPU %"] if decrescente else processos["CPU %"]
+    esperado = processos.assign(chave=chave).sort_values(["chave", "PID"])["PID"]
+    assert juntas["PID"].tolist() == esperado.tolist()
+
+
+def test_pagina_alem_do_fim_vem_vazia():
+    processos = quadro_com_empates(n=120)
+    pagina_df, total = consultar_processos(processos, pagina=5, tamanho_pagina=100)
+    assert total == 120
+    assert pagina_df.empty
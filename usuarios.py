@@ -0,0 +1,143 @@
+# usuarios.py
+
+import os
+import pwd
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Diretório com passwd e group (ex.: /host/etc em contêiner, junto com DASHBOARD_PROC)
+RAIZ_ETC = os.environ.get("DASHBOARD_ETC", "/etc")
+
+
+def interpretar_tabela_nomes(conteudo):
+    """
+    Extrai {id: nome} do conteúdo (bytes) de /etc/passwd ou /etc/group
+    (nome:senha:id:...). Linhas malformadas e comentários são ignorados;
+    com ids repetidos vale a primeira linha, como no getpwuid.
+    """
+    nomes = {}
+    for linha in conteudo.split(b"\n"):
+        campos = linha.split(b":", 3)
+        if len(campos) < 3 or linha.startswith(b"#"):
+            continue
+        try:
+            ident = int(campos[2])
+        except ValueError:
+            continue
+        nomes.setdefault(ident, campos[0].decode(errors="replace"))
+    return nomes
+
+
+# --- TABELA DE NOMES ---
+class TabelaNomes:
+    """
+    Nomes de usuários (ou grupos) por id, lidos de uma vez do arquivo local e
+    relidos só quando a identidade do arquivo (mtime, inode, tamanho) muda;
+    a mudança é conferida no máximo a cada `verificacao` segundos.
+
+    Ids ausentes do arquivo (NSS/LDAP) aparecem como o número e são resolvidos
+    por `resolver` (pwd.getpwuid/grp.getgrgid) numa thread própria, para uma
+    consulta lenta ao diretório nunca travar a coleta.
+    """
+    def __init__(self, caminho, resolver=None, verificacao=1.0):
+        """
+        Inicializa vazio; o arquivo é lido na primeira consulta.
+        """
+        self.caminho = caminho
+        self.resolver = resolver
+        self.verificacao = verificacao
+        self._nomes = {}
+        self._externos = {}    # Resolvidos pelo NSS (None = id sem nome)
+        self._identidade = None
+        self._verificado_em = None
+        self._lock = threading.Lock()
+        self._pendentes = queue.SimpleQueue()
+        self._enfileirados = set()
+        self._thread = None
+
+    def _atualizar(self):
+        """
+        Relê o arquivo se ele mudou desde a última leitura.
+        """
+        agora = time.monotonic()
+        if self._verificado_em is not None and agora - self._verificado_em < self.verificacao:
+            return
+        self._verificado_em = agora
+        try:
+            st = os.stat(self.caminho)
+            identidade = (st.st_mtime_ns, st.st_ino, st.st_size)
+            if identidade == self._identidade:
+                return
+            with open(self.caminho, "rb") as f:
+                nomes = interpretar_tabela_nomes(f.read())
+        except OSError:
+            identidade, nomes = None, {}
+        with self._lock:
+            self._nomes = nomes
+            self._externos = {}
+            self._enfileirados = set()
+            self._identidade = identidade
+
+    def _resolver_em_segundo_plano(self, ident):
+        """
+        Enfileira `ident` para o resolvedor NSS (uma única vez por id).
+        """
+        if self.resolver is None or ident in self._enfileirados or ident < 0:
+            return
+        self._enfileirados.add(ident)
+        self._pendentes.put(ident)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop_resolvedor, daemon=True)
+            self._thread.start()
+
+    def _loop_resolvedor(self):
+        while True:
+            ident = self._pendentes.get()
+            try:
+                nome = self.resolver(ident)[0]
+            except Exception:
+                # Id sem nome (KeyError) ou falha do backend NSS (LDAP/sssd fora do ar):
+                # o id fica com o número e a thread segue para os próximos
+                nome = None
+            with self._lock:
+                self._externos[ident] = nome
+
+    def _procurar(self, ident):
+        nome = self._nomes.get(ident)
+        if nome is None:
+            nome = self._externos.get(ident)
+            if nome is None:
+                if ident not in self._externos:
+                    self._resolver_em_segundo_plano(ident)
+                nome = str(ident)
+        return nome
+
+    def nome(self, ident):
+        """
+        Nome do id (ou o próprio número, enquanto não houver nome).
+        """
+        self._atualizar()
+        with self._lock:
+            return self._procurar(ident)
+
+    def nomes(self, idents):
+        """
+        Nomes de um array de ids como coluna string[pyarrow]: cada id
+        distinto é procurado uma só vez.
+        """
+        idents = np.asarray(idents, dtype=np.int64)
+        self._atualizar()
+        unicos, inverso = np.unique(idents, return_inverse=True)
+        with self._lock:
+            nomes = np.array([self._procurar(int(ident)) for ident in unicos], dtype=object)
+        return pd.array(nomes[inverso] if len(idents) else [], dtype="string[pyarrow]")
+
+
+# Tabela compartilhada pelo processo. Com outra raiz (/host/etc), o NSS local
+# não descreve os usuários do host: sem resolvedor, vale só o arquivo.
+NOMES_USUARIOS = TabelaNomes(os.path.join(RAIZ_ETC, "passwd"),
+                             pwd.getpwuid if RAIZ_ETC == "/etc" else None)
@@ -3,39 +3,232 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from model import get_process_open_files
-from model import get_process_resources
+from model import (COLUNAS_PROCESSOS, agregar_por_usuario, buscar_processo, consultar_processos,
+                   filtrar_processos, inspetor_descritores, motor_tamanhos, navegador_arquivos, processos_vazio)
+from navegador import TIPOS_ENTRADA
+from perfil import PERFIL
 import altair as alt
 from datetime import datetime
-
-_swap_history = []
-_swap_history_maxlen = 30
-
-def set_style():
+from functools import lru_cache
+import json
+import threading
+
+# Janelas do histórico oferecidas na tela (segundos)
+JANELAS_HISTORICO = {"10 min": 600, "24 h": 86400, "30 dias": 30 * 86400}
+# Paginação da tabela de processos e limite de resultados da busca por nome
+TAMANHOS_PAGINA = (50, 100, 500)
+LIMITE_BUSCA = 20
+# Linhas exibidas no modo árvore (com tudo expandido a árvore pode ter milhares)
+LIMITE_LINHAS_ARVORE = 2000
+# Descritores por página na inspeção de recursos e espera pela varredura em cada rerun (s)
+TAMANHO_PAGINA_RECURSOS = 200
+ESPERA_VARREDURA = 0.3
+# Entradas por página no navegador de diretórios
+TAMANHO_PAGINA_ARQUIVOS = 200
+
+class CacheRenderizacao:
+    """
+    Objetos derivados dos dados de uma etapa de coleta (DataFrames dos
+    gráficos, páginas da tabela de processos), compartilhados por todas as
+    sessões e descartados quando a etapa produz dados novos (outra versão).
+
+    Enquanto a etapa não roda de novo, cada rerun de cada aba reaproveita os
+    mesmos objetos, mesmo com snapshots novos de outras etapas: não refaz
+    consultas nem DataFrames, e os elementos saem idênticos ao envio
+    anterior, de modo que o cache de mensagens do Streamlit manda ao
+    navegador só a referência dos maiores.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grupos = {}  # etapa -> (versão, {chave: item})
+
+    def obter(self, etapa, versao, chave, construir):
+        """
+        Retorna o item `chave` da versão `versao` da etapa, construindo-o na primeira vez.
+        """
+        with self._lock:
+            grupo = self._grupos.get(etapa)
+            if grupo is None or grupo[0] != versao:
+                grupo = self._grupos[etapa] = (versao, {})
+            itens = grupo[1]
+            if chave in itens:
+                return itens[chave]
+        item = construir()
+        with self._lock:
+            if self._grupos[etapa][0] == versao:
+                itens.setdefault(chave, item)
+        return item
+
+_cache_renderizacao = CacheRenderizacao()
+
+def cache_render(data, chave, construir, etapa=None):
+    """
+    Item `chave` derivado do snapshot `data`, construído uma vez por versão
+    dos dados de `etapa` (ou uma vez por snapshot, sem etapa ou sem versões).
+    """
+    versao = data.get("versoes", {}).get(etapa) if etapa is not None else None
+    if versao is None:
+        etapa, versao = None, data.get("seq")
+    if versao is None:
+        return construir()
+    return _cache_renderizacao.obter(etapa, versao, chave, construir)
+
+@lru_cache(maxsize=1)
+def custo_medicao():
+    """
+    Custo (µs) de uma medição do perfilador, medido uma única vez por processo.
+    """
+    return PERFIL.custo_medicao(200)
+
+@lru_cache(maxsize=1)
+def css_retro():
+    """
+    Conteúdo de retro_style.css, lido do disco uma única vez (None se ausente).
+    """
     try:
         with open("retro_style.css", "r") as f:
-            css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+            return f"<style>{f.read()}</style>"
     except FileNotFoundError:
-        st.warning("Arquivo 'retro_style.css' não encontrado.")
+        return None
 
-_memory_history = []
-_memory_history_maxlen = 30
+def set_style():
+    css = css_retro()
+    if css is None:
+        st.warning("Arquivo 'retro_style.css' não encontrado.")
+    else:
+        st.markdown(css, unsafe_allow_html=True)
+
+def _sem_dados(grafico):
+    """
+    Especificação Vega-Lite de um gráfico Altair, sem os dados.
+    """
+    especificacao = grafico.to_dict()
+    especificacao.pop("data", None)
+    especificacao.pop("datasets", None)
+    return especificacao
+
+@lru_cache(maxsize=None)
+def modelo_grafico(nome, nucleos=()):
+    """
+    Especificação Vega-Lite (sem dados) de um gráfico do painel, montada uma
+    vez por processo; cada rerun só passa o DataFrame para st.vega_lite_chart.
+    """
+    eixo = alt.Axis(title="", labelColor="#00FF00", tickColor="#004400", gridColor="#004400")
+    if nome == "cpu":
+        return _sem_dados(alt.Chart().mark_line(
+            color="#00FF00",
+            strokeWidth=2
+        ).encode(
+            x=alt.X("Tempo:T", axis=None),
+            y=alt.Y("Uso da CPU (%):Q", scale=alt.Scale(domain=[0, 100])),
+            tooltip=["Tempo:T", "Uso da CPU (%):Q"]
+        ).properties(
+            width="container",
+            height=200,
+            background="#000000"
+        ).configure_axis(
+            grid=True,
+            gridColor="#004400",
+            gridOpacity=0.3
+        ).configure_view(
+            stroke=None
+        ))
+    if nome in ("mem", "swap"):
+        coluna, titulo, cor = {
+            "mem": ("Usada", "Memória (%)", "#00FFFF"),  # Azul neon
+            "swap": ("SWAP", "SWAP (%)", "#FF00FF"),     # Magenta neon
+        }[nome]
+        return _sem_dados(alt.Chart().mark_line(
+            color=cor,
+            strokeWidth=2
+        ).encode(
+            x=alt.X("Tempo:T", axis=eixo),
+            y=alt.Y(f"{coluna}:Q", axis=alt.Axis(title=titulo, labelColor="#00FF00", tickColor="#004400",
+                                                 gridColor="#004400"))
+        ).properties(
+            height=200,
+            width=500,
+            background="#000000"
+        ).configure_view(
+            stroke=None
+        ).configure_axis(
+            grid=True,
+            gridColor="#004400",
+            domain=False
+        ))
+    if nome == "nucleos":
+        return _sem_dados(alt.Chart().mark_rect().encode(
+            x=alt.X("Tempo:O", axis=None),
+            y=alt.Y("Núcleo:N", sort=list(nucleos), axis=alt.Axis(labelColor="#00FF00", title="")),
+            color=alt.Color("Uso (%):Q", scale=alt.Scale(domain=[0, 100], scheme="greens"), legend=None),
+            tooltip=["Núcleo:N", "Tempo:T", alt.Tooltip("Uso (%):Q", format=".1f")]
+        ).properties(
+            height=max(120, 14 * len(nucleos)),
+            background="#000000"
+        ).configure_view(
+            stroke=None
+        ))
+    if nome == "rede":
+        return _sem_dados(alt.Chart().mark_line(
+            strokeWidth=2
+        ).encode(
+            x=alt.X("Tempo:T", axis=eixo),
+            y=alt.Y("MB/s:Q", axis=alt.Axis(title="MB/s", labelColor="#00FF00", tickColor="#004400",
+                                            gridColor="#004400")),
+            color=alt.Color("Sentido:N", scale=alt.Scale(domain=["RX", "TX"], range=["#00FF00", "#FFFF00"]),
+                            legend=alt.Legend(labelColor="#00FF00", title=None, orient="top")),
+            tooltip=["Tempo:T", "Sentido:N", alt.Tooltip("MB/s:Q", format=".2f")]
+        ).properties(
+            height=200,
+            background="#000000"
+        ).configure_view(
+            stroke=None
+        ).configure_axis(
+            grid=True,
+            gridColor="#004400",
+            domain=False
+        ))
+    raise KeyError(nome)
+
+def serie_historico(data, coluna, nome, segundos):
+    """
+    Monta o DataFrame de uma métrica do histórico do modelo (colunas "Tempo" e `nome`),
+    consultando apenas a janela exibida. A janela termina no instante do
+    snapshot, então o mesmo snapshot sempre gera o mesmo DataFrame (cacheado).
+    """
+    historico = data.get('historico')
+    if historico is None:
+        return pd.DataFrame({"Tempo": pd.to_datetime([]), nome: []})
+
+    def construir():
+        tempos, valores = historico.consultar([coluna], segundos=segundos, agora=data.get("timestamp"))
+        return pd.DataFrame({
+            "Tempo": pd.to_datetime(tempos, unit="s"),
+            nome: valores[:, 0],
+        })
+    return cache_render(data, ("serie", coluna, segundos), construir)
 
 def render_dashboard(data):
     # st.set_page_config(page_title="Dashboard de Processos", layout="wide", initial_sidebar_state="collapsed")
-    set_style()
+    with PERFIL.medir("render.estilo"):
+        set_style()
     st.title("DASHBOARD DE PROCESSOS E SISTEMAS - Pedro & Vitor")
 
     # O resto do código da view permanece exatamente o mesmo
-    tab1, tab2 = st.tabs(["📊 Monitor de Recursos", "🗄️ Sistema de Arquivos"])
-    with tab1:
+    tab1, tab2, tab3 = st.tabs(["📊 Monitor de Recursos", "🗄️ Sistema de Arquivos", "⚙️ Internals"])
+    with tab1, PERFIL.medir("render.monitor"):
         render_resource_monitor(data)
-    with tab2:
+    with tab2, PERFIL.medir("render.arquivos"):
         render_filesystem_browser(data)
+    with tab3:
+        render_internals(data)
 
 def render_resource_monitor(data):
     st.header("Visão Geral do Sistema")
+    if data.get("host_saturado"):
+        st.caption("⚠️ Host saturado: a coleta de processos e partições está mais espaçada.")
+    janela = st.radio("Janela do histórico:", options=list(JANELAS_HISTORICO), horizontal=True, key="janela_historico")
+    segundos = JANELAS_HISTORICO[janela]
     col1, col2, col3 = st.columns(3)
     with col1:
         # st.markdown('<div class="stats-box">', unsafe_allow_html=True)
@@ -43,37 +236,13 @@ def render_resource_monitor(data):
         st.markdown("### 💻 CPU")
         # st.progress(uso_cpu / 100)
         st.write(f"Uso da CPU: **{uso_cpu:.2f}%**")
-        cpu_history = data.get('cpu_history', [uso_cpu])
-        cpu_df = pd.DataFrame(cpu_history, columns=["Uso da CPU (%)"])
-
         # Antigo gráfico
         # st.line_chart(cpu_df, use_container_width=True)
 
         ###########################################################################
 
-        cpu_df = pd.DataFrame(cpu_history, columns=["Uso da CPU (%)"])
-        cpu_df["Tempo"] = list(range(len(cpu_df)))  # eixo X fictício
-
-        line_chart = alt.Chart(cpu_df).mark_line(
-            color="#00FF00",
-            strokeWidth=2
-        ).encode(
-            x=alt.X("Tempo", axis=None),
-            y=alt.Y("Uso da CPU (%)", scale=alt.Scale(domain=[0, 100])),
-            tooltip=["Tempo", "Uso da CPU (%)"]
-        ).properties(
-            width="container",
-            height=200,
-            background="#000000"
-        ).configure_axis(
-            grid=True,
-            gridColor="#004400",
-            gridOpacity=0.3
-        ).configure_view(
-            stroke=None
-        )
-
-        st.altair_chart(line_chart, use_container_width=True)
+        cpu_df = serie_historico(data, "cpu", "Uso da CPU (%)", segundos)
+        st.vega_lite_chart(cpu_df, modelo_grafico("cpu"), use_container_width=True)
 
         ###########################################################################
         st.markdown('</div>', unsafe_allow_html=True)
@@ -86,33 +255,9 @@ def render_resource_monitor(data):
         st.markdown("### 🧠 Memória RAM")
         # st.progress(mem_usada_percent / 100)
         st.write(f"Usada: **{mem_usada_percent:.2f}%** ({mem_usada_mb:.1f} MB de {mem_total_mb:.1f} MB)")
-        global _memory_history
-        _memory_history.append({"Usada": mem_usada_percent})
-        if len(_memory_history) > _memory_history_maxlen: _memory_history.pop(0)
-        mem_hist_df = pd.DataFrame(_memory_history)
-        # st.line_chart(mem_hist_df, use_container_width=True)
         # Gráfico retrô de memória RAM
-        mem_df = mem_hist_df
-        mem_df["Tempo"] = range(len(mem_df))
-        mem_chart = alt.Chart(mem_df).mark_line(
-            color="#00FFFF",  # Azul neon
-            strokeWidth=2
-        ).encode(
-            x=alt.X("Tempo", axis=alt.Axis(title="", labelColor="#00FF00", tickColor="#004400", gridColor="#004400")),
-            y=alt.Y("Usada", axis=alt.Axis(title="Memória (%)", labelColor="#00FF00", tickColor="#004400", gridColor="#004400"))
-        ).properties(
-            height=200,
-            width=500,
-            background="#000000"
-        ).configure_view(
-            stroke=None
-        ).configure_axis(
-            grid=True,
-            gridColor="#004400",
-            domain=False
-        )
-
-        st.altair_chart(mem_chart, use_container_width=True)
+        mem_df = serie_historico(data, "mem", "Usada", segundos)
+        st.vega_lite_chart(mem_df, modelo_grafico("mem"), use_container_width=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
     with col3:
@@ -120,97 +265,330 @@ def render_resource_monitor(data):
 
         swap_total_mb = mem_info.get('SwapTotal', 0) / 1024
         swap_usada_mb = mem_info.get('swap_usada', 0) / 1024
-        swap_usada_percent = (swap_usada_mb / swap_total_mb * 100) if swap_total_mb > 0 else 0
 
         st.write(f"SWAP Usado: **{swap_usada_mb:.1f} MB** / **{swap_total_mb:.1f} MB**")
 
-        # Atualiza histórico de uso de SWAP
-        global _swap_history
-        if 'swap_usada_percent' not in locals():
-            swap_usada_percent = 0
-        _swap_history.append({"SWAP": swap_usada_percent})
-        if len(_swap_history) > _swap_history_maxlen:
-            _swap_history.pop(0)
-        swap_df = pd.DataFrame(_swap_history)
-        swap_df["index"] = range(len(swap_df))
-
-        # Gráfico com Altair no estilo retrô
-        swap_chart = alt.Chart(swap_df).mark_line(
-            color="#FF00FF",  # Magenta neon
-            strokeWidth=2
-        ).encode(
-            x=alt.X("index", axis=alt.Axis(title="", labelColor="#00FF00", tickColor="#004400", gridColor="#004400")),
-            y=alt.Y("SWAP", axis=alt.Axis(title="SWAP (%)", labelColor="#00FF00", tickColor="#004400", gridColor="#004400"))
-        ).properties(
-            height=200,
-            width=500,
-            background="#000000"
-        ).configure_view(
-            stroke=None
-        ).configure_axis(
-            grid=True,
-            gridColor="#004400",
-            domain=False
-        )
+        swap_df = serie_historico(data, "swap", "SWAP", segundos)
+        st.vega_lite_chart(swap_df, modelo_grafico("swap"), use_container_width=True)
 
-        st.altair_chart(swap_chart, use_container_width=True)
-        
+    with PERFIL.medir("render.monitor.nucleos"):
+        render_cpu_cores(data)
+
+    with PERFIL.medir("render.monitor.rede"):
+        render_rede(data, segundos)
 
     st.markdown("---")
     st.header("📋 Lista de Processos")
     st.write(f"Total de Processos: **{data.get('total_processes', 0)}**")
     st.write(f"Total de Threads: **{data.get('total_threads', 0)}**")
 
-    processes_list = data.get('processes_list', [])
-    processes_list.sort(key=lambda p: p.pid)
-    
-    table_data = [{
-        "PID":          p.pid, "Nome":         p.name, "Status":       p.estado,
-        "PPID":         p.ppid, "UID":          p.uid, "Threads":      p.threads,
-        "CPU (User)":   p.cpuUserTick, "CPU (Kernel)": p.cpuSysTick, "RAM (KB)":     p.memoriaKB,
-        "Usuário":      p.user_display, "Comando":      p.commandCMD
-    } for p in processes_list]
-
-    st.dataframe(table_data, use_container_width=True)
+    processos = data.get('processes')
+    if processos is None:
+        processos = processos_vazio()
+
+    with st.expander("👥 Consumo por usuário", expanded=False):
+        por_usuario = cache_render(data, ("por_usuario",), lambda: agregar_por_usuario(processos),
+                                   etapa="processos")
+        st.dataframe(por_usuario, use_container_width=True, hide_index=True,
+                     column_config={"CPU %": st.column_config.NumberColumn(format="%.1f")})
+
+    with st.expander("💾 E/S por processo", expanded=False):
+        # Só os processos de maior %CPU e os em espera de E/S são lidos a cada passada
+        processos_io = data.get("processos_io", ())
+        if processos_io:
+            st.dataframe(list(processos_io), use_container_width=True, hide_index=True, column_config={
+                coluna: st.column_config.NumberColumn(format="%.1f") for coluna in ("Leitura (KB/s)", "Escrita (KB/s)")
+            })
+        else:
+            st.info("Sem taxas de E/S ainda (são necessárias duas passadas).")
+        if data.get("processos_io_sem_permissao"):
+            st.caption(f"{data['processos_io_sem_permissao']} processo(s) sem permissão para ler /proc/<pid>/io.")
+
+    modo = st.radio("Visualização:", options=["Tabela", "Árvore"], horizontal=True, key="modo_processos")
+    if modo == "Árvore":
+        with PERFIL.medir("render.monitor.arvore"):
+            render_arvore_processos(data.get('arvore'))
+    else:
+        with PERFIL.medir("render.monitor.tabela"):
+            render_tabela_processos(data, processos)
+
     st.markdown("---")
     st.header("🔍 Inspecionar Processo e Recursos de E/S")
 
-    process_options = [f"PID: {p.pid} - Nome: {p.name}" for p in processes_list]
-    
-    st.selectbox(
-        "Selecione um processo para ver os detalhes:",
-        options=["Nenhum"] + process_options,
-        key='selected_process_option'
+    # Busca por PID (índice, O(1)) ou por nome (no máximo LIMITE_BUSCA candidatos)
+    busca = st.text_input("Buscar processo (PID ou nome):", key="busca_processo").strip()
+    selected_process = None
+    if busca.isdigit():
+        selected_process = buscar_processo(data, int(busca))
+        if selected_process is None:
+            st.warning(f"PID {busca} não encontrado.")
+    elif busca:
+        candidatos, _ = consultar_processos(processos, ordenar_por="CPU %", texto=busca,
+                                            tamanho_pagina=LIMITE_BUSCA, limite_comando=0)
+        if candidatos.empty:
+            st.warning("Nenhum processo encontrado.")
+        else:
+            opcoes = [f"PID: {pid} - Nome: {nome}" for pid, nome in zip(candidatos["PID"], candidatos["Nome"])]
+            escolha = st.selectbox("Selecione um processo para ver os detalhes:", options=opcoes,
+                                   key='selected_process_option')
+            selected_process = candidatos.iloc[opcoes.index(escolha)]
+
+    if selected_process is not None:
+        selected_pid = int(selected_process["PID"])
+        st.markdown(f"#### Detalhes do PID: {selected_pid}")
+        st.code(f"""
+Nome         : {selected_process["Nome"]}
+Comando      : {selected_process["Comando"]}
+Status       : {selected_process["Status"]}
+PPID         : {selected_process["PPID"]}
+Threads      : {selected_process["Threads"]}
+Uso de RAM   : {selected_process["RAM (KB)"]} KB
+        """)
+        if st.button("Ver Recursos Abertos e Locks", key=f"btn_details_{selected_pid}"):
+            st.session_state["processo_expandido"] = selected_pid
+
+        # Se o PID ainda estiver salvo, renderiza
+        if st.session_state.get("processo_expandido") == selected_pid:
+            render_recursos_processo(selected_pid)
+
+    with PERFIL.medir("render.monitor.quem_usa"):
+        render_quem_usa(data)
+
+def render_internals(data):
+    # Perfil do próprio dashboard: etapas de coleta (no coletor, local ou
+    # remoto) e seções de renderização (neste processo)
+    st.header("⚙️ Internals")
+    perfil = data.get("perfil") or PERFIL
+    st.caption(f"Custo de uma medição: {custo_medicao():.2f} µs"
+               + ("" if PERFIL.ativo else " (instrumentação desativada: DASHBOARD_PERFIL=0)"))
+
+    st.subheader("Etapas de coleta")
+    escalonador = data.get("escalonador")
+    if escalonador:
+        st.dataframe(pd.DataFrame(list(escalonador)), use_container_width=True, hide_index=True)
+    st.dataframe(pd.DataFrame(perfil.resumo("coleta.")), use_container_width=True, hide_index=True)
+    contadores = perfil.contadores("coleta.")
+    if contadores:
+        st.dataframe(pd.DataFrame({"Contador": list(contadores), "Valor": list(contadores.values())}),
+                     use_container_width=True, hide_index=True)
+
+    st.subheader("Renderização")
+    st.dataframe(pd.DataFrame(PERFIL.resumo("render.")), use_container_width=True, hide_index=True)
+
+    # O JSON exportado é montado uma vez por snapshot para todas as sessões
+    exportacao = cache_render(data, ("perfil_exportado",), lambda: json.dumps(
+        PERFIL.exportar() if perfil is PERFIL else {"coleta": perfil.exportar(), "render": PERFIL.exportar()},
+        default=str,
+    ))
+    st.download_button("Exportar perfil (JSON)", data=exportacao,
+                       file_name="perfil_dashboard.json", mime="application/json", key="exportar_perfil")
+
+def render_quem_usa(data):
+    # Consulta ao índice reverso mantido em segundo plano pelo coletor
+    st.markdown("### 🧭 Quem está usando?")
+    indice = data.get('indice_reverso')
+    if indice is None:
+        st.info("Índice de recursos ainda não disponível (é montado em segundo plano).")
+        return
+    termo = st.text_input(
+        "Caminho, trecho de caminho, :porta, inode de socket ou \"locks\":", key="busca_recurso"
+    ).strip()
+    if termo:
+        resultados = pd.DataFrame(indice.consultar(termo), columns=["PID", "Tipo", "Recurso"])
+        if resultados.empty:
+            st.warning("Nenhum processo encontrado para este recurso.")
+        else:
+            processos = data.get('processes')
+            if processos is not None:
+                nomes = processos.set_index("PID")["Nome"]
+                resultados.insert(1, "Nome", resultados["PID"].map(nomes))
+            st.dataframe(resultados, use_container_width=True, hide_index=True)
+    estado = indice.estado()
+    if estado.get("atualizado_em"):
+        st.caption(
+            f"Índice de {estado['pids']} processos, {estado['caminhos']} caminhos, {estado['sockets']} sockets "
+            f"e {estado['locks']} locks; atualizado às "
+            f"{datetime.fromtimestamp(estado['atualizado_em']).strftime('%H:%M:%S')} "
+            f"({estado['revarridos']} PIDs revarridos em {estado['duracao'] * 1000:.0f} ms)."
+        )
+
+def render_recursos_processo(pid):
+    # A varredura roda em segundo plano e fica em cache enquanto o número de
+    # descritores não mudar; cada categoria é exibida em páginas
+    varredura = inspetor_descritores().consultar(pid)
+    if varredura is None:
+        st.warning("O processo foi encerrado.")
+        return
+    varredura.esperar(ESPERA_VARREDURA)
+    contagens = varredura.contagens()
+
+    if not varredura.concluida:
+        st.info(f"Varrendo descritores... {sum(contagens.values())} encontrados até agora.")
+    if varredura.erro:
+        st.warning(varredura.erro)
+    elif varredura.concluida and not any(contagens.values()):
+        st.warning("Este processo não possui recursos acessíveis ou você não tem permissão para inspecioná-los.")
+
+    for categoria, total in contagens.items():
+        if not total:
+            continue
+        with st.expander(f"🔹 {categoria} ({total})", expanded=False):
+            paginas = -(-total // TAMANHO_PAGINA_RECURSOS)
+            pagina = 1
+            if paginas > 1:
+                pagina = st.number_input(f"Página (de {paginas}):", min_value=1, max_value=paginas, value=1,
+                                         step=1, key=f"pagina_recursos_{pid}_{categoria}")
+            inicio = (pagina - 1) * TAMANHO_PAGINA_RECURSOS
+            st.code("\n".join(varredura.pagina(categoria, inicio, TAMANHO_PAGINA_RECURSOS)))
+
+def render_tabela_processos(data, processos):
+    # Filtro, ordenação e paginação acontecem no servidor: só a página visível
+    # é serializada para o navegador, com o comando truncado. A página de cada
+    # combinação de filtros é montada uma vez por quadro de processos para todas as sessões
+    col_busca, col_usuario, col_estado = st.columns([2, 1, 1])
+    texto = col_busca.text_input("Filtrar por nome ou comando:", key="filtro_processos")
+    usuarios = cache_render(data, ("usuarios",), lambda: sorted(processos["Usuário"].dropna().unique()),
+                            etapa="processos")
+    usuario = col_usuario.selectbox("Usuário:", options=["Todos"] + usuarios, key="filtro_usuario")
+    opcoes_estados = cache_render(data, ("estados",), lambda: sorted(processos["Status"].dropna().unique()),
+                                  etapa="processos")
+    estados = col_estado.multiselect("Status:", options=opcoes_estados, key="filtro_estados")
+
+    # Ordenação como no top: por padrão, quem mais consome CPU agora fica no topo
+    col_ordem, col_sentido, col_tamanho, col_pagina = st.columns([2, 1, 1, 1])
+    ordenar_por = col_ordem.selectbox("Ordenar por:", options=list(COLUNAS_PROCESSOS),
+                                    index=COLUNAS_PROCESSOS.index("CPU %"), key="ordenar_processos_por")
+    decrescente = col_sentido.checkbox("Decrescente", value=True, key="ordem_decrescente")
+    tamanho_pagina = col_tamanho.selectbox("Por página:", options=TAMANHOS_PAGINA, index=1, key="tamanho_pagina")
+
+    # O total filtrado vem antes da página, para limitar o seletor às páginas existentes
+    usuario = None if usuario == "Todos" else usuario
+    candidatos = cache_render(data, ("filtro_processos", texto, usuario, tuple(estados)),
+                              lambda: filtrar_processos(processos, texto, usuario, estados), etapa="processos")
+    total = len(candidatos)
+    paginas = max(1, -(-total // tamanho_pagina))
+    # A página vive só no session_state (sem value=), trazida para dentro das páginas existentes
+    st.session_state["pagina_processos"] = min(st.session_state.get("pagina_processos", 1), paginas)
+    pagina = col_pagina.number_input(f"Página (de {paginas}):", min_value=1, max_value=paginas, step=1,
+                                     key="pagina_processos")
+
+    pagina_df, total = cache_render(
+        data, ("processos", ordenar_por, decrescente, texto, usuario, tuple(estados), pagina, tamanho_pagina),
+        lambda: consultar_processos(
+            processos, ordenar_por=ordenar_por, decrescente=decrescente, pagina=pagina - 1,
+            tamanho_pagina=tamanho_pagina, candidatos=candidatos,
+        ),
+        etapa="processos",
+    )
+    inicio = (pagina - 1) * tamanho_pagina
+    if len(pagina_df):
+        st.caption(f"Mostrando {inicio + 1}–{inicio + len(pagina_df)} de {total} processos")
+    else:
+        st.caption(f"Nenhum processo nesta página ({total} após os filtros).")
+
+    st.dataframe(
+        pagina_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            nome: st.column_config.NumberColumn(format="%.1f")
+            for nome in ("CPU %", "CPU User %", "CPU Sis %")
+        },
+    )
+
+def render_arvore_processos(arvore):
+    # Árvore recolhível: só descem os ramos marcados em "Expandir"; cada linha
+    # mostra os totais da subárvore inteira, mesmo com o ramo recolhido
+    if arvore is None:
+        st.info("Árvore de processos indisponível.")
+        return
+    expandir_tudo = st.checkbox("Expandir tudo", key="arvore_expandir_tudo")
+    expandidos = None if expandir_tudo else set(st.session_state.get("arvore_expandidos", [1]))
+    linhas = arvore.visiveis(expandidos, limite=LIMITE_LINHAS_ARVORE)
+
+    if not expandir_tudo:
+        # Só os PIDs visíveis com filhos podem ser expandidos ou recolhidos
+        com_filhos = linhas.loc[linhas["Σ Processos"] > 1, "PID"].tolist()
+        st.session_state["arvore_expandidos"] = [p for p in st.session_state.get("arvore_expandidos", [1]) if p in com_filhos]
+        nomes = dict(zip(linhas["PID"], linhas["Árvore"].str.lstrip(" ▾▸")))
+        st.multiselect("Expandir:", options=com_filhos, key="arvore_expandidos",
+                       format_func=lambda pid: f"{pid} ({nomes[pid]})")
+    if len(linhas) >= LIMITE_LINHAS_ARVORE:
+        st.caption(f"Mostrando as primeiras {LIMITE_LINHAS_ARVORE} linhas da árvore.")
+
+    st.dataframe(
+        linhas,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            nome: st.column_config.NumberColumn(format="%.1f")
+            for nome in ("CPU própria %", "Σ CPU %")
+        } | {
+            nome: st.column_config.NumberColumn(format="%d")
+            for nome in ("Σ Processos", "Σ Threads", "Σ RAM (KB)", "Σ CPU (ticks)")
+        },
     )
 
-    if st.session_state.selected_process_option != "Nenhum":
-        selected_pid = int(st.session_state.selected_process_option.split(" ")[1])
-        selected_process = next((p for p in processes_list if p.pid == selected_pid), None)
-        if selected_process:
-            st.markdown(f"#### Detalhes do PID: {selected_process.pid}")
-            st.code(f"""
-Nome         : {selected_process.name}
-Comando      : {selected_process.commandCMD}
-Status       : {selected_process.estado}
-PPID         : {selected_process.ppid}
-Threads      : {selected_process.threads}
-Uso de RAM   : {selected_process.memoriaKB} KB
-            """)
-            if st.button("Ver Recursos Abertos e Locks", key=f"btn_details_{selected_pid}"):
-                st.session_state["processo_expandido"] = selected_pid
-
-            # Se o PID ainda estiver salvo, renderiza
-            if st.session_state.get("processo_expandido") == selected_pid:
-                with st.spinner("Coletando recursos..."):
-                    recursos = get_process_resources(selected_pid)
-
-                    if not any(recursos.values()):
-                        st.warning("Este processo não possui recursos acessíveis ou você não tem permissão para inspecioná-los.")
-                    else:
-                        for categoria, lista in recursos.items():
-                            if lista:
-                                with st.expander(f"🔹 {categoria} ({len(lista)})", expanded=False):
-                                    st.code("\n".join(lista))
+def render_cpu_cores(data):
+    st.markdown("### 🔥 Uso por Núcleo")
+    historico = data.get('historico_nucleos')
+    if historico is None or not historico.colunas:
+        st.info("Uso por núcleo indisponível.")
+        return
+
+    def construir():
+        tempos, valores = historico.consultar(segundos=120, agora=data.get("timestamp"))
+        # Formato longo (tempo × núcleo) para o mapa de calor
+        n_amostras, n_nucleos = valores.shape
+        return pd.DataFrame({
+            "Tempo": pd.to_datetime(tempos, unit="s").repeat(n_nucleos),
+            "Núcleo": list(historico.colunas) * n_amostras,
+            "Uso (%)": valores.ravel(),
+        })
+    heat_df = cache_render(data, ("nucleos",), construir)
+    st.vega_lite_chart(heat_df, modelo_grafico("nucleos", tuple(historico.colunas)), use_container_width=True)
+
+    cpu_nucleos = data.get('cpu_nucleos')
+    if cpu_nucleos is not None and not cpu_nucleos.empty:
+        with st.expander("Detalhe por modo (%)", expanded=False):
+            st.dataframe(cpu_nucleos.round(1), use_container_width=True)
+
+def _formatar_taxa(valor, unidade, casas=2):
+    return "—" if valor is None else f"{valor:.{casas}f} {unidade}"
+
+def render_rede(data, segundos):
+    # Totais do host (sem "lo"), histórico de RX/TX e taxas por interface
+    st.markdown("### 🌐 Rede")
+    rede = data.get("rede") or {}
+    col_rx, col_tx, col_erros, col_retrans = st.columns(4)
+    col_rx.write(f"RX: **{_formatar_taxa(rede.get('rx_mb_s'), 'MB/s')}**")
+    col_tx.write(f"TX: **{_formatar_taxa(rede.get('tx_mb_s'), 'MB/s')}**")
+    col_erros.write(f"Erros/descartes: **{_formatar_taxa(rede.get('erros_s'), '/s', 1)}** / "
+                    f"**{_formatar_taxa(rede.get('descartes_s'), '/s', 1)}**")
+    col_retrans.write(f"Retransmissões TCP: **{_formatar_taxa(rede.get('retransmissoes_s'), '/s', 1)}** "
+                      f"({_formatar_taxa(rede.get('retransmissoes_percent'), '%')})")
+
+    historico = data.get('historico')
+    if historico is not None and "rede_rx" in historico.colunas:
+        def construir():
+            tempos, valores = historico.consultar(["rede_rx", "rede_tx"], segundos=segundos,
+                                                  agora=data.get("timestamp"))
+            # Formato longo (tempo × sentido) para as duas linhas do gráfico
+            return pd.DataFrame({
+                "Tempo": pd.to_datetime(tempos, unit="s").repeat(2),
+                "Sentido": ["RX", "TX"] * len(tempos),
+                "MB/s": valores.ravel(),
+            })
+        rede_df = cache_render(data, ("rede", segundos), construir)
+        st.vega_lite_chart(rede_df, modelo_grafico("rede"), use_container_width=True)
+
+    interfaces = data.get("interfaces_rede", ())
+    if interfaces:
+        with st.expander("Taxas por interface", expanded=False):
+            st.dataframe(list(interfaces), use_container_width=True, hide_index=True, column_config={
+                coluna: st.column_config.NumberColumn(format="%.2f")
+                for coluna in ("RX (MB/s)", "TX (MB/s)", "RX (pacotes/s)", "TX (pacotes/s)", "Erros/s", "Descartes/s")
+            })
 
 def render_filesystem_browser(data):
     st.header("🗄️ Sistema de Arquivos")
@@ -220,7 +598,18 @@ def render_filesystem_browser(data):
     if not partitions:
         st.warning("Não foi possível carregar as informações das partições.")
     else:
-        st.dataframe(partitions, use_container_width=True)
+        st.dataframe(list(partitions), use_container_width=True)
+
+    st.subheader("Atividade dos Discos")
+    discos_io = data.get("discos_io", ())
+    if not discos_io:
+        st.info("Atividade dos discos indisponível.")
+    else:
+        formato = st.column_config.NumberColumn(format="%.1f")
+        st.dataframe(list(discos_io), use_container_width=True, hide_index=True, column_config={
+            coluna: formato for coluna in ("IOPS Leitura", "IOPS Escrita", "Leitura (MB/s)", "Escrita (MB/s)",
+                                           "Utilização (%)")
+        })
     
     st.markdown("---")
     st.subheader("Navegador de Diretórios")
@@ -240,65 +629,78 @@ def render_filesystem_browser(data):
             st.session_state.current_path_fs_pathlib = current_path.parent
             st.rerun()
 
-    # Tenta listar o conteúdo do diretório atual
-    if current_path.is_dir():
-        try:
-            dirs_info = []
-            files_info = []
-            
-            for item in sorted(list(current_path.iterdir()), key=lambda x: x.name.lower()):
-                try:
-                    if not item.exists():
-                        continue
-
-                    if item.is_dir():
-                        dirs_info.append({"Nome": item.name + "/", "Path": item.resolve()}) # Armazenar o caminho completo
-                    elif item.is_file():
-                        stat = item.stat()
-                        size_kb = stat.st_size / 1024
-                        mod_time = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-                        
-                        files_info.append({
-                            "Nome": item.name,
-                            "Tipo": "📄 Arquivo",
-                            "Tamanho (KB)": f"{size_kb:.1f}",
-                            "Modificação": mod_time
-                        })
-                except PermissionError:
-                    if item.is_dir():
-                        dirs_info.append({"Nome": item.name + "/ (Sem Permissão)", "Path": None})
-                    else:
-                        files_info.append({"Nome": item.name + " (Sem Permissão)", "Tipo": "📄 Arquivo", "Tamanho (KB)": "", "Modificação": ""})
-                except Exception as e:
-                    st.warning(f"Erro ao processar '{item.name}': {e}")
-                    continue
-
-            # Exibe os diretórios como botões clicáveis
-            if dirs_info:
-                st.subheader("Pastas")
-                for dir_item in dirs_info:
-                    dir_name = dir_item["Nome"]
-                    dir_path = dir_item["Path"]
-                    if dir_path: # Apenas cria o botão se o caminho for acessível
-                        if st.button(f"📁 {dir_name}", key=f"dir_{dir_path}"):
-                            st.session_state.current_path_fs_pathlib = dir_path
-                            st.rerun()
-                    else:
-                        st.markdown(f"📁 {dir_name}") # Apenas exibe o nome se não for acessível
-            else:
-                st.info("Nenhuma subpasta encontrada neste caminho.")
-
-            # Exibe os arquivos em uma tabela (sem alteração)
-            if files_info:
-                st.subheader("Arquivos")
-                files_df = pd.DataFrame(files_info)
-                st.dataframe(files_df, use_container_width=True)
-            else:
-                st.info("Nenhum arquivo encontrado neste caminho.")
-
-        except PermissionError:
+    # Listagem via os.scandir, em cache por (caminho, mtime); só a página exibida
+    # é formatada, e o stat só é feito para as linhas dela
+    try:
+        listagem = navegador_arquivos().listar(current_path)
+    except OSError:
+        st.error("O caminho atual não é um diretório válido ou acessível.")
+        return
+    if listagem.erro is not None:
+        if isinstance(listagem.erro, PermissionError):
             st.error(f"Permissão negada para acessar o diretório: {current_path}. Tente um caminho diferente.")
-        except Exception as e:
-            st.error(f"Erro inesperado ao listar o diretório: {e}")
+        else:
+            st.error(f"Erro inesperado ao listar o diretório: {listagem.erro}")
+        return
+
+    # Ao trocar de pasta, limpa o filtro e volta para a primeira página
+    if st.session_state.get("caminho_listado") != current_path:
+        st.session_state["caminho_listado"] = current_path
+        st.session_state["filtro_arquivos"] = ""
+        st.session_state["pagina_arquivos"] = 1
+
+    col_filtro, col_ordem, col_pagina = st.columns([2, 1, 1])
+    filtro = col_filtro.text_input("Filtrar por nome:", key="filtro_arquivos")
+    ordenar_por = col_ordem.selectbox("Ordenar por:", options=["Nome", "Tamanho (KB)", "Modificação"],
+                                      key="ordenar_arquivos_por")
+    pagina = col_pagina.number_input("Página:", min_value=1, step=1, key="pagina_arquivos")
+
+    render_progresso_tamanhos(current_path)
+    entradas, total = listagem.pagina(filtro, ordenar_por, pagina - 1, TAMANHO_PAGINA_ARQUIVOS,
+                                      tamanhos=motor_tamanhos())
+    inicio = (pagina - 1) * TAMANHO_PAGINA_ARQUIVOS
+    if entradas.empty:
+        st.info("Nenhuma entrada encontrada neste caminho." if not total else f"A página {pagina} está vazia ({total} entradas).")
+        return
+    st.caption(f"Mostrando {inicio + 1}–{inicio + len(entradas)} de {total} entradas")
+
+    # Navegação: uma única caixa com as pastas da página, em vez de um botão por pasta
+    pastas = entradas.loc[entradas["Tipo"] == TIPOS_ENTRADA[1], "Nome"].tolist()
+    if pastas:
+        col_pasta, col_abrir = st.columns([3, 1])
+        pasta = col_pasta.selectbox("Pasta:", options=pastas, key="pasta_selecionada", label_visibility="collapsed")
+        if col_abrir.button("📁 Abrir", key="abrir_pasta"):
+            st.session_state.current_path_fs_pathlib = (current_path / pasta).resolve()
+            st.rerun()
+
+    st.dataframe(
+        entradas,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Tamanho (KB)": st.column_config.NumberColumn(format="%.1f")},
+    )
+
+def render_progresso_tamanhos(current_path):
+    # O cálculo roda em segundo plano; a tela só mostra o progresso (o
+    # autorefresh atualiza) e usa os tamanhos já calculados
+    motor = motor_tamanhos()
+    progresso = motor.progresso()
+    col_botao, col_estado = st.columns([1, 3])
+    if progresso["em_andamento"]:
+        if col_botao.button("⏹️ Cancelar cálculo", key="cancelar_tamanhos"):
+            motor.cancelar()
+        col_estado.caption(
+            f"Calculando tamanhos em `{progresso['raiz']}`: {progresso['pastas']} pastas "
+            f"({progresso['reaproveitadas']} sem mudanças), {progresso['arquivos']} arquivos, "
+            f"{progresso['bytes'] / 1024 ** 3:.2f} GB, {progresso['pendentes']} pastas na fila..."
+        )
     else:
-        st.error("O caminho atual não é um diretório válido ou acessível.")
\ No newline at end of file
+        if col_botao.button("📊 Calcular tamanhos das pastas", key="calcular_tamanhos"):
+            motor.calcular(current_path)
+            st.rerun()
+        total = motor.total(str(current_path))
+        if total is not None:
+            col_estado.caption(
+                f"Total desta pasta: {total[0] / 1024 ** 3:.2f} GB em {total[1]} arquivos e {total[2]} pastas "
+                f"(último cálculo levou {progresso['duracao']:.1f} s)."
+            )